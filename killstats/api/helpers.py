@@ -1,13 +1,26 @@
+# Standard Library
+import hashlib
+
+# Django
+from django.core.cache import cache
+
 # Alliance Auth
 from allianceauth.eveonline.models import EveCharacter
 from allianceauth.services.hooks import get_extension_logger
 
 # AA Killstats
 from killstats import __title__, models
+from killstats.constants import VISIBILITY_KEY, VISIBILITY_VERSION_KEY
+from killstats.helpers.versioned import VersionCounter
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
 
+# Seconds until the visible entities of a user are looked up again
+VISIBILITY_TIMEOUT = 3_600
+
+visibility_version = VersionCounter(VISIBILITY_VERSION_KEY)
+
 
 # NOTE: not implemented yet
 def get_permission(request, entity_type: str):  # pragma: no cover
@@ -75,3 +88,44 @@ def get_alliances(request):
         return []
 
     return list(alliances)
+
+
+def get_visible_entities(request) -> dict:
+    """Get corporations and alliances of the user, cached per user.
+
+    The cache is invalidated for all users when characters, permissions
+    or tracked corporations and alliances change.
+    ``unique_id`` identifies the tracked corporations and alliances in the lists.
+    """
+    version = visibility_version.get(0)
+    cache_key = f"{VISIBILITY_KEY}_{request.user.pk}_{version}"
+    visible = cache.get(cache_key)
+    if visible is not None:
+        return visible
+
+    corporations = get_corporations(request)
+    alliances = get_alliances(request)
+    corp_ids = models.CorporationsAudit.objects.filter(
+        corporation__corporation_id__in=corporations
+    ).values_list("corporation__corporation_id", flat=True)
+    ally_ids = models.AlliancesAudit.objects.filter(
+        alliance__alliance_id__in=alliances
+    ).values_list("alliance__alliance_id", flat=True)
+    entities = list(corp_ids) + list(ally_ids)
+
+    # Combine all IDs into a single string
+    combined_ids = "_".join(map(str, sorted(entities)))
+
+    visible = {
+        "corporations": corporations,
+        "alliances": alliances,
+        # Create a unique ID from the combined IDs
+        "unique_id": hashlib.md5(combined_ids.encode()).hexdigest(),
+    }
+    cache.set(cache_key, visible, timeout=VISIBILITY_TIMEOUT)
+    return visible
+
+
+def invalidate_visible_entities() -> None:
+    """Invalidate the visible entities of all users."""
+    visibility_version.bump()
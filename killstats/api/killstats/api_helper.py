@@ -1,20 +1,39 @@
 # Standard Library
+import base64
 import hashlib
+from datetime import datetime
+from functools import partial
+from typing import Optional
 
 # Django
-from django.core.cache import cache
 from django.db.models import Count, Q, Sum
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
 
 # Alliance Auth
 from allianceauth.services.hooks import ObjectDoesNotExist, get_extension_logger
 
 # AA Killstats
 from killstats import __title__
-from killstats.api.account_manager import AccountManager
-from killstats.api.helpers import get_alliances, get_corporations
-from killstats.app_settings import KILLSTATS_API_CACHE_LIFETIME
-from killstats.models.killboard import Attacker, Killmail
-from killstats.models.killstatsaudit import AlliancesAudit, CorporationsAudit
+from killstats.api.helpers import get_visible_entities
+from killstats.app_settings import (
+    KILLSTATS_API_CACHE_CLOSED_LIFETIME,
+    KILLSTATS_API_CACHE_LIFETIME,
+)
+from killstats.helpers.apicache import REFRESH_LOCK_TIMEOUT, api_cache
+from killstats.helpers.generations import stats_generations
+from killstats.helpers.lru import LRUCache
+from killstats.helpers.mains import main_characters
+from killstats.helpers.sde import sde
+from killstats.helpers.warming import cache_warming
+from killstats.managers.killboard_manager import period_range
+from killstats.models.killboard import (
+    Attacker,
+    Killmail,
+    KillmailInvolvement,
+    KillmailSearchToken,
+)
+from killstats.models.rollups import CharacterRollup, EntityRollup, ShipRollup
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
@@ -29,105 +48,254 @@ KILLMAIL_MAPPING = {
 }
 
 
+# DataTables parameters read by get_killmails_data with their defaults
+KILLMAIL_PAGE_PARAMS = {
+    "start": "0",
+    "length": "25",
+    "cursor": None,
+    "search[value]": "",
+    "order[0][column]": "0",
+    "order[0][dir]": "desc",
+}
+# Parameters of the first page requested by the killboard, ordered by date
+KILLMAIL_FIRST_PAGE_PARAMS = {**KILLMAIL_PAGE_PARAMS, "order[0][column]": "5"}
+
+
+# Snapshots of closed months in computation, cache key to (entities, year, month, token)
+pending_snapshots = LRUCache(maxsize=1_000, ttl=REFRESH_LOCK_TIMEOUT)
+
+
+def is_closed(year, month=None) -> bool:
+    """Return True if the month, or the year without a month, has ended."""
+    return period_range(year, month)[1] <= timezone.now()
+
+
 def set_cache_key(cache_key, output, timeout=KILLSTATS_API_CACHE_LIFETIME):
     if not cache_key:
         return False
 
+    snapshot = pending_snapshots.get(cache_key)
+    if snapshot is not None:
+        pending_snapshots.delete(cache_key)
+        entities, year, month, token = snapshot
+        stats_generations.register_snapshot(cache_key, entities, year, month)
+        # Killmails stored while computing are only in the next snapshot
+        if stats_generations.token(entities, year, month) == token:
+            timeout = KILLSTATS_API_CACHE_CLOSED_LIFETIME
+
     logger.debug("Cache Set: %s", cache_key)
-    cache.set(
-        key=cache_key,
-        value=output,
-        timeout=60 * timeout,
-    )
+    api_cache.set(cache_key, output, lifetime=60 * timeout)
     return True
 
 
-def cache_sytem(request, cache_name, entity_id) -> tuple:
+# pylint: disable=too-many-positional-arguments
+def cache_sytem(
+    request,
+    cache_name,
+    entity_id,
+    entity_type=None,
+    year=None,
+    month=None,
+    warm=False,
+) -> tuple:
+    """Return the cached output, or the cache key if the caller has to compute it.
+
+    With a year the cache key contains the stats generations of the entities
+    in the month, or in the year without a month, so stored killmails
+    invalidate the output of their months only.
+    Output of closed months is a snapshot without generations, it is cached
+    until a killmail of the month is stored.
+    Expired output is returned while another request refreshes it,
+    a caller which gets the cache key has to store the output with ``set_cache_key``.
+    Cache warming doesn't wait for output computed by another request.
+    """
     cache_id = get_unique_id(request, entity_id)
 
     cache_key = f"{cache_name}_{cache_id}"
-    output = cache.get(cache_key)
-
-    if output is not None:
+    closed = year is not None and is_closed(year, month)
+    if closed:
+        cache_key += "_closed"
+    elif year is not None:
+        entities = get_entities(request, entity_type, entity_id)
+        cache_key += f"_{stats_generations.token(entities, year, month)}"
+        if entity_id == 0 and not warm:
+            cache_warming.remember(request.user.pk, get_visible_entities(request))
+    output, refresh = api_cache.get(cache_key, wait=not warm)
+
+    if not refresh:
         logger.debug("Cache hit: %s", cache_key)
         return output, None
+    if closed:
+        entities = get_entities(request, entity_type, entity_id)
+        pending_snapshots.set(
+            cache_key,
+            (entities, year, month, stats_generations.token(entities, year, month)),
+        )
     return None, cache_key
 
 
-def get_unique_id(request, entity_id) -> str:
-    if entity_id != 0:
-        return entity_id
+def get_cache_name(name, month, year, entity_type, entity_id) -> str:
+    return f"{name}_{month}_{year}_{entity_type}_{entity_id}"
 
-    corp = get_corporations(request)
-    ally = get_alliances(request)
-    corp_ids = CorporationsAudit.objects.filter(
-        corporation__corporation_id__in=corp
-    ).values_list("corporation__corporation_id", flat=True)
-    ally_ids = AlliancesAudit.objects.filter(
-        alliance__alliance_id__in=ally
-    ).values_list("alliance__alliance_id", flat=True)
-    entities = list(corp_ids) + list(ally_ids)
 
-    # Combine all IDs into a single string
-    combined_ids = "_".join(map(str, sorted(entities)))
+def get_killmails_cache_name(request, month, year, entity_type, entity_id, mode):
+    """Return the cache name of a killmail table page from its DataTables parameters."""
+    params = sorted(
+        (key, request.GET.get(key, default))
+        for key, default in KILLMAIL_PAGE_PARAMS.items()
+    )
+    params_id = hashlib.md5(repr(params).encode()).hexdigest()
+    return f"killmail_{month}_{year}_{entity_type}_{entity_id}_{mode}_{params_id}"
 
-    # Create a unique ID from the combined IDs
-    unique_id = hashlib.md5(combined_ids.encode()).hexdigest()
-    return unique_id
+
+def get_unique_id(request, entity_id) -> str:
+    if entity_id != 0:
+        return entity_id
+    return get_visible_entities(request)["unique_id"]
 
 
 def get_entities(request, entity_type: str, entity_id: int):
     if entity_id == 0:
+        visible = get_visible_entities(request)
         if entity_type == "alliance":
-            entities = get_alliances(request)
+            entities = visible["alliances"]
         else:
-            entities = get_corporations(request)
+            entities = visible["corporations"]
     else:
         entities = [entity_id]
     return entities
 
 
+def get_involved_attackers(entities, year, month=None):
+    """Return the attackers of the entities from their kills in the involvement index."""
+    kills = (
+        KillmailInvolvement.objects.filter_entities(
+            entities, role=KillmailInvolvement.ROLE_KILL
+        )
+        .filter_period(year, month)
+        .values("killmail_id")
+    )
+    return Attacker.objects.filter(
+        Q(corporation_id__in=entities)
+        | Q(alliance_id__in=entities)
+        | Q(character_id__in=entities),
+        killmail_id__in=kills,
+    )
+
+
+def encode_cursor(killmail) -> str:
+    """Return the keyset cursor after a Killmail (date, id)."""
+    value = f"{killmail.killmail_date.isoformat()}|{killmail.killmail_id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[tuple[datetime, int]]:
+    """Return date and Killmail ID of a keyset cursor, None if invalid."""
+    try:
+        date, killmail_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(date), int(killmail_id)
+    except (ValueError, UnicodeDecodeError):
+        logger.debug("Invalid killmail cursor: %s", cursor)
+        return None
+
+
+def get_killmails_counts(killmails, entities, role, year, month, search_filter):
+    """Return total and filtered count and the ISK sum of the killmails.
+
+    Without search the counts are read from the entity rollups if every killmail
+    is counted once, losses have one victim corporation and alliance,
+    kills of several entities can share a killmail.
+    """
+    if search_filter is None and (
+        len(entities) == 1 or role == KillmailInvolvement.ROLE_LOSS
+    ):
+        count_field, value_field = (
+            ("losses", "isk_lost")
+            if role == KillmailInvolvement.ROLE_LOSS
+            else ("kills", "isk_destroyed")
+        )
+        totals = EntityRollup.objects.filter_entities(entities, year, month).aggregate(
+            total=Sum(count_field), totalvalue=Sum(value_field)
+        )
+        total = totals["total"] or 0
+        return total, total, totals["totalvalue"]
+
+    totals = killmails.aggregate(
+        total=Count("pk"),
+        filtered=Count("pk", filter=search_filter or Q()),
+        totalvalue=Sum("victim_total_value"),
+    )
+    return totals["total"], totals["filtered"], totals["totalvalue"]
+
+
 # pylint: disable=too-many-locals, too-many-positional-arguments
 def get_killmails_data(request, month, year, entity_type: str, entity_id: int, mode):
+    """Return a page of Killmails for DataTables.
+
+    Ordered by date the page after ``cursor`` (keyset on date and ID) is returned
+    if given, else the page at ``start``.
+    """
     entities = get_entities(request, entity_type, entity_id)
 
     # Datatables parameters
-    start = int(request.GET.get("start", 0))
-    length = int(request.GET.get("length", 25))
-    limit = start + length
+    params = {
+        key: request.GET.get(key, default)
+        for key, default in KILLMAIL_PAGE_PARAMS.items()
+    }
+    start = int(params["start"])
+    length = int(params["length"])
+    cursor = params["cursor"]
 
-    search_value = request.GET.get("search[value]", "")
-    order_column_index = int(request.GET.get("order[0][column]", 0))
-    order_dir = request.GET.get("order[0][dir]", "desc")
+    search_value = params["search[value]"]
+    order_column_index = int(params["order[0][column]"])
+    order_dir = params["order[0][dir]"]
     order_column = KILLMAIL_MAPPING.get(order_column_index, "killmail_date")
-    order_by = f"{'-' if order_dir == 'desc' else ''}{order_column}"
+    order_prefix = "-" if order_dir == "desc" else ""
 
-    killmails = (
-        Killmail.objects.prefetch_related("victim", "victim_ship")
-        .filter(killmail_date__year=year, killmail_date__month=month)
-        .order_by(order_by)
-    ).filter_entities(entities)
+    role = (
+        KillmailInvolvement.ROLE_LOSS
+        if mode == "losses"
+        else KillmailInvolvement.ROLE_KILL
+    )
+    killmails = Killmail.objects.filter_involved(
+        entities, role=role, year=year, month=month
+    )
 
-    if mode == "losses":
-        killmails = killmails.filter_entities_losses(entities)
-    else:
-        killmails = killmails.filter_entities_kills(entities)
+    search_filter = KillmailSearchToken.objects.search_filter(search_value)
 
-    totalvalue = (
-        killmails.aggregate(totalvalue=Sum("victim_total_value"))["totalvalue"],
+    total_count, record_count, totalvalue = get_killmails_counts(
+        killmails, entities, role, year, month, search_filter
     )
 
-    if search_value:
-        killmails = killmails.filter(
-            Q(victim__name__icontains=search_value)
-            | Q(victim_ship__name__icontains=search_value)
-            | Q(victim_total_value__icontains=search_value)
-            | Q(killmail_date__icontains=search_value)
-        )
+    if search_filter is not None:
+        killmails = killmails.filter(search_filter)
+    killmails = killmails.select_related("victim").order_by(
+        f"{order_prefix}{order_column}", f"{order_prefix}killmail_id"
+    )
 
-    total_count = killmails.count()
-    record_count = killmails.count()
-    killmails = killmails[start:limit]
+    keyset = order_column == "killmail_date"
+    position = decode_cursor(cursor) if keyset and cursor else None
+    if position is not None:
+        date, killmail_id = position
+        if order_dir == "desc":
+            killmails = killmails.filter(
+                Q(killmail_date__lt=date)
+                | Q(killmail_date=date, killmail_id__lt=killmail_id)
+            )
+        else:
+            killmails = killmails.filter(
+                Q(killmail_date__gt=date)
+                | Q(killmail_date=date, killmail_id__gt=killmail_id)
+            )
+        killmails = list(killmails[:length])
+    else:
+        killmails = list(killmails[start : start + length])
+
+    next_cursor = None
+    if keyset and len(killmails) == length and killmails[-1].killmail_date:
+        next_cursor = encode_cursor(killmails[-1])
 
     output = []
     for killmail in killmails:
@@ -141,9 +309,7 @@ def get_killmails_data(request, month, year, entity_type: str, entity_id: int, m
                 },
                 "victim_ship": {
                     "id": killmail.victim_ship_id,
-                    "name": (
-                        killmail.victim_ship.name if killmail.victim_ship else "Unknown"
-                    ),
+                    "name": sde.type_name(killmail.victim_ship_id) or "Unknown",
                 },
                 "victim_corporation_id": killmail.victim_corporation_id,
                 "victim_alliance_id": killmail.victim_alliance_id,
@@ -163,42 +329,23 @@ def get_killmails_data(request, month, year, entity_type: str, entity_id: int, m
     return {
         "draw": int(request.GET.get("draw", 1)),
         "recordsTotal": total_count,
-        "recordsFiltered": total_count if not search_value else record_count,
+        "recordsFiltered": record_count,
         "data": output,
-        "totalvalue": totalvalue,
+        "totalvalue": totalvalue or 0,
+        "next_cursor": next_cursor,
     }
 
 
 def get_killstats_halls(request, month, year, entity_type: str, entity_id: int):
     entities = get_entities(request, entity_type, entity_id)
-    account = AccountManager()
-    mains, _ = account.get_mains_alts()
 
-    shame = (
-        Killmail.objects.filter(
-            killmail_date__year=year,
-            killmail_date__month=month,
-        )
-        .filter(
-            Q(victim_corporation_id__in=entities)
-            | Q(victim_alliance_id__in=entities)
-            | Q(victim_id__in=entities)
-        )
-        .order_by("-victim_total_value")[:5]
-    )
+    shame = Killmail.objects.filter_involved(
+        entities, role=KillmailInvolvement.ROLE_LOSS, year=year, month=month
+    ).order_by("-victim_total_value")[:5]
 
-    fame = (
-        Attacker.objects.filter(
-            killmail__killmail_date__year=year,
-            killmail__killmail_date__month=month,
-        )
-        .filter(
-            Q(corporation_id__in=entities)
-            | Q(alliance_id__in=entities)
-            | Q(character_id__in=entities)
-        )
-        .order_by("-killmail__victim_total_value")[:5]
-    )
+    fame = get_involved_attackers(entities, year, month).order_by(
+        "-killmail__victim_total_value"
+    )[:5]
 
     shame_data = []
     fame_data = []
@@ -208,14 +355,9 @@ def get_killstats_halls(request, month, year, entity_type: str, entity_id: int):
 
         try:
             character_id = killmail.victim.id
-            character_name = killmail.victim.name
-            for main_id, data in mains.items():
-                alts = [alt.character_id for alt in data["alts"]]
-                if character_id in alts and character_id != main_id:
-                    main_name = data["main"].character_name
-                    # Hauptcharaktername verwenden
-                    character_name = f"{character_name} ({main_name})"
-                    break
+            character_name = main_characters.decorate(
+                character_id, killmail.victim.name
+            )
         except AttributeError:
             character_id = 0
             character_name = "Unknown"
@@ -238,14 +380,9 @@ def get_killstats_halls(request, month, year, entity_type: str, entity_id: int):
 
         try:
             character_id = killmail.character.id
-            character_name = killmail.character.name
-            for main_id, data in mains.items():
-                alts = [alt.character_id for alt in data["alts"]]
-                if character_id in alts and character_id != main_id:
-                    main_name = data["main"].character_name
-                    # Hauptcharaktername verwenden
-                    character_name = f"{character_name} ({main_name})"
-                    break
+            character_name = main_characters.decorate(
+                character_id, killmail.character.name
+            )
         except (AttributeError, ObjectDoesNotExist):
             character_id = 0
             character_name = "Unknown"
@@ -278,30 +415,12 @@ def get_killstats_halls(request, month, year, entity_type: str, entity_id: int):
 
 def get_top_10(request, month, year, entity_type: str, entity_id: int) -> list:
     entities = get_entities(request, entity_type, entity_id)
-    account = AccountManager()
-    mains_dict, _ = account.get_mains_alts()
-
-    killmail = (
-        Killmail.objects.prefetch_related("victim", "victim_ship")
-        .filter(killmail_date__year=year, killmail_date__month=month)
-        .order_by("-killmail_date")
-    ).filter_entities(entities)
-
-    km_ids = killmail.values_list("killmail_id", flat=True)
 
     top_characters = (
-        Attacker.objects.filter(
-            killmail__killmail_date__year=year,
-            killmail__killmail_date__month=month,
-            killmail_id__in=km_ids,
-        )
-        .filter(
-            Q(corporation_id__in=entities)
-            | Q(alliance_id__in=entities)
-            | Q(character_id__in=entities)
-        )
+        CharacterRollup.objects.filter_entities(entities, year, month)
+        .filter(kills__gt=0)
         .values("character_id", "character__name")
-        .annotate(kill_count=Count("character_id"))
+        .annotate(kill_count=Sum("kills"))
         .order_by("-kill_count", "character__name")[:10]
     )
 
@@ -311,19 +430,215 @@ def get_top_10(request, month, year, entity_type: str, entity_id: int) -> list:
     # Convert QuerySet to list
     top_10_list = list(top_characters)
 
-    # Add character_name to each entry
+    # Add the main character's name to alts
     for entry in top_10_list:
-        character_id = entry["character_id"]
-
-        try:
-            # Check if the character is an alt and add the main character's name
-            for main_id, data in mains_dict.items():
-                alts = [alt.character_id for alt in data["alts"]]
-                if character_id in alts and character_id != main_id:
-                    main_character = data["main"]
-                    entry["character__name"] += f" ({main_character.character_name})"
-                    break
-        except AttributeError:
-            entry["character__name"] = "Unknown"
+        entry["character__name"] = main_characters.decorate(
+            entry["character_id"], entry["character__name"]
+        )
 
     return top_10_list
+
+
+def _top_rollup(rollups, field: str, subject: str, alias: str, keys: tuple):
+    """Return the subject with the highest sum of a rollup field."""
+    top = (
+        rollups.filter(**{f"{field}__gt": 0})
+        .values(f"{subject}_id", f"{subject}__name")
+        .annotate(total=Sum(field))
+        .order_by("-total", f"{subject}__name")
+        .first()
+    )
+    if top is None:
+        return None
+    return {
+        keys[0]: top[f"{subject}_id"],
+        keys[1]: top[f"{subject}__name"],
+        alias: top["total"],
+    }
+
+
+def _highest_rollup(rollups, role: str, keys: tuple):
+    """Return ID, value and victim ship of the most valuable kill or loss."""
+    highest = (
+        rollups.filter(**{f"highest_{role}_value__isnull": False})
+        .order_by(f"-highest_{role}_value")
+        .values_list(f"highest_{role}_id", f"highest_{role}_value")
+        .first()
+    )
+    if highest is None:
+        return None
+    ship_id = (
+        Killmail.objects.filter(killmail_id=highest[0])
+        .values_list("victim_ship_id", flat=True)
+        .first()
+    )
+    return dict(zip(keys, (*highest, ship_id, sde.type_name(ship_id))))
+
+
+def _top_ship(entities, year, month):
+    """Return the ship type used in the most kills of the entities.
+
+    Kills of several entities can share a killmail, they are counted
+    once from the attackers instead of summing the ship rollups.
+    """
+    if len(entities) == 1:
+        return _top_rollup(
+            ShipRollup.objects.filter_entities(entities, year, month),
+            "kills",
+            "ship",
+            "count",
+            ("ship__id", "ship__name"),
+        )
+    return (
+        get_involved_attackers(entities, year, month)
+        .filter(ship__isnull=False)
+        .values("ship__id", "ship__name")
+        .annotate(count=Count("killmail_id", distinct=True))
+        .order_by("-count", "ship__name")
+        .first()
+    )
+
+
+def get_all_stats(request, month, year, entity_type: str, entity_id: int) -> dict:
+    entities = get_entities(request, entity_type, entity_id)
+    characters = CharacterRollup.objects.filter_entities(entities, year)
+    characters_month = characters.filter(month=int(month))
+    ships_month = ShipRollup.objects.filter_entities(entities, year, month)
+    # Entity rollups include kills and losses without a character, e.g. structures
+    entities_month = EntityRollup.objects.filter_entities(entities, year, month)
+
+    top_victim_ship = None
+    for ship in (
+        ships_month.filter(losses__gt=0)
+        .values("ship_id", "ship__name")
+        .annotate(total=Sum("losses"))
+        .order_by("-total", "ship__name")
+    ):
+        # Capsules are not counted as victim ships
+        if sde.group_id(ship["ship_id"]) != 29:
+            top_victim_ship = {
+                "victim_ship_id": ship["ship_id"],
+                "victim_ship__name": ship["ship__name"],
+                "top_victim_ship": ship["total"],
+            }
+            break
+
+    return {
+        "stats": {
+            "alltime_killer": _top_rollup(
+                characters,
+                "kills",
+                "character",
+                "alltime_killer",
+                ("character_id", "character__name"),
+            ),
+            "alltime_victim": _top_rollup(
+                characters,
+                "losses",
+                "character",
+                "alltime_victim",
+                ("victim_id", "victim__name"),
+            ),
+            "top_ship": _top_ship(entities, year, month),
+            "top_victim_ship": top_victim_ship,
+            "top_victim": _top_rollup(
+                characters_month,
+                "losses",
+                "character",
+                "top_victim",
+                ("victim_id", "victim__name"),
+            ),
+            "top_killer": _top_rollup(
+                characters_month,
+                "kills",
+                "character",
+                "top_killer",
+                ("character_id", "character__name"),
+            ),
+            "highest_kill": _highest_rollup(
+                entities_month,
+                "kill",
+                (
+                    "killmail_id",
+                    "killmail__victim_total_value",
+                    "killmail__victim_ship__id",
+                    "killmail__victim_ship__name",
+                ),
+            ),
+            "highest_loss": _highest_rollup(
+                entities_month,
+                "loss",
+                (
+                    "killmail_id",
+                    "victim_total_value",
+                    "victim_ship__id",
+                    "victim_ship__name",
+                ),
+            ),
+        }
+    }
+
+
+def warm_cache(entity_type: str, entity_id: int, year, month, user=None) -> int:
+    """Compute the uncached output of a killboard page for the month.
+
+    Halls, stats, top 10 and the first page of kills and losses are cached
+    under the keys of their endpoints, entity ID 0 is warmed as the user.
+    Returns the number of computed outputs.
+    """
+    year, month = str(year), str(month)
+    request = HttpRequest()
+    request.user = user
+    request.GET = QueryDict(mutable=True)
+    request.GET.update(
+        {
+            key: value
+            for key, value in KILLMAIL_FIRST_PAGE_PARAMS.items()
+            if value is not None
+        }
+    )
+    args = (month, year, entity_type, entity_id)
+
+    outputs = [
+        (
+            get_cache_name("hall", *args),
+            month,
+            lambda: get_killstats_halls(request, *args),
+        ),
+        (
+            get_cache_name("top_10", *args),
+            month,
+            lambda: {"top10": get_top_10(request, *args)},
+        ),
+        # All-time stats cover the whole year
+        (
+            get_cache_name("stats", *args),
+            None,
+            lambda: get_all_stats(request, *args),
+        ),
+    ] + [
+        (
+            get_killmails_cache_name(request, *args, mode),
+            month,
+            partial(get_killmails_data, request, *args, mode),
+        )
+        for mode in ("kills", "losses")
+    ]
+
+    computed = 0
+    for cache_name, cache_month, compute in outputs:
+        _, cache_key = cache_sytem(
+            request, cache_name, entity_id, entity_type, year, cache_month, warm=True
+        )
+        if cache_key:
+            set_cache_key(cache_key, compute())
+            computed += 1
+    logger.debug(
+        "Cache warmed: %s %s %s/%s, %s computed",
+        entity_type,
+        entity_id,
+        month,
+        year,
+        computed,
+    )
+    return computed
@@ -35,9 +35,20 @@ class KillboardApiEndpoints:
         def get_corporation_killmails(
             request, month, year, entity_type: str, entity_id: int, mode
         ):
-            output = api_helper.get_killmails_data(
+            cache_name = api_helper.get_killmails_cache_name(
                 request, month, year, entity_type, entity_id, mode
             )
+            output, cache_key = api_helper.cache_sytem(
+                request, cache_name, entity_id, entity_type, year, month
+            )
+
+            if cache_key:
+                output = api_helper.get_killmails_data(
+                    request, month, year, entity_type, entity_id, mode
+                )
+                # Cache the output
+                api_helper.set_cache_key(cache_key, output)
+            output = {**output, "draw": int(request.GET.get("draw", 1))}
             return JsonResponse(output, safe=False)
 
         # Hall of Fame/Shame
@@ -49,8 +60,12 @@ class KillboardApiEndpoints:
         def get_corporation_halls(
             request, month, year, entity_type: str, entity_id: int
         ):
-            cache_name = f"hall_{month}_{year}_{entity_type}_{entity_id}"
-            output, cache_key = api_helper.cache_sytem(request, cache_name, entity_id)
+            cache_name = api_helper.get_cache_name(
+                "hall", month, year, entity_type, entity_id
+            )
+            output, cache_key = api_helper.cache_sytem(
+                request, cache_name, entity_id, entity_type, year, month
+            )
 
             if cache_key:
                 output = api_helper.get_killstats_halls(
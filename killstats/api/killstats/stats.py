@@ -4,7 +4,6 @@
 from ninja import NinjaAPI
 
 # Django
-from django.db.models import Count, Q
 from django.shortcuts import render
 
 # Alliance Auth
@@ -13,7 +12,6 @@ from allianceauth.services.hooks import get_extension_logger
 # AA Killstats
 from killstats import __title__
 from killstats.api.killstats import api_helper
-from killstats.models.killboard import Attacker, Killmail
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
@@ -34,8 +32,12 @@ class KillboardStatsApiEndpoints:
             tags=self.tags,
         )
         def get_top_10_api(request, month, year, entity_type: str, entity_id: int):
-            cache_name = f"top_10_{month}_{year}_{entity_type}_{entity_id}"
-            output, cache_key = api_helper.cache_sytem(request, cache_name, entity_id)
+            cache_name = api_helper.get_cache_name(
+                "top_10", month, year, entity_type, entity_id
+            )
+            output, cache_key = api_helper.cache_sytem(
+                request, cache_name, entity_id, entity_type, year, month
+            )
             if cache_key:
                 top_10 = api_helper.get_top_10(
                     request=request,
@@ -60,95 +62,18 @@ class KillboardStatsApiEndpoints:
             tags=self.tags,
         )
         def get_all_stats(request, month, year, entity_type: str, entity_id: int):
-            cache_name = f"stats_{month}_{year}_{entity_type}_{entity_id}"
-            output, cache_key = api_helper.cache_sytem(request, cache_name, entity_id)
-            entities = api_helper.get_entities(request, entity_type, entity_id)
+            cache_name = api_helper.get_cache_name(
+                "stats", month, year, entity_type, entity_id
+            )
+            # All-time stats cover the whole year
+            output, cache_key = api_helper.cache_sytem(
+                request, cache_name, entity_id, entity_type, year
+            )
 
             if cache_key:
-                # Get All Killmails
-                killmail = Killmail.objects.filter(
-                    Q(victim_id__in=entities)
-                    | Q(victim_corporation_id__in=entities)
-                    | Q(victim_alliance_id__in=entities),
-                    killmail_date__year=year,
-                )
-
-                # Get All Attackers
-                attackers = Attacker.objects.filter(
-                    Q(corporation_id__in=entities)
-                    | Q(alliance_id__in=entities)
-                    | Q(character_id__in=entities),
-                    killmail__killmail_date__year=year,
+                output = api_helper.get_all_stats(
+                    request, month, year, entity_type, entity_id
                 )
-
-                # Get for the month
-                attackers_month = attackers.filter(killmail__killmail_date__month=month)
-                killmail_month = killmail.filter(killmail_date__month=month)
-
-                alltime_killer = (
-                    attackers.values("character_id", "character__name")
-                    .annotate(
-                        alltime_killer=Count("killmail__killmail_id", distinct=True)
-                    )
-                    .order_by("-alltime_killer", "character__name")
-                )
-
-                alltime_victim = (
-                    killmail.values("victim_id", "victim__name")
-                    .annotate(alltime_victim=Count("killmail_id", distinct=True))
-                    .order_by("-alltime_victim", "victim__name")
-                )
-
-                top_ship = (
-                    attackers_month.values("ship__id", "ship__name")
-                    .annotate(count=Count("killmail__killmail_id", distinct=True))
-                    .order_by("-count")
-                )
-
-                top_killer = (
-                    attackers_month.values("character_id", "character__name").annotate(
-                        top_killer=Count("character_id")
-                    )
-                ).order_by("-top_killer", "character__name")
-
-                top_victim = (
-                    killmail_month.values("victim_id", "victim__name").annotate(
-                        top_victim=Count("victim_id")
-                    )
-                ).order_by("-top_victim", "victim__name")
-
-                top_victim_ship = (
-                    killmail_month.exclude(victim_ship__group_id__in=[29])
-                    .values("victim_ship_id", "victim_ship__name")
-                    .annotate(top_victim_ship=Count("victim_ship_id"))
-                ).order_by("-top_victim_ship", "victim_ship__name")
-
-                highest_kill = attackers_month.values(
-                    "killmail_id",
-                    "killmail__victim_total_value",
-                    "killmail__victim_ship__id",
-                    "killmail__victim_ship__name",
-                ).order_by("-killmail__victim_total_value")
-
-                highest_loss = killmail_month.values(
-                    "killmail_id",
-                    "victim_total_value",
-                    "victim_ship__id",
-                    "victim_ship__name",
-                ).order_by("-victim_total_value")
-
-                output = {
-                    "stats": {
-                        "alltime_killer": alltime_killer.first(),
-                        "alltime_victim": alltime_victim.first(),
-                        "top_ship": top_ship.first(),
-                        "top_victim_ship": top_victim_ship.first(),
-                        "top_victim": top_victim.first(),
-                        "top_killer": top_killer.first(),
-                        "highest_kill": highest_kill.first(),
-                        "highest_loss": highest_loss.first(),
-                    }
-                }
                 api_helper.set_cache_key(cache_key, output)
 
             return output
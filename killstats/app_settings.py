@@ -22,11 +22,71 @@ STORAGE_BASE_KEY = "killstats_storage_"
 KILLSTATS_STORAGE_LIFETIME = getattr(
     settings, "KILLSTATS_STORAGE_LIFETIME", 3_600 * 24 * 3
 )
+# Decoded killmails from temporary storage cached per worker process
+KILLSTATS_KILLMAIL_CACHE_SIZE = getattr(
+    settings, "KILLSTATS_KILLMAIL_CACHE_SIZE", 1_000
+)
+# Seconds a decoded killmail is cached per worker process
+KILLSTATS_KILLMAIL_CACHE_TIMEOUT = getattr(
+    settings, "KILLSTATS_KILLMAIL_CACHE_TIMEOUT", 300
+)
+# Latest killmails without a tracked entity kept for corporations/alliances added later (0 = none)
+KILLSTATS_UNMATCHED_BUFFER_SIZE = getattr(
+    settings, "KILLSTATS_UNMATCHED_BUFFER_SIZE", 2_000
+)
+# Memory budget of these killmails in bytes, the oldest are evicted first
+KILLSTATS_UNMATCHED_BUFFER_MAX_BYTES = getattr(
+    settings, "KILLSTATS_UNMATCHED_BUFFER_MAX_BYTES", 16 * 1024 * 1024
+)
+# Attackers of killmails with at least this many attackers are kept column-wise (None = never)
+KILLSTATS_ATTACKER_COLUMNS_THRESHOLD = getattr(
+    settings, "KILLSTATS_ATTACKER_COLUMNS_THRESHOLD", 100
+)
+# Killmails in temporary storage larger than this many bytes are compressed (None = never)
+KILLSTATS_STORAGE_COMPRESS_THRESHOLD = getattr(
+    settings, "KILLSTATS_STORAGE_COMPRESS_THRESHOLD", 2048
+)
 
 KILLSTATS_BULK_BATCH_SIZE = getattr(settings, "KILLSTATS_BULK_BATCH_SIZE", 500)
 
-# Max lifetime of API Cache (10 min)
-KILLSTATS_API_CACHE_LIFETIME = getattr(settings, "KILLSTATS_API_CACHE_LIFETIME", 10)
+# Max killmails stored together in one transaction
+KILLSTATS_STORE_BATCH_SIZE = getattr(settings, "KILLSTATS_STORE_BATCH_SIZE", 50)
+# Seconds a stored killmail ID is remembered to drop duplicate store requests
+KILLSTATS_STORE_IDEMPOTENCY_TIMEOUT = getattr(
+    settings, "KILLSTATS_STORE_IDEMPOTENCY_TIMEOUT", 3_600
+)
+
+# Max entities (ID, name, category) cached per worker process
+KILLSTATS_ENTITY_CACHE_SIZE = getattr(settings, "KILLSTATS_ENTITY_CACHE_SIZE", 100_000)
+# Seconds until an ID ESI could not resolve is requested again
+KILLSTATS_ENTITY_NEGATIVE_TIMEOUT = getattr(
+    settings, "KILLSTATS_ENTITY_NEGATIVE_TIMEOUT", 3_600 * 24
+)
+
+# Seconds between checks of the SDE version for the preloaded SDE lookup tables
+KILLSTATS_SDE_VERSION_CHECK_INTERVAL = getattr(
+    settings, "KILLSTATS_SDE_VERSION_CHECK_INTERVAL", 300
+)
+
+# Max lifetime of API Cache (2 hours), stored killmails invalidate their months
+KILLSTATS_API_CACHE_LIFETIME = getattr(settings, "KILLSTATS_API_CACHE_LIFETIME", 120)
+
+# Minutes an expired API response is still served while it is refreshed
+KILLSTATS_API_CACHE_STALE_LIFETIME = getattr(
+    settings, "KILLSTATS_API_CACHE_STALE_LIFETIME", 10
+)
+
+# Minutes API responses of closed months are cached (30 days),
+# stored killmails of a closed month reopen it
+KILLSTATS_API_CACHE_CLOSED_LIFETIME = getattr(
+    settings, "KILLSTATS_API_CACHE_CLOSED_LIFETIME", 60 * 24 * 30
+)
+
+# Random share the API cache lifetime varies by, so keys don't expire together
+KILLSTATS_API_CACHE_JITTER = getattr(settings, "KILLSTATS_API_CACHE_JITTER", 0.1)
+
+# Precompute the current month of entities with new killmails after storing them
+KILLSTATS_API_CACHE_WARMING = getattr(settings, "KILLSTATS_API_CACHE_WARMING", True)
 
 # Tasks max time limit in seconds
 KILLSTATS_TASKS_TIME_LIMIT = getattr(settings, "KILLSTATS_TASKS_TIME_LIMIT", 1800)
@@ -36,5 +96,30 @@ KILLSTATS_TASKS_TIMEOUT = getattr(settings, "KILLSTATS_TASKS_TIMEOUT", 600)
 # Rate limiting for zKillboard RedisQ requests
 # Max seconds to wait trying to acquire a rate slot (0 = don't wait)
 KILLSTATS_ZKB_RATE_TIMEOUT = getattr(settings, "KILLSTATS_ZKB_RATE_TIMEOUT", 10)
+# Max seconds to wait trying to acquire an ESI rate slot (0 = don't wait)
+KILLSTATS_ESI_RATE_TIMEOUT = getattr(settings, "KILLSTATS_ESI_RATE_TIMEOUT", 10)
 # Maximum allowed requests per second across all workers/processes
 KILLSTATS_MAX_ZKB_PER_SEC = getattr(settings, "KILLSTATS_MAX_ZKB_PER_SEC", 2)
+# Override rate limit budgets per endpoint ("zkb_r2z2", "zkb_api", "esi", "cache_warm")
+# e.g. {"esi": {"rate": 10, "burst": 10}}
+KILLSTATS_RATE_LIMITS = getattr(settings, "KILLSTATS_RATE_LIMITS", {})
+# Keep-alive connections per zKillboard host and worker process
+KILLSTATS_ZKB_POOL_SIZE = getattr(settings, "KILLSTATS_ZKB_POOL_SIZE", 4)
+
+# zKillboard R2Z2 ingestion
+# Persist the sequence cursor to the database every n sequences (Redis is updated on every sequence)
+KILLSTATS_R2Z2_CURSOR_PERSIST_INTERVAL = getattr(
+    settings, "KILLSTATS_R2Z2_CURSOR_PERSIST_INTERVAL", 25
+)
+# Maximum sequences to catch up after a downtime, older sequences are refilled as gaps
+KILLSTATS_R2Z2_MAX_BACKLOG = getattr(settings, "KILLSTATS_R2Z2_MAX_BACKLOG", 10_000)
+# Sequences downloaded ahead while processing (1 = no prefetch)
+KILLSTATS_R2Z2_PREFETCH = getattr(settings, "KILLSTATS_R2Z2_PREFETCH", 4)
+# Seconds a gap run refills skipped sequences, it stops earlier at the zKB rate limit
+KILLSTATS_R2Z2_GAP_TIME_BUDGET = getattr(
+    settings, "KILLSTATS_R2Z2_GAP_TIME_BUDGET", 600
+)
+# Refill attempts before a skipped sequence is dropped
+KILLSTATS_R2Z2_GAP_MAX_ATTEMPTS = getattr(
+    settings, "KILLSTATS_R2Z2_GAP_MAX_ATTEMPTS", 3
+)
@@ -8,5 +8,25 @@ from killstats import __title__
 REQUESTS_TIMEOUT = (5, 30)
 RETRY_DELAY = 10
 
-LAST_REQUEST_KEY = f"{__title__.upper()}_R2Z2_LAST_REQUEST"
-RETRY_AFTER_KEY = f"{__title__.upper()}_R2Z2_RETRY_AFTER"
+RATELIMIT_KEY = f"{__title__.upper()}_RATELIMIT"
+
+R2Z2_CURSOR_KEY = f"{__title__.upper()}_R2Z2_CURSOR"
+
+STORE_QUEUE_KEY = f"{__title__.upper()}_STORE_QUEUE"
+STORE_CLAIM_KEY = f"{__title__.upper()}_STORE_CLAIM"
+STORE_METRICS_KEY = f"{__title__.upper()}_STORE_METRICS"
+STORE_DEAD_LETTER_KEY = f"{__title__.upper()}_STORE_DEAD_LETTER"
+
+UNMATCHED_BUFFER_KEY = f"{__title__.upper()}_UNMATCHED_BUFFER"
+UNMATCHED_BUFFER_SIZE_KEY = f"{__title__.upper()}_UNMATCHED_BUFFER_SIZE"
+
+ENTITY_KNOWN_KEY = f"{__title__.upper()}_ENTITY_KNOWN"
+ENTITY_UNKNOWN_KEY = f"{__title__.upper()}_ENTITY_UNKNOWN"
+
+MAIN_INDEX_KEY = f"{__title__.upper()}_MAIN_INDEX"
+MAIN_INDEX_VERSION_KEY = f"{__title__.upper()}_MAIN_INDEX_VERSION"
+
+VISIBILITY_KEY = f"{__title__.upper()}_VISIBILITY"
+VISIBILITY_VERSION_KEY = f"{__title__.upper()}_VISIBILITY_VERSION"
+STATS_GENERATION_KEY = f"{__title__.upper()}_STATS_GENERATION"
+CACHE_WARMING_KEY = f"{__title__.upper()}_CACHE_WARMING"
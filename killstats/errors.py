@@ -3,3 +3,7 @@
 
 class ObjectNotFound(Exception):
     """Custom exception to indicate that an object was not found."""
+
+
+class EsiUnavailable(Exception):
+    """ESI failed or rate limited a request, it can be retried later."""
@@ -0,0 +1,115 @@
+"""Cache of API responses with stampede protection."""
+
+# Standard Library
+import random
+import time
+from typing import Any, NamedTuple, Optional
+
+# Django
+from django.core.cache import cache
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import (
+    KILLSTATS_API_CACHE_JITTER,
+    KILLSTATS_API_CACHE_LIFETIME,
+    KILLSTATS_API_CACHE_STALE_LIFETIME,
+)
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds a refresh lock is held at most, if the refreshing request fails
+REFRESH_LOCK_TIMEOUT = 30
+# Seconds to wait for another request computing a key without any cached value
+REFRESH_WAIT_TIMEOUT = 5.0
+REFRESH_WAIT_INTERVAL = 0.1
+
+
+class CachedValue(NamedTuple):
+    value: Any
+    # Unix time after which the value is stale
+    fresh_until: float
+
+
+class ApiCache:
+    """Cache of API responses with soft and hard expiry.
+
+    Values are fresh until their soft expiry and served stale until the
+    hard expiry ``stale_lifetime`` seconds later. Soft expiries are jittered
+    so keys cached together don't expire together.
+    Only the request holding the refresh lock of a key recomputes it,
+    concurrent requests get the stale value, or wait for the first value
+    of a key which has none.
+    """
+
+    def __init__(self, lifetime: float, stale_lifetime: float, jitter: float):
+        self.lifetime = lifetime
+        self.stale_lifetime = stale_lifetime
+        self.jitter = jitter
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{key}_REFRESH"
+
+    @staticmethod
+    def _get_entry(key: str) -> Optional[CachedValue]:
+        entry = cache.get(key)
+        # Values cached before soft expiry was added are treated as missing
+        return entry if isinstance(entry, CachedValue) else None
+
+    def get(self, key: str, wait: bool = True) -> tuple[Any, bool]:
+        """Return the cached value and whether the caller has to refresh it.
+
+        A caller which has to refresh holds the refresh lock
+        until it stores the new value with ``set``.
+        Without ``wait`` a key without value refreshed by another request
+        returns None at once.
+        """
+        entry = self._get_entry(key)
+        if entry is not None and entry.fresh_until > time.time():
+            return entry.value, False
+
+        if cache.add(self._lock_key(key), 1, timeout=REFRESH_LOCK_TIMEOUT):
+            return None, True
+
+        if entry is not None:
+            logger.debug("Cache stale, refreshed by another request: %s", key)
+            return entry.value, False
+        if not wait:
+            return None, False
+
+        deadline = time.monotonic() + REFRESH_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(REFRESH_WAIT_INTERVAL)
+            entry = self._get_entry(key)
+            if entry is not None:
+                return entry.value, False
+        logger.debug("Cache refresh by another request timed out: %s", key)
+        return None, True
+
+    def max_timeout(self, lifetime: Optional[float] = None) -> int:
+        """Return the seconds a value cached with the lifetime is kept at most."""
+        lifetime = self.lifetime if lifetime is None else lifetime
+        return int(lifetime * (1 + self.jitter) + self.stale_lifetime) + 1
+
+    def set(self, key: str, value: Any, lifetime: Optional[float] = None) -> None:
+        """Cache a value and release the refresh lock of the key."""
+        lifetime = self.lifetime if lifetime is None else lifetime
+        lifetime *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        cache.set(
+            key,
+            CachedValue(value, time.time() + lifetime),
+            timeout=int(lifetime + self.stale_lifetime),
+        )
+        cache.delete(self._lock_key(key))
+
+
+api_cache = ApiCache(
+    lifetime=60 * KILLSTATS_API_CACHE_LIFETIME,
+    stale_lifetime=60 * KILLSTATS_API_CACHE_STALE_LIFETIME,
+    jitter=KILLSTATS_API_CACHE_JITTER,
+)
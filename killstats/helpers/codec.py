@@ -0,0 +1,213 @@
+"""Compact storage format for dataclasses."""
+
+# Standard Library
+import json
+import struct
+import types
+import typing
+import zlib
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Optional
+
+try:
+    # Third Party
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    # Third Party
+    import orjson
+except ImportError:
+    orjson = None
+
+SERIALIZER_JSON = 0
+SERIALIZER_ORJSON = 1
+SERIALIZER_MSGPACK = 2
+
+FLAG_COMPRESSED = 1
+
+# magic, serializer, flags, schema fingerprint
+_HEADER = struct.Struct(">2sBBI")
+_MAGIC = b"KS"
+
+
+class CodecError(ValueError):
+    """Data can't be decoded with this codec."""
+
+
+def _json_dumps(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+_SERIALIZERS = {
+    SERIALIZER_JSON: (_json_dumps, json.loads),
+}
+if orjson is not None:
+    _SERIALIZERS[SERIALIZER_ORJSON] = (orjson.dumps, orjson.loads)
+if msgpack is not None:
+    _SERIALIZERS[SERIALIZER_MSGPACK] = (
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda raw: msgpack.unpackb(raw, raw=False, strict_map_key=False),
+    )
+
+
+def default_serializer() -> int:
+    """Return the fastest available serializer."""
+    if msgpack is not None:
+        return SERIALIZER_MSGPACK
+    if orjson is not None:
+        return SERIALIZER_ORJSON
+    return SERIALIZER_JSON
+
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+
+def _optional(encode: Encoder, decode: Decoder) -> tuple[Encoder, Decoder]:
+    return (
+        lambda value: None if value is None else encode(value),
+        lambda value: None if value is None else decode(value),
+    )
+
+
+def _encode_datetime(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class DataclassCodec:
+    """Encode a tree of dataclasses into compact bytes and back.
+
+    Encoders and decoders are generated once per dataclass from its fields.
+    Dataclasses are stored as rows of their field values in field order,
+    without field names, and are created again without any validation.
+    Rows are serialized with msgpack or orjson if installed, else with json,
+    and compressed with zlib when larger than ``compress_threshold`` bytes.
+
+    The header records serializer, compression and a fingerprint of the
+    fields, data written for other fields raises ``CodecError``.
+    """
+
+    def __init__(
+        self,
+        data_class: type,
+        compress_threshold: Optional[int] = None,
+        serializer: Optional[int] = None,
+    ):
+        self.data_class = data_class
+        self.compress_threshold = compress_threshold
+        self.serializer = default_serializer() if serializer is None else serializer
+        if self.serializer not in _SERIALIZERS:
+            raise ValueError(f"Serializer {self.serializer} is not available.")
+        self._codecs: dict[type, tuple[Encoder, Decoder]] = {}
+        self._layout: list[str] = []
+        self._encode, self._decode = self._dataclass_codec(data_class)
+        self.fingerprint = zlib.crc32(";".join(self._layout).encode())
+
+    def _type_codec(self, tp) -> Optional[tuple[Encoder, Decoder]]:
+        """Return encoder and decoder for a field type, None if stored as is."""
+        origin = typing.get_origin(tp)
+        if origin in (typing.Union, types.UnionType):
+            args = [arg for arg in typing.get_args(tp) if arg is not type(None)]
+            codec = self._type_codec(args[0]) if len(args) == 1 else None
+            return _optional(*codec) if codec else None
+        if origin is list:
+            args = typing.get_args(tp)
+            codec = self._type_codec(args[0]) if args else None
+            if codec is None:
+                return None
+            encode, decode = codec
+            return _optional(
+                lambda values: [encode(value) for value in values],
+                lambda rows: [decode(row) for row in rows],
+            )
+        if is_dataclass(tp):
+            return self._dataclass_codec(tp)
+        if tp is datetime:
+            return _encode_datetime, _decode_datetime
+        return None
+
+    def _dataclass_codec(self, data_class: type) -> tuple[Encoder, Decoder]:
+        if data_class in self._codecs:
+            return self._codecs[data_class]
+
+        hints = typing.get_type_hints(data_class)
+        names = [f.name for f in fields(data_class)]
+        field_codecs = [self._type_codec(hints[name]) for name in names]
+        self._layout.append(f"{data_class.__name__}:{','.join(names)}")
+
+        if not any(field_codecs):
+            # Flat dataclass, values are taken and passed as they are
+            getter = attrgetter(*names)
+            if len(names) == 1:
+                codec = (lambda obj: [getter(obj)], lambda row: data_class(*row))
+            else:
+                codec = (getter, lambda row: data_class(*row))
+        else:
+            getters = [attrgetter(name) for name in names]
+            encoders = [
+                (getter, codec[0] if codec else None)
+                for getter, codec in zip(getters, field_codecs)
+            ]
+            decoders = [codec[1] if codec else None for codec in field_codecs]
+
+            def encode(obj):
+                return [
+                    encoder(getter(obj)) if encoder else getter(obj)
+                    for getter, encoder in encoders
+                ]
+
+            def decode(row):
+                return data_class(
+                    *[
+                        decoder(value) if decoder else value
+                        for decoder, value in zip(decoders, row)
+                    ]
+                )
+
+            codec = (encode, decode)
+
+        self._codecs[data_class] = codec
+        return codec
+
+    def encode(self, obj) -> bytes:
+        """Return the object as bytes."""
+        dumps, _ = _SERIALIZERS[self.serializer]
+        payload = dumps(self._encode(obj))
+        flags = 0
+        if (
+            self.compress_threshold is not None
+            and len(payload) > self.compress_threshold
+        ):
+            payload = zlib.compress(payload, 1)
+            flags |= FLAG_COMPRESSED
+        return _HEADER.pack(_MAGIC, self.serializer, flags, self.fingerprint) + payload
+
+    @staticmethod
+    def is_encoded(data) -> bool:
+        """Return True if data was created by a codec."""
+        return isinstance(data, (bytes, bytearray)) and data[:2] == _MAGIC
+
+    def decode(self, data: bytes):
+        """Create the object from bytes."""
+        if not self.is_encoded(data) or len(data) < _HEADER.size:
+            raise CodecError("Data was not created by a codec.")
+        _, serializer, flags, fingerprint = _HEADER.unpack_from(data)
+        if fingerprint != self.fingerprint:
+            raise CodecError("Data was created for different fields.")
+        try:
+            _, loads = _SERIALIZERS[serializer]
+        except KeyError as exc:
+            raise CodecError(f"Serializer {serializer} is not available.") from exc
+        payload = data[_HEADER.size :]
+        if flags & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+        return self._decode(loads(payload))
@@ -0,0 +1,150 @@
+"""Cached resolution of EveEntity IDs."""
+
+# Standard Library
+from collections.abc import Iterable
+
+# Django
+from django.core.cache import cache
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import (
+    KILLSTATS_ENTITY_CACHE_SIZE,
+    KILLSTATS_ENTITY_NEGATIVE_TIMEOUT,
+)
+from killstats.constants import ENTITY_KNOWN_KEY, ENTITY_UNKNOWN_KEY
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.lru import LRUCache
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds until the shared set of known IDs is rebuilt from the database
+KNOWN_IDS_TIMEOUT = 3_600 * 24
+
+
+class EveEntityResolver:
+    """Resolve EveEntity IDs with as few database lookups and ESI requests as possible.
+
+    IDs are looked up in this order:
+    - an in-process LRU cache of ID to (name, category)
+    - a Redis set of IDs known to exist in the database, shared by all workers
+    - the database
+    - a negative cache of IDs ESI rejected as unknown
+    - ESI, with one request for all remaining IDs
+    """
+
+    def __init__(self, maxsize: int, negative_timeout: int):
+        self.negative_timeout = negative_timeout
+        self._names = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def _unknown_key(eve_id: int) -> str:
+        return f"{ENTITY_UNKNOWN_KEY}_{eve_id}"
+
+    def _remember(self, rows: Iterable[tuple[int, str, str]]) -> set[int]:
+        """Add (id, name, category) rows to the caches and return their IDs."""
+        names = {eve_id: (name, category) for eve_id, name, category in rows}
+        if names:
+            self._names.set_many(names)
+            redis = get_redis_client()
+            pipe = redis.pipeline()
+            pipe.sadd(ENTITY_KNOWN_KEY, *names)
+            pipe.expire(ENTITY_KNOWN_KEY, KNOWN_IDS_TIMEOUT, nx=True)
+            pipe.execute()
+        return set(names)
+
+    def _load_from_database(self, eve_ids: set[int]) -> set[int]:
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.general import EveEntity
+
+        return self._remember(
+            EveEntity.objects.filter(id__in=eve_ids).values_list(
+                "id", "name", "category"
+            )
+        )
+
+    def known_ids(self, eve_ids: Iterable[int]) -> set[int]:
+        """Return the given IDs which exist in the database."""
+        missing_ids = set(eve_ids)
+        missing_ids.discard(None)
+
+        known_ids = set(self._names.get_many(missing_ids))
+        missing_ids -= known_ids
+        if not missing_ids:
+            return known_ids
+
+        lookup_ids = list(missing_ids)
+        is_member = get_redis_client().smismember(ENTITY_KNOWN_KEY, lookup_ids)
+        shared_ids = {eve_id for eve_id, member in zip(lookup_ids, is_member) if member}
+        known_ids |= shared_ids
+        missing_ids -= shared_ids
+        if missing_ids:
+            known_ids |= self._load_from_database(missing_ids)
+        return known_ids
+
+    def resolve(self, eve_ids: Iterable[int]) -> set[int]:
+        """Return the given IDs which exist in the database after creating
+        missing entities with data fetched from ESI.
+
+        IDs ESI rejects as unknown are not requested again until the negative
+        cache expires. Other ESI errors are raised, so the caller can retry.
+        """
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.general import EveEntity
+
+        eve_ids = set(eve_ids)
+        eve_ids.discard(None)
+        known_ids = self.known_ids(eve_ids)
+        missing_ids = eve_ids - known_ids
+        if not missing_ids:
+            return known_ids
+
+        unknown_keys = cache.get_many(
+            [self._unknown_key(eve_id) for eve_id in missing_ids]
+        )
+        missing_ids = {
+            eve_id
+            for eve_id in missing_ids
+            if self._unknown_key(eve_id) not in unknown_keys
+        }
+        if not missing_ids:
+            return known_ids
+
+        rejected_ids = EveEntity.objects.create_missing_from_esi(missing_ids)
+        created_ids = self._load_from_database(missing_ids)
+        rejected_ids -= created_ids
+        if rejected_ids:
+            logger.debug("ESI rejected IDs %s", rejected_ids)
+            cache.set_many(
+                {self._unknown_key(eve_id): True for eve_id in rejected_ids},
+                timeout=self.negative_timeout,
+            )
+        return known_ids | created_ids
+
+    def get(self, eve_id: int) -> tuple[str, str] | None:
+        """Return (name, category) of a known entity or None."""
+        name = self._names.get(eve_id)
+        if name is None and self._load_from_database({eve_id}):
+            name = self._names.get(eve_id)
+        return name
+
+    def forget(self, eve_id: int) -> None:
+        """Remove an entity from the caches, e.g. after it has been deleted."""
+        self._names.delete(eve_id)
+        get_redis_client().srem(ENTITY_KNOWN_KEY, eve_id)
+
+    def clear(self) -> None:
+        """Clear the in-process cache."""
+        self._names.clear()
+
+
+entity_resolver = EveEntityResolver(
+    maxsize=KILLSTATS_ENTITY_CACHE_SIZE,
+    negative_timeout=KILLSTATS_ENTITY_NEGATIVE_TIMEOUT,
+)
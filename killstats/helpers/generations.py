@@ -0,0 +1,127 @@
+"""Generation counters of the stats of corporations and alliances."""
+
+# Standard Library
+import hashlib
+from collections.abc import Iterable
+from typing import Optional
+
+# Django
+from django.core.cache import cache
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import (
+    KILLSTATS_API_CACHE_CLOSED_LIFETIME,
+    KILLSTATS_API_CACHE_LIFETIME,
+)
+from killstats.constants import STATS_GENERATION_KEY
+from killstats.helpers.apicache import api_cache
+from killstats.helpers.core import get_redis_client
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds a counter is kept after its last change, longer than any cached response
+GENERATION_TIMEOUT = 3_600 * 24 * 7
+
+# entity ID, year, month
+Bucket = tuple[int, int, int]
+
+
+class StatsGenerations:
+    """Generation counters per entity and month, and per entity and year.
+
+    The storage path bumps the counters of every bucket with changed
+    killmails, cache keys of API responses contain the counters they depend on.
+    Changed months get new cache keys, all other responses stay cached.
+
+    Responses of closed months and years are snapshots without counters in
+    their cache keys, registered per bucket. Bumping a bucket deletes its
+    snapshots, so browsing closed months costs a single cache lookup.
+    """
+
+    def __init__(self, key: str, timeout: int, snapshot_timeout: int):
+        self.key = key
+        self.timeout = timeout
+        self.snapshot_timeout = snapshot_timeout
+
+    def _key(self, entity_id: int, year, month=None) -> str:
+        if month is None:
+            return f"{self.key}_{entity_id}_{int(year)}"
+        return f"{self.key}_{entity_id}_{int(year)}_{int(month)}"
+
+    @staticmethod
+    def _snapshots_key(key: str) -> str:
+        return f"{key}_SNAPSHOTS"
+
+    def bump(self, buckets: Iterable[Bucket]) -> None:
+        """Bump the counters of the months and their years, and reopen their snapshots."""
+        keys = set()
+        for entity_id, year, month in buckets:
+            keys.add(self._key(entity_id, year, month))
+            keys.add(self._key(entity_id, year))
+        if not keys:
+            return
+        pipe = get_redis_client().pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+            pipe.expire(key, self.timeout)
+        for key in keys:
+            pipe.smembers(self._snapshots_key(key))
+            pipe.delete(self._snapshots_key(key))
+        results = pipe.execute()[2 * len(keys) :]
+        snapshots = {
+            snapshot.decode() for members in results[::2] for snapshot in members
+        }
+        if snapshots:
+            cache.delete_many(snapshots)
+        logger.debug(
+            "Stats generations bumped: %s, snapshots reopened: %s",
+            len(keys),
+            len(snapshots),
+        )
+
+    def register_snapshot(
+        self, cache_key: str, entity_ids: Iterable[int], year, month=None
+    ) -> None:
+        """Register a cached response of a closed month or year of the entities."""
+        pipe = get_redis_client().pipeline(transaction=False)
+        for entity_id in entity_ids:
+            snapshots_key = self._snapshots_key(self._key(entity_id, year, month))
+            pipe.sadd(snapshots_key, cache_key)
+            pipe.expire(snapshots_key, self.snapshot_timeout)
+        pipe.execute()
+
+    def token(self, entity_ids: Iterable[int], year, month=None) -> str:
+        """Return a cache key part which changes with the counters of the entities.
+
+        Without a month the counters of the year are used.
+        """
+        keys = [self._key(entity_id, year, month) for entity_id in sorted(entity_ids)]
+        if not keys:
+            return "0"
+        generations = get_redis_client().mget(keys)
+        combined = "_".join(
+            generation.decode() if generation else "0" for generation in generations
+        )
+        if len(keys) == 1:
+            return combined
+        return hashlib.md5(combined.encode()).hexdigest()
+
+    def generation(self, entity_id: int, year, month=None) -> Optional[int]:
+        """Return the counter of one bucket."""
+        generation = get_redis_client().get(self._key(entity_id, year, month))
+        return int(generation) if generation else None
+
+
+stats_generations = StatsGenerations(
+    STATS_GENERATION_KEY,
+    GENERATION_TIMEOUT,
+    # Snapshots are registered as long as their cached response can be served
+    snapshot_timeout=api_cache.max_timeout(
+        60 * max(KILLSTATS_API_CACHE_CLOSED_LIFETIME, KILLSTATS_API_CACHE_LIFETIME)
+    ),
+)
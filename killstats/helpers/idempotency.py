@@ -0,0 +1,104 @@
+"""Idempotency guard to process killmails at most once across all workers."""
+
+# Standard Library
+from collections.abc import Iterable
+
+# AA Killstats
+from killstats.app_settings import (
+    KILLSTATS_STORAGE_LIFETIME,
+    KILLSTATS_STORE_IDEMPOTENCY_TIMEOUT,
+)
+from killstats.constants import STORE_CLAIM_KEY, STORE_METRICS_KEY
+from killstats.helpers.core import get_redis_client
+
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+
+# Claim an ID and count the claim or the coalesced duplicate in one round trip
+CLAIM_SCRIPT = """
+if redis.call("SET", KEYS[1], ARGV[1], "NX", "EX", ARGV[2]) then
+    redis.call("HINCRBY", KEYS[2], "claimed", 1)
+    return 1
+end
+redis.call("HINCRBY", KEYS[2], "coalesced", 1)
+return 0
+"""
+
+
+class IdempotencyGuard:
+    """Single-flight claims in Redis, one key per ID.
+
+    The first claim of an ID wins and stays ``pending`` until the ID is
+    completed or released. Completed IDs are kept as ``done`` for
+    ``done_timeout`` seconds, so late duplicates are coalesced as well.
+    Released IDs can be claimed again.
+
+    Claims, coalesced duplicates, completed and released IDs are counted
+    in a Redis hash shared by all workers.
+    """
+
+    def __init__(
+        self, key: str, metrics_key: str, pending_timeout: int, done_timeout: int
+    ):
+        self.key = key
+        self.metrics_key = metrics_key
+        self.pending_timeout = pending_timeout
+        self.done_timeout = done_timeout
+        self._claim_script = None
+
+    def _claim_key(self, claim_id: int) -> str:
+        return f"{self.key}_{claim_id}"
+
+    def claim(self, claim_id: int) -> bool:
+        """Claim the ID, return False if it is claimed already."""
+        if self._claim_script is None:
+            self._claim_script = get_redis_client().register_script(CLAIM_SCRIPT)
+        return bool(
+            self._claim_script(
+                keys=[self._claim_key(claim_id), self.metrics_key],
+                args=[STATE_PENDING, self.pending_timeout],
+            )
+        )
+
+    def complete(self, claim_ids: Iterable[int]) -> None:
+        """Mark the IDs as done, duplicates are coalesced until the claim expires."""
+        self._finish(claim_ids, "completed")
+
+    def release(self, claim_ids: Iterable[int]) -> None:
+        """Drop the claims, the IDs can be claimed again."""
+        self._finish(claim_ids, "released")
+
+    def _finish(self, claim_ids: Iterable[int], metric: str) -> None:
+        keys = [self._claim_key(claim_id) for claim_id in claim_ids]
+        if not keys:
+            return
+        pipe = get_redis_client().pipeline(transaction=False)
+        for key in keys:
+            if metric == "completed":
+                pipe.set(key, STATE_DONE, ex=self.done_timeout)
+            else:
+                pipe.delete(key)
+        pipe.hincrby(self.metrics_key, metric, len(keys))
+        pipe.execute()
+
+    def state(self, claim_id: int) -> str | None:
+        """Return the state of the ID, None if not claimed."""
+        state = get_redis_client().get(self._claim_key(claim_id))
+        return state.decode() if state else None
+
+    def metrics(self) -> dict[str, int]:
+        """Return the counters of all workers."""
+        return {
+            field.decode(): int(value)
+            for field, value in get_redis_client().hgetall(self.metrics_key).items()
+        }
+
+
+# Killmails are stored at most once, pending claims live as long as the
+# killmail is kept in the temporary storage.
+store_guard = IdempotencyGuard(
+    key=STORE_CLAIM_KEY,
+    metrics_key=STORE_METRICS_KEY,
+    pending_timeout=KILLSTATS_STORAGE_LIFETIME,
+    done_timeout=KILLSTATS_STORE_IDEMPOTENCY_TIMEOUT,
+)
@@ -1,6 +1,8 @@
 # Standard Library
 import json
-import time
+import math
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import asdict, dataclass, field, is_dataclass
 from datetime import datetime
 from http import HTTPStatus
@@ -13,20 +15,19 @@ from dacite import DaciteError, from_dict
 
 # Django
 from django.core.cache import cache
-from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
 # Alliance Auth
 from allianceauth.services.hooks import get_extension_logger
 
-# Alliance Auth (External Libs)
-from eve_sde.models.map import SolarSystem
-from eve_sde.models.types import ItemType
-
 # AA Killstats
-from killstats import USER_AGENT_TEXT, __title__, __version__
+from killstats import __title__, __version__
 from killstats.app_settings import (
-    KILLSTATS_MAX_ZKB_PER_SEC,
+    KILLSTATS_ATTACKER_COLUMNS_THRESHOLD,
+    KILLSTATS_ESI_RATE_TIMEOUT,
+    KILLSTATS_KILLMAIL_CACHE_SIZE,
+    KILLSTATS_KILLMAIL_CACHE_TIMEOUT,
+    KILLSTATS_STORAGE_COMPRESS_THRESHOLD,
     KILLSTATS_STORAGE_LIFETIME,
     KILLSTATS_ZKB_RATE_TIMEOUT,
     STORAGE_BASE_KEY,
@@ -34,13 +35,19 @@ from killstats.app_settings import (
     ZKILLBOARD_R2Z2_SEQUENCE_URL,
     ZKILLBOARD_R2Z2_URL,
 )
-from killstats.constants import (
-    LAST_REQUEST_KEY,
-    REQUESTS_TIMEOUT,
-    RETRY_AFTER_KEY,
-    RETRY_DELAY,
-)
+from killstats.constants import RETRY_DELAY
+from killstats.helpers.codec import CodecError, DataclassCodec
 from killstats.helpers.core import JSONDateTimeDecoder, JSONDateTimeEncoder
+from killstats.helpers.entities import entity_resolver
+from killstats.helpers.lru import LRUCache
+from killstats.helpers.ratelimit import (
+    ESI,
+    ZKB_API,
+    ZKB_R2Z2,
+    ratelimiter,
+)
+from killstats.helpers.sde import sde
+from killstats.helpers.zkillboard import zkb
 from killstats.models.general import EveEntity
 from killstats.models.killboard import Attacker
 from killstats.providers import AppLogger, esi
@@ -83,7 +90,15 @@ class KillmailDoesNotExist(KillboardException):
     """Killmail does not exist in storage."""
 
 
-@dataclass
+class R2Z2SequenceUnavailable(KillboardException):
+    """Sequence from zKB R2Z2 can not be processed and should be skipped."""
+
+
+class R2Z2SequenceNotFound(R2Z2SequenceUnavailable):
+    """Sequence does not exist (yet) on zKB R2Z2."""
+
+
+@dataclass(slots=True)
 class _KillmailBase:
     """Base class for all Killmail."""
 
@@ -100,7 +115,7 @@ def to_serializable_dict(obj):
         return {k: to_serializable_dict(v) for k, v in asdict(obj).items()}
     if isinstance(obj, dict):
         return {k: to_serializable_dict(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple, set)):
+    if isinstance(obj, (list, tuple, set, KillmailAttackerColumns)):
         return [to_serializable_dict(v) for v in obj]
     if hasattr(obj, "__dict__"):
         data = {}
@@ -112,7 +127,7 @@ def to_serializable_dict(obj):
     return obj
 
 
-@dataclass
+@dataclass(slots=True)
 class KillmailItems:
     flag: int
     item_type_id: int
@@ -122,7 +137,7 @@ class KillmailItems:
     singleton: int
 
 
-@dataclass
+@dataclass(slots=True)
 class _KillmailCharacter(_KillmailBase):
     ENTITY_PROPS = [
         "character_id",
@@ -139,7 +154,7 @@ class _KillmailCharacter(_KillmailBase):
     ship_type_id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KillmailPosition(_KillmailBase):
     "A position for a killmail."
 
@@ -148,7 +163,7 @@ class KillmailPosition(_KillmailBase):
     z: float | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KillmailVictim(_KillmailCharacter):
     """A victim on a killmail."""
 
@@ -157,7 +172,7 @@ class KillmailVictim(_KillmailCharacter):
     damage_taken: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KillmailAttacker(_KillmailCharacter):
     """An attacker on a killmail."""
 
@@ -169,7 +184,114 @@ class KillmailAttacker(_KillmailCharacter):
     weapon_type_id: int | None = None
 
 
-@dataclass
+class KillmailAttackerColumns(Sequence):
+    """Attackers of a killmail stored column-wise.
+
+    Behaves like a read-only list of ``KillmailAttacker``, attackers are created on access.
+    IDs and damage are kept in arrays of 64-bit integers with -1 for missing values,
+    missing security status is stored as NaN.
+    """
+
+    INT_FIELDS = (
+        "character_id",
+        "corporation_id",
+        "alliance_id",
+        "faction_id",
+        "ship_type_id",
+        "weapon_type_id",
+        "damage_done",
+    )
+
+    __slots__ = ("_ints", "_security_status", "_final_blow")
+
+    def __init__(self, attackers: Iterable[KillmailAttacker] = ()):
+        self._ints = tuple(array("q") for _ in self.INT_FIELDS)
+        self._security_status = array("d")
+        self._final_blow = array("b")
+        for attacker in attackers:
+            self._append(
+                [getattr(attacker, name) for name in self.INT_FIELDS],
+                attacker.security_status,
+                attacker.final_blow,
+            )
+
+    def _append(self, ints: list, security_status, final_blow) -> None:
+        for column, value in zip(self._ints, ints):
+            column.append(-1 if value is None else value)
+        self._security_status.append(
+            math.nan if security_status is None else security_status
+        )
+        self._final_blow.append(-1 if final_blow is None else int(final_blow))
+
+    @classmethod
+    def from_dicts(cls, attackers_data: Iterable[dict]) -> "KillmailAttackerColumns":
+        """Create from attacker dicts as returned by ESI."""
+        columns = cls()
+        for data in attackers_data:
+            columns._append(
+                [data.get(name) for name in cls.INT_FIELDS],
+                data.get("security_status"),
+                data.get("final_blow"),
+            )
+        return columns
+
+    def _attacker(self, index: int) -> KillmailAttacker:
+        ints = [column[index] for column in self._ints]
+        security_status = self._security_status[index]
+        final_blow = self._final_blow[index]
+        return KillmailAttacker(
+            **{
+                name: None if value == -1 else value
+                for name, value in zip(self.INT_FIELDS, ints)
+            },
+            security_status=None if math.isnan(security_status) else security_status,
+            final_blow=None if final_blow == -1 else bool(final_blow),
+        )
+
+    def __len__(self) -> int:
+        return len(self._final_blow)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._attacker(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("attacker index out of range")
+        return self._attacker(index)
+
+    def __iter__(self) -> Iterator[KillmailAttacker]:
+        for index in range(len(self)):
+            yield self._attacker(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, KillmailAttackerColumns)):
+            return len(self) == len(other) and all(
+                attacker == other_attacker
+                for attacker, other_attacker in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(attackers={len(self)})"
+
+
+def _compact_attackers(
+    attackers: Sequence[KillmailAttacker],
+) -> Sequence[KillmailAttacker]:
+    """Return attackers column-wise if there are enough of them."""
+    if (
+        KILLSTATS_ATTACKER_COLUMNS_THRESHOLD is not None
+        and not isinstance(attackers, KillmailAttackerColumns)
+        and len(attackers) >= KILLSTATS_ATTACKER_COLUMNS_THRESHOLD
+    ):
+        return KillmailAttackerColumns(attackers)
+    return attackers
+
+
+@dataclass(slots=True)
 class KillmailZkb(_KillmailBase):
     """A ZKB entry for a killmail."""
 
@@ -185,7 +307,7 @@ class KillmailZkb(_KillmailBase):
     is_awox: bool | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KillmailBody(_KillmailBase):
     """A killmail body as returned from ZKB or ZKB API."""
 
@@ -194,6 +316,7 @@ class KillmailBody(_KillmailBase):
     id: int
     time: datetime
     victim: KillmailVictim
+    # KillmailAttackerColumns for killmails with many attackers
     attackers: list[KillmailAttacker]
     position: KillmailPosition
     zkb: KillmailZkb
@@ -213,12 +336,23 @@ class KillmailBody(_KillmailBase):
         """Return distinct corporation IDs of all attackers."""
         return {obj.corporation_id for obj in self.attackers if obj.corporation_id}
 
+    def involved_entity_ids(self) -> set[int]:
+        """Return distinct corporation and alliance IDs of victim and attackers."""
+        entity_ids = {self.victim.corporation_id, self.victim.alliance_id}
+        for attacker in self.attackers:
+            entity_ids.add(attacker.corporation_id)
+            entity_ids.add(attacker.alliance_id)
+        entity_ids.discard(None)
+        return entity_ids
+
     def asjson(self) -> str:
         """Convert killmail into JSON data, ensuring all nested objects are serializable."""
         return json.dumps(to_serializable_dict(self), cls=JSONDateTimeEncoder)
 
     @staticmethod
     def _process_killmail_data(data: dict) -> dict | None:
+        if not ratelimiter.acquire(ESI, timeout=KILLSTATS_ESI_RATE_TIMEOUT):
+            raise ValueError("ESI rate limit reached, try again later.")
         try:
             killmail_id = data["killmail_id"]
             killmail_hash = data["zkb"]["hash"]
@@ -252,15 +386,20 @@ class KillmailBody(_KillmailBase):
         from killstats.models.killboard import Killmail
 
         cache_key = f"{STORAGE_BASE_KEY}_KILLMAIL_{killmail_id}"
-        killmail_json = cache.get(cache_key)
-        if killmail_json:
-            return KillmailBody.from_json(killmail_json)
+        killmail_data = cache.get(cache_key)
+        if killmail_data:
+            return KillmailBody.decode(killmail_data)
 
         logger.debug("Fetching killmail %s from zKillboard", killmail_id)
 
+        if not cls._rate_limit(ZKB_API):
+            raise ValueError("zKillboard rate limit reached, try again later.")
+
         url = f"{ZKILLBOARD_API_URL}killID/{killmail_id}/"
-        headers = {"User-Agent": USER_AGENT_TEXT, "Content-Type": "application/json"}
-        request_result = requests.get(url=url, headers=headers, timeout=5)
+        request_result = zkb.get(url, timeout=5)
+
+        if cls._too_many_requests_delay(request_result, ZKB_API):
+            raise ValueError("zKillboard rate limit reached, try again later.")
 
         try:
             request_result.raise_for_status()
@@ -299,68 +438,25 @@ class KillmailBody(_KillmailBase):
 
         killmail = cls._create_from_dict(zkb_killmail)
         if killmail:
-            cache.set(key=cache_key, value=killmail.asjson())
+            cache.set(key=cache_key, value=killmail.encode())
         return killmail
 
     @staticmethod
-    def _rate_limit() -> bool:
+    def _rate_limit(endpoint: str = ZKB_R2Z2) -> bool:
         """
-        Check and wait for zKB rate limit.
-        Returns True if it's ok to proceed, False if the rate limit was reached and
-        the operation should be skipped.
+        Reserve a request slot for the given zKB endpoint and wait for it.
+        Returns True if it's ok to proceed, False if the next slot is further away
+        than KILLSTATS_ZKB_RATE_TIMEOUT and the operation should be skipped.
         """
-        # pylint: disable=too-many-nested-blocks
-        last_iso = cache.get(LAST_REQUEST_KEY)
-        retry_after = cache.get(RETRY_AFTER_KEY)
-
-        if retry_after is not None:
-            retry_after: datetime = retry_after
-            wait_time = (retry_after - timezone.now()).total_seconds()
-            if wait_time > 0:
-                logger.warning(
-                    "ZKB rate limit requires waiting %.3fs due to Too Many Requests",
-                    wait_time,
-                )
-                time.sleep(wait_time)
-                return True
-            # Retry-After has passed, remove it
-            cache.delete(RETRY_AFTER_KEY)
-
-        if last_iso is not None:
-            last_dt = parse_datetime(last_iso)
-            if last_dt is not None:
-                # Minimum interval between requests in seconds
-                min_interval = 1.0 / float(KILLSTATS_MAX_ZKB_PER_SEC)
-                elapsed = (timezone.now() - last_dt).total_seconds()
-                if elapsed >= min_interval:
-                    return True
-
-                # Need to wait the remaining time (single sleep)
-                wait = min_interval - elapsed
-                if KILLSTATS_ZKB_RATE_TIMEOUT and KILLSTATS_ZKB_RATE_TIMEOUT > 0:
-                    if wait <= KILLSTATS_ZKB_RATE_TIMEOUT:
-                        logger.debug("ZKB rate limit requires waiting %.3fs", wait)
-                        time.sleep(wait)
-                        return True
-                    logger.warning(
-                        "ZKB rate limit requires waiting %.3fs which exceeds RATE_TIMEOUT (%.3fs). Skipping fetch.",
-                        wait,
-                        KILLSTATS_ZKB_RATE_TIMEOUT,
-                    )
-                    return False
-                logger.warning(
-                    "ZKB rate limit reached (need %.3fs wait). Skipping fetch.",
-                    wait,
-                )
-                return False
-        # if no last_request_key provided or no usable timestamp found, allow the request.
-        return True
+        return ratelimiter.acquire(endpoint, timeout=KILLSTATS_ZKB_RATE_TIMEOUT)
 
     @staticmethod
-    def _too_many_requests_delay(response: requests.Response) -> bool:
+    def _too_many_requests_delay(
+        response: requests.Response, endpoint: str = ZKB_R2Z2
+    ) -> bool:
         """
         Handles HTTP 429 Too Many Requests responses from ZKB.
-        If the response includes a 'Retry-After' header, sets a delay in the cache and returns True to indicate the operation should be retried later.
+        If the response includes a 'Retry-After' header, the endpoint is blocked for that time and returns True to indicate the operation should be retried later.
         If the header is missing, uses a default delay value.
         Returns False if the response status is not 429, indicating the operation can continue.
         """
@@ -371,17 +467,14 @@ class KillmailBody(_KillmailBase):
                     "Received 429 Too Many Requests. Retrying after %s seconds.",
                     wait_time,
                 )
-            except KeyError:
+            except (TypeError, ValueError):
                 logger.debug(
                     "Received 429 Too Many Requests without Retry-After header. Waiting default %s seconds.",
                     RETRY_DELAY,
                 )
                 wait_time = RETRY_DELAY
-            # Set the retry after time in cache
-            cache.set(
-                f"{__title__.upper()}_R2Z2_LAST_REQUEST_RETRY_AFTER",
-                timezone.now() + timezone.timedelta(seconds=wait_time),
-            )
+            # Block the endpoint and reduce its rate for all workers
+            ratelimiter.backoff(endpoint, wait_time)
             return True
         return False
 
@@ -398,11 +491,11 @@ class KillmailBody(_KillmailBase):
 
         logger.debug("Trying to fetch sequence from ZKB R2Z2...")
 
-        sequence = requests.get(
-            ZKILLBOARD_R2Z2_SEQUENCE_URL,
-            timeout=REQUESTS_TIMEOUT,
-            headers={"User-Agent": USER_AGENT_TEXT},
-        )
+        sequence = zkb.get(ZKILLBOARD_R2Z2_SEQUENCE_URL)
+
+        # Handle 429 Too Many Requests
+        if cls._too_many_requests_delay(sequence):
+            return None
 
         try:
             data = sequence.json()
@@ -410,13 +503,6 @@ class KillmailBody(_KillmailBase):
             logger.error("Error from ZKB R2Z2 Sequence:\n%s", sequence.text)
             return None
 
-        # Log this request timestamp for rate limiting
-        cache.set(LAST_REQUEST_KEY, timezone.now().isoformat())
-
-        # Handle 429 Too Many Requests
-        if cls._too_many_requests_delay(sequence):
-            return None
-
         if data and "sequence" in data:
             sequence_id = data["sequence"]
             logger.debug("Received sequence from ZKB R2Z2: %s", sequence_id)
@@ -427,12 +513,17 @@ class KillmailBody(_KillmailBase):
 
     # pylint: disable=too-many-return-statements
     @classmethod
-    def create_from_r2z2_sequence(cls, sequence_id: int) -> Optional["KillmailBody"]:
+    def create_from_r2z2_sequence(
+        cls, sequence_id: int, reserved: bool = False
+    ) -> Optional["KillmailBody"]:
         """Fetches killmail data from ZKB R2Z2 using the provided sequence ID, creates a KillmailBody object, and returns it.
 
-        Returns None if no killmail data is received or if the killmail cannot be created.
+        A caller which reserved the rate slot of the request already passes ``reserved``.
+        Returns None if the sequence can't be fetched right now (rate limit, shutdown).
+        Raises R2Z2SequenceNotFound if the sequence does not exist and
+        R2Z2SequenceUnavailable if the received data can't be processed.
         """
-        if not cls._rate_limit():
+        if not reserved and not cls._rate_limit():
             return None
 
         if not cache.get(f"{__title__.upper()}_WORKER_SHUTDOWN") is None:
@@ -441,14 +532,7 @@ class KillmailBody(_KillmailBase):
 
         logger.debug("Trying to fetch killmail from ZKB R2Z2...")
 
-        # Log this request timestamp for rate limiting
-        cache.set(LAST_REQUEST_KEY, timezone.now().isoformat())
-
-        response = requests.get(
-            ZKILLBOARD_R2Z2_URL + str(sequence_id) + ".json",
-            timeout=REQUESTS_TIMEOUT,
-            headers={"User-Agent": USER_AGENT_TEXT},
-        )
+        response = zkb.get(ZKILLBOARD_R2Z2_URL + str(sequence_id) + ".json")
 
         # Handle 429 Too Many Requests
         if KillmailBody._too_many_requests_delay(response):
@@ -456,34 +540,51 @@ class KillmailBody(_KillmailBase):
 
         if response.status_code == HTTPStatus.NOT_FOUND:
             logger.debug("No killmail found for sequence ID %s", sequence_id)
-            return None
+            raise R2Z2SequenceNotFound(f"Sequence {sequence_id} not found.")
 
         try:
             data = response.json()
-        except requests.JSONDecodeError:
+        except requests.JSONDecodeError as exc:
             logger.error("Error from ZKB API:\n%s", response.text)
-            return None
+            raise R2Z2SequenceUnavailable(
+                f"Sequence {sequence_id} returned invalid data."
+            ) from exc
 
+        killmail = None
         if data and "killmail_id" in data:
-            return cls._create_from_dict(data)
-        return None
+            killmail = cls._create_from_dict(data)
+        if not killmail:
+            raise R2Z2SequenceUnavailable(
+                f"Sequence {sequence_id} returned incomplete data."
+            )
+        return killmail
 
     def save(self) -> None:
         """Save this killmail to temporary storage."""
         cache.set(
             key=self._storage_key(self.id),
-            value=self.asjson(),
+            value=self.encode(),
             timeout=KILLSTATS_STORAGE_LIFETIME,
         )
+        _decoded_killmails.set(self.id, self)
         logger.debug("Cache created for %s", self.id)
 
     def delete(self) -> None:
         """Delete this killmail from temporary storage."""
         cache.delete(self._storage_key(self.id))
+        _decoded_killmails.delete(self.id)
+
+    @classmethod
+    def delete_many(cls, cache_ids: Iterable[int]) -> None:
+        """Delete killmails from temporary storage."""
+        cache_ids = list(cache_ids)
+        cache.delete_many([cls._storage_key(cache_id) for cache_id in cache_ids])
+        for cache_id in cache_ids:
+            _decoded_killmails.delete(cache_id)
 
     def create_names_bulk(self, eve_ids: list):
         if len(eve_ids) > 0:
-            EveEntity.objects.create_bulk_from_esi(eve_ids)
+            entity_resolver.resolve(eve_ids)
             return True
         return False
 
@@ -497,13 +598,8 @@ class KillmailBody(_KillmailBase):
 
     @staticmethod
     def get_region_id(solar_system_id: int) -> int:
-        """Get or create region ID from solar system ID."""
-        try:
-            solar_system = SolarSystem.objects.get(id=solar_system_id)
-            region_id = solar_system.constellation.region
-        except SolarSystem.DoesNotExist:
-            return None
-        return region_id.id
+        """Get region ID from solar system ID."""
+        return sde.region_id(solar_system_id)
 
     def get_or_create_attackers(self, killmail, killmail_body):
         for attacker in killmail_body.attackers:
@@ -519,9 +615,7 @@ class KillmailBody(_KillmailBase):
             if attacker.alliance_id:
                 alliance = self.get_or_create_entity(attacker.alliance_id)
 
-            ship = None
-            if attacker.ship_type_id:
-                ship = ItemType.objects.get(id=attacker.ship_type_id)
+            ship_id = sde.type_id(attacker.ship_type_id)
 
             Attacker.objects.get_or_create(
                 killmail=killmail,
@@ -529,7 +623,7 @@ class KillmailBody(_KillmailBase):
                 corporation=corporation,
                 alliance=alliance,
                 defaults={
-                    "ship": ship,
+                    "ship_id": ship_id,
                     "damage_done": attacker.damage_done,
                     "final_blow": attacker.final_blow,
                     "security_status": attacker.security_status,
@@ -540,13 +634,47 @@ class KillmailBody(_KillmailBase):
 
     @classmethod
     def get(cls, cache_id: int) -> "KillmailBody":
-        """Fetch a killmail from temporary storage."""
+        """Fetch a killmail from temporary storage.
+
+        Decoded killmails are cached per worker process, the returned
+        object may be shared and must not be changed.
+        """
+        killmail = _decoded_killmails.get(cache_id)
+        if killmail is not None:
+            return killmail
+        killmail = cls._get_from_storage(cache_id)
+        _decoded_killmails.set(cache_id, killmail)
+        return killmail
+
+    @staticmethod
+    def cache_info() -> dict:
+        """Return hits, misses and size of the decoded killmail cache."""
+        return {
+            "hits": _decoded_killmails.hits,
+            "misses": _decoded_killmails.misses,
+            "size": len(_decoded_killmails),
+            "maxsize": _decoded_killmails.maxsize,
+        }
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the decoded killmail cache of this process."""
+        _decoded_killmails.clear()
+
+    @classmethod
+    def _get_from_storage(cls, cache_id: int) -> "KillmailBody":
         data = cache.get(key=cls._storage_key(cache_id))
         if not data:
             raise KillmailDoesNotExist(
                 f"Killmail with ID {cache_id} does not exist in storage."
             )
-        return cls.from_json(data)
+        try:
+            return cls.decode(data)
+        except CodecError as exc:
+            logger.warning("Killmail %s in storage is not readable: %s", cache_id, exc)
+            raise KillmailDoesNotExist(
+                f"Killmail with ID {cache_id} is not readable from storage."
+            ) from exc
 
     @classmethod
     def _storage_key(cls, cache_id: int) -> str:
@@ -566,6 +694,20 @@ class KillmailBody(_KillmailBase):
         """Create new object from JSON data."""
         return cls.from_dict(json.loads(json_str, cls=JSONDateTimeDecoder))
 
+    def encode(self) -> bytes:
+        """Convert killmail into the compact storage format."""
+        return _storage_codec.encode(self)
+
+    @classmethod
+    def decode(cls, data: bytes | str) -> "KillmailBody":
+        """Create new object from storage data, JSON data is still accepted."""
+        if DataclassCodec.is_encoded(data):
+            killmail = _storage_codec.decode(data)
+        else:
+            killmail = cls.from_json(data)
+        killmail.attackers = _compact_attackers(killmail.attackers)
+        return killmail
+
     @classmethod
     def _extract_victim_and_position(cls, killmail_data: dict):
         victim = KillmailVictim()
@@ -591,22 +733,27 @@ class KillmailBody(_KillmailBase):
         return victim, position
 
     @classmethod
-    def _extract_attackers(cls, killmail_data: dict) -> list[KillmailAttacker]:
-        attackers = []
-        for attacker_data in killmail_data.get("attackers", []):
-            params = {}
-            for prop in KillmailAttacker.ENTITY_PROPS + [
-                "damage_done",
-                "security_status",
-            ]:
-                if prop in attacker_data:
-                    params[prop] = attacker_data[prop]
-
-            if "final_blow" in attacker_data:
-                params["final_blow"] = attacker_data["final_blow"]
-
-            attackers.append(KillmailAttacker(**params))
-        return attackers
+    def _extract_attackers(cls, killmail_data: dict) -> Sequence[KillmailAttacker]:
+        attackers_data = killmail_data.get("attackers", [])
+        if (
+            KILLSTATS_ATTACKER_COLUMNS_THRESHOLD is not None
+            and len(attackers_data) >= KILLSTATS_ATTACKER_COLUMNS_THRESHOLD
+        ):
+            return KillmailAttackerColumns.from_dicts(attackers_data)
+        return [
+            KillmailAttacker(
+                character_id=data.get("character_id"),
+                corporation_id=data.get("corporation_id"),
+                alliance_id=data.get("alliance_id"),
+                faction_id=data.get("faction_id"),
+                ship_type_id=data.get("ship_type_id"),
+                damage_done=data.get("damage_done"),
+                final_blow=data.get("final_blow"),
+                security_status=data.get("security_status"),
+                weapon_type_id=data.get("weapon_type_id"),
+            )
+            for data in attackers_data
+        ]
 
     @classmethod
     def _extract_zkb(cls, package_data):
@@ -664,3 +811,13 @@ class KillmailBody(_KillmailBase):
 
         killmail = KillmailBody(**params)
         return killmail
+
+
+_storage_codec = DataclassCodec(
+    KillmailBody, compress_threshold=KILLSTATS_STORAGE_COMPRESS_THRESHOLD
+)
+
+# Read-through cache of decoded killmails from temporary storage
+_decoded_killmails = LRUCache(
+    maxsize=KILLSTATS_KILLMAIL_CACHE_SIZE, ttl=KILLSTATS_KILLMAIL_CACHE_TIMEOUT
+)
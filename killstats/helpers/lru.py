@@ -0,0 +1,89 @@
+"""In-process LRU cache."""
+
+# Standard Library
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with an optional time to live.
+
+    Entries are evicted when the cache is full (least recently used first)
+    or when they are older than ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get(self, key: Hashable, now: float) -> tuple[bool, Any]:
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        if expires is not None and expires <= now:
+            del self._data[key]
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def _set(self, key: Hashable, value: Any, now: float) -> None:
+        expires = now + self.ttl if self.ttl is not None else None
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value or default."""
+        with self._lock:
+            found, value = self._get(key, time.monotonic())
+        return value if found else default
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict:
+        """Return a dict with the cached values of the given keys."""
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                found, value = self._get(key, now)
+                if found:
+                    result[key] = value
+        return result
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add or replace a value."""
+        with self._lock:
+            self._set(key, value, time.monotonic())
+
+    def set_many(self, data: dict) -> None:
+        """Add or replace multiple values."""
+        now = time.monotonic()
+        with self._lock:
+            for key, value in data.items():
+                self._set(key, value, now)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a value if it exists."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all values and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,80 @@
+"""Index of the main character of every owned character."""
+
+# Standard Library
+from typing import Optional
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.constants import MAIN_INDEX_KEY, MAIN_INDEX_VERSION_KEY
+from killstats.helpers.versioned import VersionedIndex
+
+# Seconds until the shared index is rebuilt, picks up renamed main characters
+MAIN_INDEX_TIMEOUT = 3_600 * 24
+
+
+class MainCharacterIndex(VersionedIndex):
+    """In-memory index of character ID to (main character ID, main character name).
+
+    The index is built with one query over all character ownerships of users
+    with a main character and shared through the cache, so only one process
+    has to build it. It is reloaded when the shared version counter changes,
+    which happens whenever a ``CharacterOwnership`` or ``UserProfile`` changes.
+    """
+
+    def __init__(self):
+        super().__init__(MAIN_INDEX_VERSION_KEY)
+        self._mains: dict[int, tuple[int, str]] = {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(characters={len(self._mains)})"
+
+    @staticmethod
+    def build() -> dict[int, tuple[int, str]]:
+        """Build the index from the database."""
+        # pylint: disable=import-outside-toplevel
+        # Alliance Auth
+        from allianceauth.authentication.models import CharacterOwnership
+
+        return {
+            character_id: (main_id, main_name)
+            for character_id, main_id, main_name in CharacterOwnership.objects.filter(
+                user__profile__main_character__isnull=False
+            ).values_list(
+                "character__character_id",
+                "user__profile__main_character__character_id",
+                "user__profile__main_character__character_name",
+            )
+        }
+
+    def _load(self, version) -> None:
+        """Load the index from the cache, or build it if it is missing or outdated."""
+        cached = cache.get(MAIN_INDEX_KEY)
+        if cached is not None and cached[0] == version:
+            self._mains = cached[1]
+        else:
+            self._mains = self.build()
+            cache.set(
+                MAIN_INDEX_KEY, (version, self._mains), timeout=MAIN_INDEX_TIMEOUT
+            )
+
+    def main_of(self, character_id: int) -> Optional[tuple[int, str]]:
+        """Return ID and name of the main character of a character."""
+        self.refresh()
+        return self._mains.get(character_id)
+
+    def decorate(self, character_id: int, name: str) -> str:
+        """Return the name of a character with the name of its main if it is an alt."""
+        main = self.main_of(character_id)
+        if main is None or main[0] == character_id:
+            return name
+        return f"{name} ({main[1]})"
+
+    def invalidate(self) -> None:
+        """Invalidate the index for all processes."""
+        super().invalidate()
+        cache.delete(MAIN_INDEX_KEY)
+
+
+main_characters = MainCharacterIndex()
@@ -0,0 +1,109 @@
+"""Prefetching of zKillboard R2Z2 sequences."""
+
+# Standard Library
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.helpers.killmail import KillmailBody, R2Z2SequenceNotFound
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class R2Z2Prefetcher:
+    """Fetch upcoming zKB R2Z2 sequences ahead of processing.
+
+    Up to ``workers`` sequences are downloaded in a thread pool while the caller
+    processes them strictly in sequence order. Every download reserves its own
+    slot from the shared zKB rate limit.
+
+    No further sequences are requested once a sequence beyond the head is not
+    found (caught up) or a download was stopped by the rate limit or a worker
+    shutdown. With ``workers`` of 1 or less sequences are fetched one by one.
+
+    Usage::
+
+        with R2Z2Prefetcher(start, head, workers=4) as prefetcher:
+            for sequence_id, fetch in prefetcher:
+                killmail = fetch()
+    """
+
+    def __init__(self, start_sequence_id: int, head_sequence_id: int, workers: int):
+        self.start_sequence_id = start_sequence_id
+        self.head_sequence_id = head_sequence_id
+        self.workers = workers
+        self._stop_at = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = deque()
+
+    def __enter__(self) -> "R2Z2Prefetcher":
+        if self.workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="killstats_r2z2"
+            )
+        return self
+
+    def __exit__(self, *args) -> None:
+        # Drop downloads which have not started yet and wait for running ones
+        while self._pending:
+            _, future = self._pending.popleft()
+            future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _stop(self, sequence_id: int) -> None:
+        with self._lock:
+            if self._stop_at is None or sequence_id < self._stop_at:
+                self._stop_at = sequence_id
+
+    def _is_stopped(self, sequence_id: int) -> bool:
+        with self._lock:
+            return self._stop_at is not None and sequence_id > self._stop_at
+
+    def _fetch(self, sequence_id: int) -> Optional[KillmailBody]:
+        try:
+            killmail = KillmailBody.create_from_r2z2_sequence(sequence_id)
+        except R2Z2SequenceNotFound:
+            if sequence_id > self.head_sequence_id:
+                self._stop(sequence_id)
+            raise
+        if killmail is None:
+            self._stop(sequence_id)
+        return killmail
+
+    def __iter__(self) -> Iterator[tuple[int, Callable[[], Optional[KillmailBody]]]]:
+        """Yield sequence IDs in order with a callable returning the fetched killmail.
+
+        The callable raises the exceptions of ``create_from_r2z2_sequence``.
+        """
+        sequence_id = self.start_sequence_id
+
+        if self._executor is None:
+            while not self._is_stopped(sequence_id):
+                yield sequence_id, partial(self._fetch, sequence_id)
+                sequence_id += 1
+            return
+
+        while True:
+            while len(self._pending) < self.workers and not self._is_stopped(
+                sequence_id
+            ):
+                self._pending.append(
+                    (sequence_id, self._executor.submit(self._fetch, sequence_id))
+                )
+                sequence_id += 1
+            if not self._pending:
+                return
+            pending_id, future = self._pending.popleft()
+            yield pending_id, future.result
@@ -0,0 +1,219 @@
+"""Distributed rate limiter for zKillboard and ESI requests and cache warming."""
+
+# Standard Library
+import time
+from dataclasses import dataclass
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import KILLSTATS_MAX_ZKB_PER_SEC, KILLSTATS_RATE_LIMITS
+from killstats.constants import RATELIMIT_KEY
+from killstats.helpers.core import get_redis_client
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+ZKB_R2Z2 = "zkb_r2z2"
+ZKB_API = "zkb_api"
+ESI = "esi"
+# Entities warmed per second by ``warm_api_cache``
+CACHE_WARM = "cache_warm"
+
+# Lowest rate factor after repeated 429 responses
+MIN_RATE_FACTOR = 0.1
+# Seconds the rate factor needs to recover linearly from 0 to 1,
+# a halved rate is fully recovered after half of it
+RATE_RECOVERY_TIME = 300
+# Seconds an idle bucket is kept in Redis
+BUCKET_TTL = 3_600
+
+# Generic cell rate algorithm: the bucket stores the theoretical arrival time (tat)
+# of the next request. Each reservation moves it by one interval and returns the
+# seconds the caller has to wait for its slot. The rate factor is halved by
+# backoffs and recovers linearly over time.
+RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local recovery = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+
+local state = redis.call("HMGET", KEYS[1], "tat", "factor", "ts")
+local tat = tonumber(state[1]) or now
+local factor = tonumber(state[2]) or 1
+local ts = tonumber(state[3]) or now
+
+if factor < 1 then
+    factor = math.min(1, factor + math.max(0, now - ts) / recovery)
+end
+
+local interval = 1 / (rate * factor)
+local start = math.max(tat, now)
+local wait = math.max(0, start - (burst - 1) * interval - now)
+
+if max_wait >= 0 and wait > max_wait then
+    redis.call("HSET", KEYS[1], "factor", factor, "ts", now)
+    redis.call("EXPIRE", KEYS[1], ttl)
+    return {0, tostring(wait)}
+end
+
+redis.call("HSET", KEYS[1], "tat", start + interval, "factor", factor, "ts", now)
+redis.call("EXPIRE", KEYS[1], ttl)
+return {1, tostring(wait)}
+"""
+
+BACKOFF_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local retry_after = tonumber(ARGV[4])
+local min_factor = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+
+local state = redis.call("HMGET", KEYS[1], "tat", "factor")
+local tat = tonumber(state[1]) or now
+local factor = math.max(min_factor, (tonumber(state[2]) or 1) / 2)
+
+local interval = 1 / (rate * factor)
+tat = math.max(tat, now + retry_after + (burst - 1) * interval)
+
+redis.call("HSET", KEYS[1], "tat", tat, "factor", factor, "ts", now)
+redis.call("EXPIRE", KEYS[1], ttl)
+return tostring(factor)
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    """Request budget of an endpoint."""
+
+    rate: float
+    """Requests per second"""
+    burst: int = 1
+    """Requests which may be sent at once"""
+
+
+DEFAULT_BUDGETS = {
+    ZKB_R2Z2: RateLimitBudget(rate=KILLSTATS_MAX_ZKB_PER_SEC),
+    ZKB_API: RateLimitBudget(rate=1),
+    ESI: RateLimitBudget(rate=20, burst=20),
+    CACHE_WARM: RateLimitBudget(rate=1),
+}
+
+
+class TokenBucketRateLimiter:
+    """Token bucket rate limiter shared by all workers through Redis.
+
+    Reservations are atomic, so concurrent workers never get the same slot.
+    """
+
+    def __init__(self, budgets: dict[str, RateLimitBudget]):
+        self.budgets = budgets
+        self._reserve_script = None
+        self._backoff_script = None
+
+    def _register_scripts(self):
+        if self._reserve_script is None:
+            redis = get_redis_client()
+            self._reserve_script = redis.register_script(RESERVE_SCRIPT)
+            self._backoff_script = redis.register_script(BACKOFF_SCRIPT)
+
+    def _budget(self, endpoint: str) -> RateLimitBudget:
+        try:
+            return self.budgets[endpoint]
+        except KeyError as exc:
+            raise ValueError(f"No rate limit budget for {endpoint}") from exc
+
+    @staticmethod
+    def _key(endpoint: str) -> str:
+        return f"{RATELIMIT_KEY}_{endpoint}"
+
+    def reserve(self, endpoint: str, max_wait: float | None = None) -> float | None:
+        """Reserve a request slot without waiting for it.
+
+        Args:
+            endpoint (str): Name of the endpoint budget
+            max_wait (float | None, optional): Do not reserve a slot which is
+                further away than this many seconds. Defaults to None (no limit).
+        Returns:
+            float | None: Seconds until the reserved slot,
+                None if no slot has been reserved.
+        """
+        budget = self._budget(endpoint)
+        self._register_scripts()
+        reserved, wait = self._reserve_script(
+            keys=[self._key(endpoint)],
+            args=[
+                budget.rate,
+                budget.burst,
+                time.time(),
+                -1 if max_wait is None else max_wait,
+                RATE_RECOVERY_TIME,
+                BUCKET_TTL,
+            ],
+        )
+        if not int(reserved):
+            return None
+        return float(wait)
+
+    def acquire(self, endpoint: str, timeout: float | None = None) -> bool:
+        """Reserve a request slot and wait for it.
+
+        Returns True if it's ok to proceed, False if the next slot is further
+        away than the timeout.
+        """
+        wait = self.reserve(endpoint, max_wait=timeout)
+        if wait is None:
+            logger.warning(
+                "%s rate limit requires waiting more than %.3fs. Skipping request.",
+                endpoint,
+                timeout,
+            )
+            return False
+        if wait > 0:
+            logger.debug("%s rate limit requires waiting %.3fs", endpoint, wait)
+            time.sleep(wait)
+        return True
+
+    def backoff(self, endpoint: str, retry_after: float) -> float:
+        """Block the endpoint for the given seconds and halve its rate.
+
+        Returns the new rate factor of the endpoint.
+        """
+        budget = self._budget(endpoint)
+        self._register_scripts()
+        factor = float(
+            self._backoff_script(
+                keys=[self._key(endpoint)],
+                args=[
+                    budget.rate,
+                    budget.burst,
+                    time.time(),
+                    retry_after,
+                    MIN_RATE_FACTOR,
+                    BUCKET_TTL,
+                ],
+            )
+        )
+        logger.warning(
+            "%s rate limited for %ss, reducing rate to %.0f%%",
+            endpoint,
+            retry_after,
+            factor * 100,
+        )
+        return factor
+
+
+ratelimiter = TokenBucketRateLimiter(
+    {
+        **DEFAULT_BUDGETS,
+        **{
+            endpoint: RateLimitBudget(**budget)
+            for endpoint, budget in KILLSTATS_RATE_LIMITS.items()
+        },
+    }
+)
@@ -0,0 +1,131 @@
+"""Short-lived buffer for killmails which did not match a tracked entity."""
+
+# Standard Library
+from collections.abc import Callable
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import (
+    KILLSTATS_UNMATCHED_BUFFER_MAX_BYTES,
+    KILLSTATS_UNMATCHED_BUFFER_SIZE,
+)
+from killstats.constants import UNMATCHED_BUFFER_KEY, UNMATCHED_BUFFER_SIZE_KEY
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.killmail import KillmailBody
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds until an idle buffer is dropped
+BUFFER_TTL = 3_600 * 6
+
+# Push the newest killmail and evict the oldest ones until the buffer is
+# within its item and byte budget. The byte size is tracked in a counter.
+PUSH_SCRIPT = """
+local max_items = tonumber(ARGV[2])
+local max_bytes = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+redis.call("LPUSH", KEYS[1], ARGV[1])
+local size = redis.call("INCRBY", KEYS[2], string.len(ARGV[1]))
+local count = redis.call("LLEN", KEYS[1])
+local evicted = 0
+
+while count > 0 and (count > max_items or size > max_bytes) do
+    local item = redis.call("RPOP", KEYS[1])
+    size = redis.call("DECRBY", KEYS[2], string.len(item))
+    count = count - 1
+    evicted = evicted + 1
+end
+
+redis.call("EXPIRE", KEYS[1], ttl)
+redis.call("EXPIRE", KEYS[2], ttl)
+return evicted
+"""
+
+# Remove taken killmails, keeping the byte counter in sync
+REMOVE_SCRIPT = """
+local removed = 0
+for _, item in ipairs(ARGV) do
+    local count = redis.call("LREM", KEYS[1], 1, item)
+    if count > 0 then
+        redis.call("DECRBY", KEYS[2], string.len(item))
+        removed = removed + count
+    end
+end
+return removed
+"""
+
+
+class UnmatchedKillmailBuffer:
+    """Ring buffer in Redis for the latest killmails without a tracked entity.
+
+    Unmatched killmails are not kept in the temporary storage. The newest
+    ones are buffered so they can still be stored when a corporation or
+    alliance is added shortly after. The buffer holds at most ``max_items``
+    killmails and ``max_bytes`` of encoded data, the oldest are evicted first.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._push_script = None
+        self._remove_script = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.max_bytes > 0
+
+    def _register_scripts(self):
+        if self._push_script is None:
+            redis = get_redis_client()
+            self._push_script = redis.register_script(PUSH_SCRIPT)
+            self._remove_script = redis.register_script(REMOVE_SCRIPT)
+
+    def push(self, killmail: KillmailBody) -> int:
+        """Add a killmail and return the number of evicted killmails."""
+        if not self.enabled:
+            return 0
+        self._register_scripts()
+        return self._push_script(
+            keys=[UNMATCHED_BUFFER_KEY, UNMATCHED_BUFFER_SIZE_KEY],
+            args=[killmail.encode(), self.max_items, self.max_bytes, BUFFER_TTL],
+        )
+
+    def take(self, predicate: Callable[[KillmailBody], bool]) -> list[KillmailBody]:
+        """Remove and return all buffered killmails matching the predicate."""
+        taken = {}
+        for item in get_redis_client().lrange(UNMATCHED_BUFFER_KEY, 0, -1):
+            try:
+                killmail = KillmailBody.decode(item)
+            except ValueError:
+                logger.debug("Dropping unreadable killmail from buffer")
+                taken[item] = None
+                continue
+            if predicate(killmail):
+                taken[item] = killmail
+
+        if taken:
+            self._register_scripts()
+            self._remove_script(
+                keys=[UNMATCHED_BUFFER_KEY, UNMATCHED_BUFFER_SIZE_KEY],
+                args=list(taken),
+            )
+        return [killmail for killmail in taken.values() if killmail is not None]
+
+    def size(self) -> tuple[int, int]:
+        """Return the number of buffered killmails and their size in bytes."""
+        redis = get_redis_client()
+        return (
+            redis.llen(UNMATCHED_BUFFER_KEY),
+            int(redis.get(UNMATCHED_BUFFER_SIZE_KEY) or 0),
+        )
+
+
+unmatched_killmails = UnmatchedKillmailBuffer(
+    max_items=KILLSTATS_UNMATCHED_BUFFER_SIZE,
+    max_bytes=KILLSTATS_UNMATCHED_BUFFER_MAX_BYTES,
+)
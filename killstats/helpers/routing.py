@@ -0,0 +1,59 @@
+"""Routing index for tracked corporations and alliances."""
+
+# Standard Library
+from typing import TYPE_CHECKING
+
+# AA Killstats
+from killstats import __title__
+from killstats.helpers.versioned import VersionedIndex
+
+if TYPE_CHECKING:
+    # AA Killstats
+    from killstats.helpers.killmail import KillmailBody
+
+ROUTING_VERSION_KEY = f"{__title__.upper()}_ROUTING_INDEX_VERSION"
+
+
+class TrackedEntityIndex(VersionedIndex):
+    """In-memory set index of all tracked corporation and alliance IDs.
+
+    The index is loaded once per process and reloaded when the shared
+    version counter changes, which happens whenever a ``CorporationsAudit``
+    or ``AlliancesAudit`` is added or removed.
+    """
+
+    def __init__(self):
+        super().__init__(ROUTING_VERSION_KEY)
+        self.corporation_ids: frozenset[int] = frozenset()
+        self.alliance_ids: frozenset[int] = frozenset()
+        self.entity_ids: frozenset[int] = frozenset()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(corporations={len(self.corporation_ids)}, "
+            f"alliances={len(self.alliance_ids)})"
+        )
+
+    def _load(self, version) -> None:  # pylint: disable=unused-argument
+        """Load all tracked corporation and alliance IDs from the database."""
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.killstatsaudit import AlliancesAudit, CorporationsAudit
+
+        self.corporation_ids = frozenset(
+            CorporationsAudit.objects.values_list(
+                "corporation__corporation_id", flat=True
+            )
+        )
+        self.alliance_ids = frozenset(
+            AlliancesAudit.objects.values_list("alliance__alliance_id", flat=True)
+        )
+        self.entity_ids = self.corporation_ids | self.alliance_ids
+
+    def match(self, killmail: "KillmailBody") -> set[int]:
+        """Return the tracked entity IDs involved in the given killmail."""
+        self.refresh()
+        return killmail.involved_entity_ids() & self.entity_ids
+
+
+tracked_entities = TrackedEntityIndex()
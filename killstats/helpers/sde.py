@@ -0,0 +1,141 @@
+"""Preloaded SDE lookup tables."""
+
+# Standard Library
+import time
+from typing import NamedTuple, Optional
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import KILLSTATS_SDE_VERSION_CHECK_INTERVAL
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class SolarSystemInfo(NamedTuple):
+    constellation_id: Optional[int]
+    region_id: Optional[int]
+    security_status: Optional[float]
+    name: str = ""
+    region_name: str = ""
+
+
+class ItemTypeInfo(NamedTuple):
+    group_id: Optional[int]
+    category_id: Optional[int]
+    name: str
+    group_name: str = ""
+
+
+class SdeLookup:
+    """In-process lookup tables for solar systems and item types.
+
+    Both tables are loaded with one query each on first use (or when a worker
+    is ready) and replace per-row ORM lookups of the SDE models.
+    The SDE version is checked every ``check_interval`` seconds,
+    the tables are reloaded when it has changed.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._tables: Optional[
+            tuple[dict[int, SolarSystemInfo], dict[int, ItemTypeInfo]]
+        ] = None
+        self._version = None
+        self._checked = 0.0
+
+    @staticmethod
+    def _current_version() -> Optional[tuple]:
+        # pylint: disable=import-outside-toplevel
+        # Alliance Auth (External Libs)
+        from eve_sde.models import EveSDE
+
+        return EveSDE.objects.values_list("build_number", "release_date").first()
+
+    def load(self) -> None:
+        """Load the lookup tables from the database."""
+        # pylint: disable=import-outside-toplevel
+        # Alliance Auth (External Libs)
+        from eve_sde.models import ItemType, SolarSystem
+
+        version = self._current_version()
+        solar_systems = {
+            solar_system_id: SolarSystemInfo(*info)
+            for solar_system_id, *info in SolarSystem.objects.values_list(
+                "id",
+                "constellation_id",
+                "constellation__region_id",
+                "security_status",
+                "name",
+                "constellation__region__name",
+            ).iterator()
+        }
+        item_types = {
+            type_id: ItemTypeInfo(*info)
+            for type_id, *info in ItemType.objects.values_list(
+                "id", "group_id", "group__category_id", "name", "group__name"
+            ).iterator()
+        }
+        self._tables = (solar_systems, item_types)
+        self._version = version
+        self._checked = time.monotonic()
+        logger.debug(
+            "SDE lookups loaded: %s solar systems, %s item types (SDE %s)",
+            len(solar_systems),
+            len(item_types),
+            version,
+        )
+
+    def invalidate(self) -> None:
+        """Drop the lookup tables, they are reloaded on next use."""
+        self._tables = None
+
+    def _get_tables(
+        self,
+    ) -> tuple[dict[int, SolarSystemInfo], dict[int, ItemTypeInfo]]:
+        if self._tables is None:
+            self.load()
+        elif time.monotonic() - self._checked >= self.check_interval:
+            self._checked = time.monotonic()
+            if self._current_version() != self._version:
+                logger.info("SDE version changed, reloading SDE lookups")
+                self.load()
+        return self._tables
+
+    def solar_system(self, solar_system_id: int) -> Optional[SolarSystemInfo]:
+        """Return constellation, region and security status of a solar system."""
+        return self._get_tables()[0].get(solar_system_id)
+
+    def region_id(self, solar_system_id: int) -> Optional[int]:
+        """Return the region ID of a solar system."""
+        solar_system = self.solar_system(solar_system_id)
+        return solar_system.region_id if solar_system else None
+
+    def item_type(self, type_id: int) -> Optional[ItemTypeInfo]:
+        """Return group, category and name of an item type."""
+        return self._get_tables()[1].get(type_id)
+
+    def group_id(self, type_id: int) -> Optional[int]:
+        """Return the group ID of an item type."""
+        item_type = self.item_type(type_id)
+        return item_type.group_id if item_type else None
+
+    def group_name(self, type_id: int) -> Optional[str]:
+        """Return the group name of an item type."""
+        item_type = self.item_type(type_id)
+        return item_type.group_name if item_type else None
+
+    def type_id(self, type_id: int) -> Optional[int]:
+        """Return the ID if the item type exists, else None."""
+        return type_id if self.item_type(type_id) else None
+
+    def type_name(self, type_id: int) -> Optional[str]:
+        """Return the name of an item type."""
+        item_type = self.item_type(type_id)
+        return item_type.name if item_type else None
+
+
+sde = SdeLookup(check_interval=KILLSTATS_SDE_VERSION_CHECK_INTERVAL)
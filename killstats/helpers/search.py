@@ -0,0 +1,74 @@
+"""Search terms and filters of the killboard tables."""
+
+# Standard Library
+import re
+import shlex
+from typing import NamedTuple, Optional
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FILTER_PATTERN = re.compile(r"^([a-z]+)(:|>=|<=|>|<|=)(.+)$")
+VALUE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)([kmbt]?)$")
+VALUE_UNITS = {"": 1, "k": 10**3, "m": 10**6, "b": 10**9, "t": 10**12}
+
+MAX_TOKEN_LENGTH = 64
+
+
+class SearchTerm(NamedTuple):
+    # search field of the term, any field if None
+    field: Optional[str]
+    term: str
+
+
+class ValueFilter(NamedTuple):
+    operator: str
+    value: int
+
+
+class ParsedSearch(NamedTuple):
+    terms: list[SearchTerm]
+    values: list[ValueFilter]
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Split a name into lowercase words."""
+    if not text:
+        return []
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def parse_value(text: str) -> Optional[int]:
+    """Parse an ISK value with an optional unit, e.g. ``1.5b`` or ``500m``."""
+    match = VALUE_PATTERN.match(text.replace(",", ""))
+    if match is None:
+        return None
+    return int(float(match.group(1)) * VALUE_UNITS[match.group(2)])
+
+
+def parse_search(value: str, fields: set[str]) -> ParsedSearch:
+    """Parse a search into terms and value filters.
+
+    ``field:name`` only matches the words of one field, e.g. ``ship:Ishtar``
+    or ``system:"Jita"``, ``value>1b`` compares the killmail value.
+    Everything else is matched as word prefix of any field.
+    """
+    try:
+        parts = shlex.split(value.lower())
+    except ValueError:
+        parts = value.lower().split()
+
+    terms = []
+    values = []
+    for part in parts:
+        match = FILTER_PATTERN.match(part)
+        if match is not None:
+            name, operator, argument = match.groups()
+            if name == "value" and operator != ":":
+                isk = parse_value(argument)
+                if isk is not None:
+                    values.append(ValueFilter(operator, isk))
+                    continue
+            elif name in fields and operator == ":":
+                terms.extend(SearchTerm(name, term) for term in tokenize(argument))
+                continue
+        terms.extend(SearchTerm(None, term) for term in tokenize(part))
+    return ParsedSearch(terms, values)
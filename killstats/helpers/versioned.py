@@ -0,0 +1,89 @@
+"""In-memory indexes invalidated through a version counter shared in the cache."""
+
+# Standard Library
+import time
+from typing import Any
+
+# Django
+from django.core.cache import cache
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds between version checks against the cache
+VERSION_CHECK_INTERVAL = 10
+
+
+class VersionCounter:
+    """Version counter shared by all processes through the cache."""
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def get(self, default: Any = None) -> Any:
+        """Return the current version."""
+        return cache.get(self.key, default)
+
+    def bump(self) -> None:
+        """Increase the version, which invalidates everything built on it."""
+        cache.add(self.key, 0, timeout=None)
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, 1, timeout=None)
+
+
+class VersionedIndex:
+    """Base of an in-memory index which is loaded once per process.
+
+    The index is reloaded when the shared version counter changed,
+    the counter is checked at most every ``check_interval`` seconds.
+    Subclasses load their data in ``_load``.
+    """
+
+    check_interval = VERSION_CHECK_INTERVAL
+
+    def __init__(self, version_key: str):
+        self.version = VersionCounter(version_key)
+        self._version = None
+        self._loaded = False
+        self._checked_at = 0.0
+
+    def _load(self, version: Any) -> None:
+        """Load the index for the given version."""
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """Load the index and remember the version it has been loaded with."""
+        # The version is read first, an invalidation during the load reloads again
+        version = self.version.get()
+        self._load(version)
+        self._version = version
+        self._loaded = True
+        self._checked_at = time.monotonic()
+        logger.debug("Index loaded: %r", self)
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the index if it was invalidated since it has been loaded."""
+        if force or not self._loaded:
+            self.load()
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        if self.version.get() != self._version:
+            self.load()
+
+    def invalidate(self) -> None:
+        """Invalidate the index for all processes."""
+        self.version.bump()
+        self._loaded = False
@@ -0,0 +1,113 @@
+"""Queue of API caches to warm after killmails are stored."""
+
+# Standard Library
+import json
+import time
+from collections.abc import Iterable
+
+# Django
+from django.utils import timezone
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.constants import CACHE_WARMING_KEY
+from killstats.helpers.core import get_redis_client
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Seconds a combination of visible entities is warmed after its last request
+COMBINATION_TIMEOUT = 3_600 * 24
+# Most recently requested combinations which are warmed
+MAX_COMBINATIONS = 20
+
+# entity ID, year, month
+Bucket = tuple[int, int, int]
+
+
+class CacheWarming:
+    """Entities with new killmails in the current month and the visible
+    entities of users, whose API caches are computed ahead of the first request.
+
+    Combinations are the corporations and alliances visible to a user,
+    they are shown on the killboard without a selected entity (entity ID 0).
+    The most recently requested combinations are warmed as the user
+    who requested them last.
+    """
+
+    def __init__(self, key: str, combination_timeout: int, max_combinations: int):
+        self.entities_key = f"{key}_ENTITIES"
+        self.combinations_key = f"{key}_COMBINATIONS"
+        self.recent_key = f"{key}_RECENT"
+        self.combination_timeout = combination_timeout
+        self.max_combinations = max_combinations
+
+    def mark(self, buckets: Iterable[Bucket]) -> None:
+        """Queue the entities of buckets in the current month."""
+        now = timezone.localtime()
+        entity_ids = {
+            entity_id
+            for entity_id, year, month in buckets
+            if (year, month) == (now.year, now.month)
+        }
+        self.requeue(entity_ids)
+
+    def requeue(self, entity_ids: Iterable[int]) -> None:
+        """Queue entities again."""
+        entity_ids = list(entity_ids)
+        if entity_ids:
+            get_redis_client().sadd(self.entities_key, *entity_ids)
+
+    def take(self, count: int) -> list[int]:
+        """Remove and return up to count queued entities."""
+        return [
+            int(entity_id)
+            for entity_id in get_redis_client().spop(self.entities_key, count) or []
+        ]
+
+    def remember(self, user_id: int, visible: dict) -> None:
+        """Remember the visible entities of a user requesting the killboard."""
+        if not visible["corporations"] and not visible["alliances"]:
+            return
+        combination = json.dumps(
+            {
+                "user": user_id,
+                "corporations": list(visible["corporations"]),
+                "alliances": list(visible["alliances"]),
+            }
+        )
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.hset(self.combinations_key, visible["unique_id"], combination)
+        pipe.zadd(self.recent_key, {visible["unique_id"]: time.time()})
+        pipe.execute()
+
+    def combinations(self, entity_ids: Iterable[int]) -> list[tuple[str, int]]:
+        """Return entity type and user of the recent combinations with the entities."""
+        redis = get_redis_client()
+        expired = redis.zrangebyscore(
+            self.recent_key, "-inf", time.time() - self.combination_timeout
+        )
+        if expired:
+            redis.zrem(self.recent_key, *expired)
+            redis.hdel(self.combinations_key, *expired)
+
+        recent = redis.zrevrange(self.recent_key, 0, self.max_combinations - 1)
+        entity_ids = set(entity_ids)
+        combinations = []
+        for combination in redis.hmget(self.combinations_key, recent) if recent else []:
+            if combination is None:
+                continue
+            combination = json.loads(combination)
+            for entity_type, field in (
+                ("corporation", "corporations"),
+                ("alliance", "alliances"),
+            ):
+                if entity_ids.intersection(combination[field]):
+                    combinations.append((entity_type, combination["user"]))
+        return combinations
+
+
+cache_warming = CacheWarming(CACHE_WARMING_KEY, COMBINATION_TIMEOUT, MAX_COMBINATIONS)
@@ -0,0 +1,162 @@
+"""Pooled HTTP session for zKillboard requests."""
+
+# Standard Library
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+# Third Party
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import USER_AGENT_TEXT, __title__
+from killstats.app_settings import KILLSTATS_ZKB_POOL_SIZE
+from killstats.constants import REQUESTS_TIMEOUT
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# Connect time of new connections opened by the current thread
+_connect_time = threading.local()
+
+
+class _TimedConnectionMixin:
+    """Record the time spent to open a connection (TCP + TLS handshake)."""
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + (
+            time.perf_counter() - start
+        )
+        _connect_time.connections = getattr(_connect_time, "connections", 0) + 1
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTP adapter which opens connections with handshake timing."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+@dataclass
+class ZKillboardTimings:
+    """Request timings of the zKillboard session."""
+
+    requests: int = 0
+    connections: int = 0
+    connect_time: float = 0.0
+    """Seconds spent to open connections (TCP + TLS handshake)"""
+    transfer_time: float = 0.0
+    """Seconds spent to send requests and receive responses"""
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} requests over {self.connections} connections, "
+            f"{self.connect_time:.2f}s handshake, {self.transfer_time:.2f}s transfer"
+        )
+
+
+class ZKillboardSession:
+    """Per-process HTTP session for zKillboard with keep-alive connection pooling.
+
+    The session is created lazily and recreated after a fork,
+    so every worker process keeps its own connection pool.
+    """
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.timings = ZKillboardTimings()
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = _TimedHTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {
+                "User-Agent": USER_AGENT_TEXT,
+                # gzip, deflate and brotli if installed
+                **make_headers(accept_encoding=True, keep_alive=True),
+            }
+        )
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self._create_session()
+                    self._pid = pid
+                    self.timings = ZKillboardTimings()
+        return self._session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request over a pooled connection."""
+        kwargs.setdefault("timeout", REQUESTS_TIMEOUT)
+        session = self.session
+
+        _connect_time.seconds = 0.0
+        _connect_time.connections = 0
+        start = time.perf_counter()
+        try:
+            return session.get(url, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timings.requests += 1
+                self.timings.connections += _connect_time.connections
+                self.timings.connect_time += _connect_time.seconds
+                self.timings.transfer_time += elapsed - _connect_time.seconds
+
+    def reset_timings(self) -> ZKillboardTimings:
+        """Return the timings collected so far and start over."""
+        with self._lock:
+            timings, self.timings = self.timings, ZKillboardTimings()
+        return timings
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+
+zkb = ZKillboardSession(pool_size=KILLSTATS_ZKB_POOL_SIZE)
@@ -0,0 +1,34 @@
+# Django
+from django.core.management.base import BaseCommand
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import KILLSTATS_BULK_BATCH_SIZE
+from killstats.models.killboard import KillmailInvolvement
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class Command(BaseCommand):
+    help = "Index kills and losses of stored killmails without involvements"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=KILLSTATS_BULK_BATCH_SIZE,
+            help="Killmails indexed per batch",
+        )
+
+    # pylint: disable=unused-argument
+    def handle(self, *args, **options):
+        self.stdout.write("\nIndexing Killmails this can take a while...")
+        total_indexed = KillmailInvolvement.objects.backfill(
+            batch_size=options["batch_size"]
+        )
+        logger.info("Indexed involvements of %s killmails", total_indexed)
+        self.stdout.write(f"{total_indexed} Killmails indexed")
@@ -0,0 +1,32 @@
+# Django
+from django.core.management.base import BaseCommand
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import KILLSTATS_BULK_BATCH_SIZE
+from killstats.managers.rollup_manager import rebuild_rollups
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class Command(BaseCommand):
+    help = "Regenerate the monthly rollups of kills and losses from stored killmails"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=KILLSTATS_BULK_BATCH_SIZE,
+            help="Killmails replayed per batch",
+        )
+
+    # pylint: disable=unused-argument
+    def handle(self, *args, **options):
+        self.stdout.write("\nRebuilding Rollups this can take a while...")
+        total_replayed = rebuild_rollups(batch_size=options["batch_size"])
+        logger.info("Rebuilt rollups from %s killmails", total_replayed)
+        self.stdout.write(f"Rollups rebuilt from {total_replayed} Killmails")
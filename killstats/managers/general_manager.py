@@ -1,4 +1,5 @@
 # Standard Library
+from http import HTTPStatus
 from typing import TYPE_CHECKING, Any
 
 # Django
@@ -6,11 +7,22 @@ from django.db import models
 
 # Alliance Auth
 from allianceauth.services.hooks import get_extension_logger
+from esi.exceptions import (
+    ESIBucketLimitException,
+    ESIErrorLimitException,
+    HTTPClientError,
+    HTTPError,
+)
 
 # AA Killstats
 from killstats import __title__
-from killstats.app_settings import KILLSTATS_BULK_BATCH_SIZE
-from killstats.errors import ObjectNotFound
+from killstats.app_settings import (
+    KILLSTATS_BULK_BATCH_SIZE,
+    KILLSTATS_ESI_RATE_TIMEOUT,
+)
+from killstats.constants import RETRY_DELAY
+from killstats.errors import EsiUnavailable, ObjectNotFound
+from killstats.helpers.ratelimit import ESI, ratelimiter
 from killstats.providers import AppLogger, esi
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
@@ -21,6 +33,28 @@ if TYPE_CHECKING:
 
 
 class EveEntityManager(models.Manager["EveEntityContext"]):
+    @staticmethod
+    def _post_universe_names(eve_ids: list[int]) -> list:
+        """Resolve names from ESI within the ESI rate limit.
+
+        Raises ObjectNotFound if ESI rejects an ID as unknown,
+        EsiUnavailable on errors which can be retried.
+        """
+        if not ratelimiter.acquire(ESI, timeout=KILLSTATS_ESI_RATE_TIMEOUT):
+            raise EsiUnavailable("ESI rate limit reached, try again later.")
+        try:
+            return esi.client.Universe.PostUniverseNames(body=eve_ids).results()
+        except (ESIBucketLimitException, ESIErrorLimitException) as exc:
+            ratelimiter.backoff(ESI, exc.reset or RETRY_DELAY)
+            raise EsiUnavailable(str(exc)) from exc
+        except HTTPClientError as exc:
+            # ESI rejects the whole request if a single ID is unknown
+            if exc.status_code == HTTPStatus.NOT_FOUND:
+                raise ObjectNotFound(f"Unknown IDs in {eve_ids}") from exc
+            raise EsiUnavailable(str(exc)) from exc
+        except HTTPError as exc:
+            raise EsiUnavailable(str(exc)) from exc
+
     def get_or_create_esi(self, *, eve_id: int) -> tuple["EveEntityContext", bool]:
         """gets or creates entity object with data fetched from ESI"""
         # pylint: disable=import-outside-toplevel
@@ -45,7 +79,7 @@ class EveEntityManager(models.Manager["EveEntityContext"]):
                 eve_ids[i : i + chunk_size] for i in range(0, len(eve_ids), chunk_size)
             ]
             for chunk in id_chunks:
-                response = esi.client.Universe.PostUniverseNames(body=chunk).results()
+                response = self._post_universe_names(chunk)
                 new_names = []
                 logger.debug(
                     "Eve Entity Manager EveName: count in %s count out %s",
@@ -68,9 +102,32 @@ class EveEntityManager(models.Manager["EveEntityContext"]):
             return True
         return True
 
+    def create_missing_from_esi(self, eve_ids) -> set[int]:
+        """creates entity objects with data fetched from ESI
+
+        Resolves all IDs with one request, falls back to single IDs only if ESI
+        rejects an ID as unknown. Returns the IDs ESI rejected,
+        other ESI errors are raised.
+        """
+        try:
+            self.create_bulk_from_esi(sorted(eve_ids))
+            return set()
+        except ObjectNotFound as exc:
+            logger.debug("Error on Create Names: %s", exc)
+
+        rejected_ids = set()
+        created_ids = set(self.filter(id__in=eve_ids).values_list("id", flat=True))
+        for eve_id in sorted(set(eve_ids) - created_ids):
+            try:
+                self.update_or_create_esi(eve_id=eve_id)
+            except ObjectNotFound:
+                logger.warning("Unable to resolve ID %s", eve_id)
+                rejected_ids.add(eve_id)
+        return rejected_ids
+
     def update_or_create_esi(self, *, eve_id: int) -> tuple[Any, bool]:
         """updates or creates entity object with data fetched from ESI"""
-        response = esi.client.Universe.PostUniverseNames(body=[eve_id]).results()
+        response = self._post_universe_names([eve_id])
         if len(response) != 1:
             raise ObjectNotFound(f"Unknown Type with ID {eve_id} not found.")
         entity_data = response[0]
@@ -1,95 +1,85 @@
 """Managers for killboard."""
 
 # Standard Library
-from typing import TYPE_CHECKING, Any
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any, Optional
 
 # Django
 from django.db import models, transaction
-
-# Alliance Auth (External Libs)
-from eve_sde.models import ItemType
+from django.utils import timezone
 
 if TYPE_CHECKING:
     # AA Killstats
     from killstats.helpers.killmail import KillmailBody
     from killstats.models.killboard import Killmail as KillmailContext
+    from killstats.models.killboard import (
+        KillmailInvolvement as KillmailInvolvementContext,
+    )
+    from killstats.models.killboard import (
+        KillmailSearchToken as KillmailSearchTokenContext,
+    )
 
 # Alliance Auth
 from allianceauth.services.hooks import get_extension_logger
 
 # AA Killstats
 from killstats import __title__
+from killstats.app_settings import (
+    KILLSTATS_API_CACHE_WARMING,
+    KILLSTATS_BULK_BATCH_SIZE,
+)
+from killstats.helpers.entities import entity_resolver
+from killstats.helpers.generations import stats_generations
+from killstats.helpers.sde import sde
+from killstats.helpers.search import parse_search, tokenize
+from killstats.helpers.warming import cache_warming
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
 
+VALUE_LOOKUPS = {">": "gt", ">=": "gte", "<": "lt", "<=": "lte", "=": "exact"}
 
-class KillmailQueryCore(models.QuerySet):
-    def filter_entities(self, entities):
-        """Filter Kills and Losses from Entities List (Corporations or Alliances)."""
-        # pylint: disable=import-outside-toplevel
-        # AA Killstats
-        from killstats.models.killboard import Attacker
-
-        # Get all Killmail IDs
-        km_ids = self.values_list("killmail_id", flat=True)
 
-        # Get all Attackers and Victims from Entities
-        attacker_kms_ids = Attacker.objects.filter(
-            models.Q(corporation_id__in=entities)
-            | models.Q(alliance_id__in=entities)
-            | models.Q(character_id__in=entities),
-            killmail_id__in=km_ids,
-        ).values_list("killmail_id", flat=True)
+def period_range(year, month=None) -> tuple[datetime, datetime]:
+    """Return start and end of a year or month in the current timezone."""
+    year = int(year)
+    tz = timezone.get_current_timezone()
+    if month is None:
+        return datetime(year, 1, 1, tzinfo=tz), datetime(year + 1, 1, 1, tzinfo=tz)
+    month = int(month)
+    start = datetime(year, month, 1, tzinfo=tz)
+    if month == 12:
+        return start, datetime(year + 1, 1, 1, tzinfo=tz)
+    return start, datetime(year, month + 1, 1, tzinfo=tz)
 
-        victim_kms_ids = self.filter(
-            models.Q(victim_id__in=entities)
-            | models.Q(victim_corporation_id__in=entities)
-            | models.Q(victim_alliance_id__in=entities)
-        ).values_list("killmail_id", flat=True)
 
-        # Combine and deduplicate Killmail IDs
-        combined_kms_ids = set(attacker_kms_ids).union(victim_kms_ids)
-
-        return self.filter(killmail_id__in=combined_kms_ids)
+class KillmailQueryCore(models.QuerySet):
+    def filter_involved(self, entities, role=None, year=None, month=None):
+        """Filter Killmails from Entities List with the involvement index.
 
-    def filter_entities_kills(self, entities):
-        """Filter Kills from Entities List (Corporations or Alliances)."""
+        Only kills or losses are returned if a role is given,
+        only the given year or month if a period is given.
+        """
         # pylint: disable=import-outside-toplevel
         # AA Killstats
-        from killstats.models.killboard import Attacker
-
-        kms = []
-
-        # Sammle alle Angreifer-Daten
-        km_ids = self.values_list("killmail_id", flat=True)
+        from killstats.models.killboard import KillmailInvolvement
 
-        kms_data = Attacker.objects.filter(
-            models.Q(corporation_id__in=entities)
-            | models.Q(alliance_id__in=entities)
-            | models.Q(character_id__in=entities),
-            killmail_id__in=km_ids,
-        ).values_list("killmail_id", flat=True)
+        involvements = KillmailInvolvement.objects.filter_entities(entities, role=role)
+        if year is not None:
+            involvements = involvements.filter_period(year, month)
+        return self.filter(killmail_id__in=involvements.values("killmail_id"))
 
-        for killmail_id in kms_data:
-            kms.append(killmail_id)
-
-        return self.filter(killmail_id__in=kms)
-
-    def filter_entities_losses(self, entities):
-        """Filter Losses from Entities List (Corporations or Alliances)."""
-        kms = []
-
-        victim_kms = self.filter(
-            models.Q(victim_id__in=entities)
-            | models.Q(victim_corporation_id__in=entities)
-            | models.Q(victim_alliance_id__in=entities)
-        ).values_list("killmail_id", flat=True)
-
-        for killmail_id in victim_kms:
-            kms.append(killmail_id)
+    def filter_search(self, value: str):
+        """Filter Killmails matching a search of the killboard tables."""
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.killboard import KillmailSearchToken
 
-        return self.filter(killmail_id__in=kms)
+        search_filter = KillmailSearchToken.objects.search_filter(value)
+        if search_filter is None:
+            return self
+        return self.filter(search_filter)
 
     def filter_structure(self, exclude=False):
         """Filter or Exclude Structure Kills."""
@@ -141,89 +131,398 @@ class KillmailManager(models.Manager["KillmailContext"]):
     def visible_to(self, user):
         return self.get_queryset().visible_to(user)
 
-    def filter_entities_kills(self, entities):
-        return self.get_queryset().filter_entities_kills(entities)
-
-    def filter_entities_losses(self, entities):
-        return self.get_queryset().filter_entities_losses(entities)
+    def filter_involved(self, entities, role=None, year=None, month=None):
+        return self.get_queryset().filter_involved(
+            entities, role=role, year=year, month=month
+        )
 
-    def filter_entities(self, entities):
-        return self.get_queryset().filter_entities(entities)
+    def filter_search(self, value: str):
+        return self.get_queryset().filter_search(value)
 
     def filter_structure(self, exclude=False):
         return self.get_queryset().filter_structure(exclude=exclude)
 
-    def create_from_killmail(self, killmail_body: "KillmailBody"):
-        """create a new EveKillmail from a Killmail object and returns it"""
+    @staticmethod
+    def _victim_entity_id(killmail_body: "KillmailBody") -> int | None:
+        """Return the ID of the victim entity, the character if there is one."""
+        return (
+            killmail_body.victim.character_id
+            or killmail_body.victim.alliance_id
+            or killmail_body.victim.corporation_id
+        )
+
+    def _resolve_killmails(
+        self, killmail_bodies: list["KillmailBody"]
+    ) -> tuple[list["KillmailContext"], list[Any]]:
+        """Resolve phase: build unsaved killmails and attackers from Killmail objects.
+
+        Entities of all killmails are resolved with a few set-based queries,
+        unknown entities are fetched from ESI. Ship types and regions are
+        taken from the preloaded SDE lookups.
+        Entities are only referenced by ID, IDs which can't be resolved are left empty.
+        Runs outside of any transaction, so no locks are held during ESI requests.
+        """
         # AA Killstats
         # pylint: disable=import-outside-toplevel
-        from killstats.models.killboard import Killmail
-
-        with transaction.atomic():
-            attackers_list = []
-
-            corporation_id = killmail_body.victim.corporation_id
-            region_id = killmail_body.get_region_id(killmail_body.solar_system_id)
-            victim_ship = ItemType.objects.get(id=killmail_body.victim.ship_type_id)
-            victim = None
-
-            if killmail_body.victim.character_id:
-                victim = killmail_body.get_or_create_entity(
-                    killmail_body.victim.character_id
+        from killstats.models.killboard import Attacker, Killmail
+
+        entity_ids = set()
+        for body in killmail_bodies:
+            entity_ids.add(self._victim_entity_id(body))
+            for attacker in body.attackers:
+                entity_ids.update(
+                    (
+                        attacker.character_id,
+                        attacker.corporation_id,
+                        attacker.alliance_id,
+                    )
                 )
-            elif killmail_body.victim.alliance_id:
-                victim = killmail_body.get_or_create_entity(
-                    killmail_body.victim.alliance_id
+        entity_ids.discard(None)
+
+        known_ids = entity_resolver.resolve(entity_ids)
+
+        def _known(eve_id: int | None) -> int | None:
+            return eve_id if eve_id in known_ids else None
+
+        killmails = []
+        attackers = []
+        for body in killmail_bodies:
+            km = Killmail(
+                killmail_id=body.id,
+                killmail_date=body.time,
+                victim_id=_known(self._victim_entity_id(body)),
+                victim_ship_id=sde.type_id(body.victim.ship_type_id),
+                victim_corporation_id=body.victim.corporation_id,
+                victim_alliance_id=body.victim.alliance_id,
+                hash=body.zkb.hash,
+                victim_total_value=body.zkb.total_value,
+                victim_fitted_value=body.zkb.fitted_value,
+                victim_destroyed_value=body.zkb.destroyed_value,
+                victim_dropped_value=body.zkb.dropped_value,
+                victim_region_id=sde.region_id(body.solar_system_id),
+                victim_solar_system_id=body.solar_system_id,
+                victim_position_x=body.position.x,
+                victim_position_y=body.position.y,
+                victim_position_z=body.position.z,
+            )
+            killmails.append(km)
+
+            # Attackers are unique per character, corporation and alliance
+            attacker_keys = set()
+            for attacker in body.attackers:
+                key = (
+                    _known(attacker.character_id),
+                    _known(attacker.corporation_id),
+                    _known(attacker.alliance_id),
                 )
-            elif killmail_body.victim.corporation_id:
-                victim = killmail_body.get_or_create_entity(
-                    killmail_body.victim.corporation_id
+                if key in attacker_keys:
+                    continue
+                attacker_keys.add(key)
+                attackers.append(
+                    Attacker(
+                        killmail=km,
+                        character_id=key[0],
+                        corporation_id=key[1],
+                        alliance_id=key[2],
+                        ship_id=sde.type_id(attacker.ship_type_id),
+                        damage_done=attacker.damage_done,
+                        final_blow=attacker.final_blow,
+                        security_status=attacker.security_status,
+                        weapon_type_id=attacker.weapon_type_id,
+                    )
                 )
+        return killmails, attackers
 
-            for attacker in killmail_body.attackers:
-                if attacker.character_id:
-                    attackers_list.append(attacker.character_id)
-
-            if attackers_list:
-                try:
-                    unique_attackers = list(set(attackers_list))
-                    killmail_body.create_names_bulk(eve_ids=unique_attackers)
-                # pylint: disable=broad-exception-caught
-                except Exception as e:
-                    logger.debug("Error on Create Names: %s", e, exc_info=True)
-
-            km = Killmail.objects.create(
-                killmail_id=killmail_body.id,
-                killmail_date=killmail_body.time,
-                victim=victim,
-                victim_ship=victim_ship,
-                victim_corporation_id=corporation_id,
-                victim_alliance_id=killmail_body.victim.alliance_id,
-                hash=killmail_body.zkb.hash,
-                victim_total_value=killmail_body.zkb.total_value,
-                victim_fitted_value=killmail_body.zkb.fitted_value,
-                victim_destroyed_value=killmail_body.zkb.destroyed_value,
-                victim_dropped_value=killmail_body.zkb.dropped_value,
-                victim_region_id=region_id,
-                victim_solar_system_id=killmail_body.solar_system_id,
-                victim_position_x=killmail_body.position.x,
-                victim_position_y=killmail_body.position.y,
-                victim_position_z=killmail_body.position.z,
+    @staticmethod
+    def _commit_killmails(killmails: list["KillmailContext"], attackers: list[Any]):
+        """Commit phase: write resolved killmails and attackers in one short transaction."""
+        # AA Killstats
+        # pylint: disable=import-outside-toplevel
+        from killstats.managers.rollup_manager import update_rollups
+        from killstats.models.killboard import (
+            Attacker,
+            Killmail,
+            KillmailInvolvement,
+            KillmailSearchToken,
+        )
+
+        involvements = KillmailInvolvement.objects.build(killmails, attackers)
+        search_tokens = KillmailSearchToken.objects.build(killmails)
+        with transaction.atomic():
+            Killmail.objects.bulk_create(
+                killmails, batch_size=KILLSTATS_BULK_BATCH_SIZE
             )
+            Attacker.objects.bulk_create(
+                attackers, batch_size=KILLSTATS_BULK_BATCH_SIZE
+            )
+            KillmailInvolvement.objects.bulk_create(
+                involvements, batch_size=KILLSTATS_BULK_BATCH_SIZE
+            )
+            KillmailSearchToken.objects.bulk_create(
+                search_tokens, batch_size=KILLSTATS_BULK_BATCH_SIZE
+            )
+            buckets = update_rollups(killmails, attackers)
+            # Cached stats of the changed months are outdated once committed
+            transaction.on_commit(partial(stats_generations.bump, buckets))
+            if KILLSTATS_API_CACHE_WARMING:
+                transaction.on_commit(partial(cache_warming.mark, buckets))
 
-            killmail_body.get_or_create_attackers(km, killmail_body)
-
-        return km
+    def create_from_killmail(self, killmail_body: "KillmailBody"):
+        """create a new EveKillmail from a Killmail object and returns it
+
+        Raises IntegrityError if the killmail exists already.
+        """
+        killmails, attackers = self._resolve_killmails([killmail_body])
+        self._commit_killmails(killmails, attackers)
+        return killmails[0]
+
+    def bulk_create_from_killmails(
+        self, killmail_bodies: list["KillmailBody"]
+    ) -> list["KillmailContext"]:
+        """create new EveKillmails with their attackers from Killmail objects
+
+        Existing killmails are skipped. Returns the created killmails.
+        """
+        killmail_bodies = {body.id: body for body in killmail_bodies}
+        existing_ids = set(
+            self.filter(killmail_id__in=killmail_bodies.keys()).values_list(
+                "killmail_id", flat=True
+            )
+        )
+        killmail_bodies = [
+            body
+            for killmail_id, body in killmail_bodies.items()
+            if killmail_id not in existing_ids
+        ]
+        if not killmail_bodies:
+            return []
+
+        killmails, attackers = self._resolve_killmails(killmail_bodies)
+        self._commit_killmails(killmails, attackers)
+        return killmails
 
     def update_or_create_from_killmail(
         self, killmail: "KillmailBody"
     ) -> tuple[Any, bool]:
         """Update or create new EveKillmail from a Killmail object."""
+        # AA Killstats
+        # pylint: disable=import-outside-toplevel
+        from killstats.managers.rollup_manager import month_of, rebuild_rollups
+        from killstats.models.killboard import KillmailInvolvement
+
+        killmails, attackers = self._resolve_killmails([killmail])
+        involvements = KillmailInvolvement.objects.filter(killmail_id=killmail.id)
         with transaction.atomic():
-            try:
-                self.get(killmail_id=killmail.id).delete()
-                created = False
-            except self.model.DoesNotExist:
-                created = True
-            obj = self.create_from_killmail(killmail)
-        return obj, created
+            scope = set(involvements.values_list("entity_id", "killmail_date"))
+            deleted, _ = self.filter(killmail_id=killmail.id).delete()
+            self._commit_killmails(killmails, attackers)
+            if deleted:
+                # Rollups can't drop a killmail, the affected months are regenerated
+                scope.update(involvements.values_list("entity_id", "killmail_date"))
+                buckets = {
+                    (entity_id, *month_of(date)) for entity_id, date in scope if date
+                }
+                rebuild_rollups(
+                    entity_ids={bucket[0] for bucket in buckets},
+                    months={bucket[1:] for bucket in buckets},
+                )
+                transaction.on_commit(partial(stats_generations.bump, buckets))
+        return killmails[0], not deleted
+
+
+class KillmailInvolvementQuerySet(models.QuerySet):
+    def filter_entities(self, entities, role=None):
+        """Filter Involvements of Entities, only kills or losses if a role is given."""
+        queryset = self.filter(entity_id__in=entities)
+        if role is not None:
+            queryset = queryset.filter(role=role)
+        return queryset
+
+    def filter_period(self, year, month=None):
+        """Filter Involvements of a year or month as a date range."""
+        start, end = period_range(year, month)
+        return self.filter(killmail_date__gte=start, killmail_date__lt=end)
+
+
+class KillmailInvolvementManager(models.Manager["KillmailInvolvementContext"]):
+    def get_queryset(self):
+        return KillmailInvolvementQuerySet(self.model, using=self._db)
+
+    def filter_entities(self, entities, role=None):
+        return self.get_queryset().filter_entities(entities, role=role)
+
+    def build(
+        self, killmails: list["KillmailContext"], attackers: list[Any]
+    ) -> list["KillmailInvolvementContext"]:
+        """Build unsaved involvements of killmails and their attackers.
+
+        The victim character, corporation and alliance get a loss,
+        each attacker character, corporation and alliance a kill.
+        """
+        killmails = {km.killmail_id: km for km in killmails}
+        involvements = {}
+
+        def _add(killmail_id: int, entity_id: int | None, role: int):
+            if not entity_id or (entity_id, killmail_id, role) in involvements:
+                return
+            km = killmails[killmail_id]
+            involvements[(entity_id, killmail_id, role)] = self.model(
+                entity_id=entity_id,
+                killmail_id=killmail_id,
+                role=role,
+                killmail_date=km.killmail_date,
+                value=km.victim_total_value,
+                ship_group_id=sde.group_id(km.victim_ship_id),
+            )
+
+        for km in killmails.values():
+            for entity_id in (
+                km.victim_id,
+                km.victim_corporation_id,
+                km.victim_alliance_id,
+            ):
+                _add(km.killmail_id, entity_id, self.model.ROLE_LOSS)
+        for attacker in attackers:
+            for entity_id in (
+                attacker.character_id,
+                attacker.corporation_id,
+                attacker.alliance_id,
+            ):
+                _add(attacker.killmail_id, entity_id, self.model.ROLE_KILL)
+        return list(involvements.values())
+
+    def backfill(self, batch_size: int = KILLSTATS_BULK_BATCH_SIZE) -> int:
+        """Create the involvements of stored killmails which have none yet.
+
+        Returns the number of indexed killmails.
+        """
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.killboard import Attacker, Killmail
+
+        killmails = (
+            Killmail.objects.exclude(
+                models.Exists(self.filter(killmail_id=models.OuterRef("pk")))
+            )
+            .only(
+                "killmail_id",
+                "killmail_date",
+                "victim_id",
+                "victim_ship_id",
+                "victim_corporation_id",
+                "victim_alliance_id",
+                "victim_total_value",
+            )
+            .order_by("killmail_id")
+        )
+        total_indexed = 0
+        last_id = 0
+        while True:
+            batch = list(killmails.filter(killmail_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            attackers = Attacker.objects.filter(
+                killmail_id__in=[km.killmail_id for km in batch]
+            ).only("killmail_id", "character_id", "corporation_id", "alliance_id")
+            self.bulk_create(
+                self.build(batch, list(attackers)),
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            total_indexed += len(batch)
+            last_id = batch[-1].killmail_id
+        return total_indexed
+
+
+class KillmailSearchTokenManager(models.Manager["KillmailSearchTokenContext"]):
+    def build(
+        self, killmails: list["KillmailContext"]
+    ) -> list["KillmailSearchTokenContext"]:
+        """Build unsaved search tokens from the names of killmails.
+
+        Victim names are read with one query, ship and location names
+        are taken from the preloaded SDE lookups.
+        """
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.general import EveEntity
+
+        victim_names = dict(
+            EveEntity.objects.filter(
+                id__in={km.victim_id for km in killmails if km.victim_id}
+            ).values_list("id", "name")
+        )
+        tokens = {}
+        for km in killmails:
+            solar_system = sde.solar_system(km.victim_solar_system_id)
+            names = {
+                self.model.FIELD_VICTIM: victim_names.get(km.victim_id),
+                self.model.FIELD_SHIP: sde.type_name(km.victim_ship_id),
+                self.model.FIELD_GROUP: sde.group_name(km.victim_ship_id),
+                self.model.FIELD_SYSTEM: solar_system.name if solar_system else None,
+                self.model.FIELD_REGION: (
+                    solar_system.region_name if solar_system else None
+                ),
+            }
+            for field, name in names.items():
+                for token in tokenize(name):
+                    key = (km.killmail_id, token, field)
+                    if key not in tokens:
+                        tokens[key] = self.model(
+                            killmail_id=km.killmail_id, field=field, token=token
+                        )
+        return list(tokens.values())
+
+    def search_filter(self, value: str) -> Optional[models.Q]:
+        """Return the filter of Killmails matching a search, None if it is empty.
+
+        Every word has to be the prefix of a word of the killmail.
+        """
+        search = parse_search(value, set(self.model.FIELDS))
+        if not search.terms and not search.values:
+            return None
+
+        search_filter = models.Q()
+        for field, term in search.terms:
+            tokens = self.filter(
+                killmail_id=models.OuterRef("pk"), token__istartswith=term
+            )
+            if field is not None:
+                tokens = tokens.filter(field=self.model.FIELDS[field])
+            search_filter &= models.Q(models.Exists(tokens))
+        for operator, isk in search.values:
+            search_filter &= models.Q(
+                **{f"victim_total_value__{VALUE_LOOKUPS[operator]}": isk}
+            )
+        return search_filter
+
+    def backfill(self, batch_size: int = KILLSTATS_BULK_BATCH_SIZE) -> int:
+        """Create the search tokens of stored killmails which have none yet.
+
+        Returns the number of indexed killmails.
+        """
+        # pylint: disable=import-outside-toplevel
+        # AA Killstats
+        from killstats.models.killboard import Killmail
+
+        killmails = (
+            Killmail.objects.exclude(
+                models.Exists(self.filter(killmail_id=models.OuterRef("pk")))
+            )
+            .only(
+                "killmail_id", "victim_id", "victim_ship_id", "victim_solar_system_id"
+            )
+            .order_by("killmail_id")
+        )
+        total_indexed = 0
+        last_id = 0
+        while True:
+            batch = list(killmails.filter(killmail_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            self.bulk_create(
+                self.build(batch), batch_size=batch_size, ignore_conflicts=True
+            )
+            total_indexed += len(batch)
+            last_id = batch[-1].killmail_id
+        return total_indexed
@@ -0,0 +1,123 @@
+"""Managers for zKB R2Z2 ingestion state."""
+
+# Standard Library
+from typing import TYPE_CHECKING
+
+# Django
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.constants import R2Z2_CURSOR_KEY
+from killstats.providers import AppLogger
+
+if TYPE_CHECKING:
+    # AA Killstats
+    from killstats.models.r2z2 import R2Z2Cursor as R2Z2CursorContext
+    from killstats.models.r2z2 import R2Z2Gap as R2Z2GapContext
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class R2Z2CursorManager(models.Manager["R2Z2CursorContext"]):
+    CURSOR_ID = 1
+
+    def get_sequence(self) -> int | None:
+        """Return the last committed sequence ID or None if nothing was committed yet.
+
+        The Redis mirror is always ahead of or equal to the database row,
+        the database row is only used when the mirror is lost.
+        """
+        sequence_id = cache.get(R2Z2_CURSOR_KEY)
+        if sequence_id is not None:
+            return sequence_id
+
+        sequence_id = (
+            self.filter(pk=self.CURSOR_ID).values_list("sequence_id", flat=True).first()
+        )
+        if sequence_id is not None:
+            cache.set(R2Z2_CURSOR_KEY, sequence_id, timeout=None)
+        return sequence_id
+
+    def commit(self, sequence_id: int, persist: bool = True) -> None:
+        """Commit the given sequence ID as processed.
+
+        Args:
+            sequence_id (int): The last processed sequence ID
+            persist (bool, optional): Write the cursor to the database. Defaults to True.
+        """
+        cache.set(R2Z2_CURSOR_KEY, sequence_id, timeout=None)
+        if persist:
+            self.update_or_create(
+                pk=self.CURSOR_ID, defaults={"sequence_id": sequence_id}
+            )
+            logger.debug("R2Z2 cursor persisted at sequence %s", sequence_id)
+
+
+class R2Z2GapManager(models.Manager["R2Z2GapContext"]):
+    def record(self, sequence_id: int, reason: str) -> "R2Z2GapContext":
+        """Record a sequence that has been skipped during ingestion."""
+        gap, created = self.get_or_create(
+            sequence_id=sequence_id, defaults={"reason": reason}
+        )
+        if created:
+            logger.debug("R2Z2 gap recorded for sequence %s (%s)", sequence_id, reason)
+        return gap
+
+    def record_range(self, start_id: int, end_id: int, reason: str) -> None:
+        """Record the sequences from start ID to end ID (inclusive) as one gap."""
+        if end_id < start_id:
+            return
+        if end_id == start_id:
+            self.record(start_id, reason)
+            return
+        self.get_or_create(
+            sequence_id=start_id,
+            defaults={"end_sequence_id": end_id, "reason": reason},
+        )
+        logger.debug(
+            "R2Z2 gap recorded for sequences %s to %s (%s)", start_id, end_id, reason
+        )
+
+    def singles(self):
+        """Return the gaps of single sequences, the newest first."""
+        return self.filter(end_sequence_id__isnull=True).order_by("-sequence_id")
+
+    def ranges(self):
+        """Return the gaps of sequence ranges, the newest first."""
+        return self.filter(end_sequence_id__isnull=False).order_by("-end_sequence_id")
+
+    def shrink(self, gap: "R2Z2GapContext", end_id: int) -> bool:
+        """Move the end of a range gap, removes it once its start is passed.
+
+        Returns True if the gap has been removed.
+        """
+        if end_id < gap.sequence_id:
+            gap.delete()
+            return True
+        gap.end_sequence_id = end_id
+        gap.save(update_fields=["end_sequence_id"])
+        return False
+
+    def failed_attempt(self, gap: "R2Z2GapContext", max_attempts: int) -> bool:
+        """Register a failed refill attempt, removes the gap after max attempts.
+
+        Returns True if the gap has been removed.
+        """
+        gap.attempts += 1
+        if gap.attempts >= max_attempts:
+            logger.debug(
+                "R2Z2 gap for sequence %s dropped after %s attempts",
+                gap.sequence_id,
+                gap.attempts,
+            )
+            gap.delete()
+            return True
+        gap.last_attempt = timezone.now()
+        gap.save(update_fields=["attempts", "last_attempt"])
+        return False
@@ -0,0 +1,376 @@
+"""Managers for monthly rollups of kills and losses."""
+
+# Standard Library
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+# Django
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.app_settings import KILLSTATS_BULK_BATCH_SIZE
+from killstats.managers.killboard_manager import period_range
+from killstats.providers import AppLogger
+
+if TYPE_CHECKING:
+    # AA Killstats
+    from killstats.models.killboard import Killmail as KillmailContext
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+# entity ID, year, month, subject ID (character or ship type)
+RollupKey = tuple[int, int, int, Optional[int]]
+
+STAT_FIELDS = [
+    "kills",
+    "losses",
+    "isk_destroyed",
+    "isk_lost",
+    "highest_kill_id",
+    "highest_kill_value",
+    "highest_loss_id",
+    "highest_loss_value",
+]
+
+
+@dataclass(slots=True)
+class RollupDelta:
+    """Kills and losses to add to one rollup row."""
+
+    kills: int = 0
+    losses: int = 0
+    isk_destroyed: int = 0
+    isk_lost: int = 0
+    highest_kill_id: Optional[int] = None
+    highest_kill_value: Optional[int] = None
+    highest_loss_id: Optional[int] = None
+    highest_loss_value: Optional[int] = None
+
+    def add_kill(self, killmail_id: int, value: int):
+        self.kills += 1
+        self.isk_destroyed += value
+        if self.highest_kill_value is None or value > self.highest_kill_value:
+            self.highest_kill_id, self.highest_kill_value = killmail_id, value
+
+    def add_loss(self, killmail_id: int, value: int):
+        self.losses += 1
+        self.isk_lost += value
+        if self.highest_loss_value is None or value > self.highest_loss_value:
+            self.highest_loss_id, self.highest_loss_value = killmail_id, value
+
+    def merge_into(self, row):
+        """Add the delta to a rollup row."""
+        row.kills += self.kills
+        row.losses += self.losses
+        row.isk_destroyed += self.isk_destroyed
+        row.isk_lost += self.isk_lost
+        if self.highest_kill_value is not None and (
+            row.highest_kill_value is None
+            or self.highest_kill_value > row.highest_kill_value
+        ):
+            row.highest_kill_id = self.highest_kill_id
+            row.highest_kill_value = self.highest_kill_value
+        if self.highest_loss_value is not None and (
+            row.highest_loss_value is None
+            or self.highest_loss_value > row.highest_loss_value
+        ):
+            row.highest_loss_id = self.highest_loss_id
+            row.highest_loss_value = self.highest_loss_value
+
+
+def month_of(date) -> Optional[tuple[int, int]]:
+    """Return year and month of a killmail date in the current timezone."""
+    if isinstance(date, str):
+        date = parse_datetime(date)
+    if date is None:
+        return None
+    if timezone.is_aware(date):
+        date = timezone.localtime(date)
+    return date.year, date.month
+
+
+class RollupQuerySet(models.QuerySet):
+    def filter_entities(self, entities, year, month=None):
+        """Filter Rollups of Entities for a year or month."""
+        queryset = self.filter(entity_id__in=entities, year=int(year))
+        if month is not None:
+            queryset = queryset.filter(month=int(month))
+        return queryset
+
+
+class RollupManager(models.Manager):
+    """Rollups of kills and losses per entity, month and subject.
+
+    Subclasses name the subject field of attackers (kills)
+    and killmails (losses), e.g. the character or the ship type.
+    Rollups are kept for the corporations and alliances of victims and attackers.
+    """
+
+    attacker_field: str
+    victim_field: str
+
+    def get_queryset(self):
+        return RollupQuerySet(self.model, using=self._db)
+
+    def filter_entities(self, entities, year, month=None):
+        return self.get_queryset().filter_entities(entities, year, month)
+
+    def collect(
+        self, killmails: list["KillmailContext"], attackers: list[Any]
+    ) -> dict[RollupKey, RollupDelta]:
+        """Collect the kills and losses of killmails and their attackers.
+
+        A killmail is counted once per rollup row,
+        even with several attackers of the same entity and subject.
+        """
+        deltas: dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+        months = {}
+        for km in killmails:
+            months[km.killmail_id] = month_of(km.killmail_date)
+            subject_id = getattr(km, self.victim_field)
+            if months[km.killmail_id] is None or not subject_id:
+                continue
+            for entity_id in {km.victim_corporation_id, km.victim_alliance_id}:
+                if entity_id:
+                    deltas[(entity_id, *months[km.killmail_id], subject_id)].add_loss(
+                        km.killmail_id, km.victim_total_value or 0
+                    )
+
+        values = {km.killmail_id: km.victim_total_value or 0 for km in killmails}
+        counted = set()
+        for attacker in attackers:
+            month = months.get(attacker.killmail_id)
+            subject_id = getattr(attacker, self.attacker_field)
+            if month is None or not subject_id:
+                continue
+            for entity_id in (attacker.corporation_id, attacker.alliance_id):
+                key = (entity_id, *month, subject_id)
+                if not entity_id or (key, attacker.killmail_id) in counted:
+                    continue
+                counted.add((key, attacker.killmail_id))
+                deltas[key].add_kill(attacker.killmail_id, values[attacker.killmail_id])
+        return deltas
+
+    def _subject_filter(self, subject_ids: set) -> dict:
+        return {f"{self.attacker_field}__in": subject_ids}
+
+    def _subject_of(self, row) -> Optional[int]:
+        return getattr(row, self.attacker_field)
+
+    def _subject_fields(self, subject_id) -> dict:
+        return {self.attacker_field: subject_id}
+
+    def _lock_rows(self, year: int, month: int, keys) -> dict:
+        """Lock and return the existing rows of (entity ID, subject ID) keys."""
+        return {
+            (row.entity_id, self._subject_of(row)): row
+            for row in self.select_for_update()
+            .filter(
+                year=year,
+                month=month,
+                entity_id__in={key[0] for key in keys},
+                **self._subject_filter({key[1] for key in keys}),
+            )
+            .order_by("pk")
+        }
+
+    def apply(self, deltas: dict[RollupKey, RollupDelta]) -> None:
+        """Add deltas to the rollups, missing rows are created.
+
+        Missing rows are inserted empty while ignoring conflicts and locked
+        before the deltas are added, so concurrent stores creating the same
+        row both add their delta instead of one failing.
+        """
+        by_month = defaultdict(dict)
+        for (entity_id, year, month, subject_id), delta in deltas.items():
+            by_month[(year, month)][(entity_id, subject_id)] = delta
+
+        with transaction.atomic(savepoint=False):
+            for (year, month), month_deltas in by_month.items():
+                rows = self._lock_rows(year, month, month_deltas)
+                missing = [key for key in month_deltas if key not in rows]
+                if missing:
+                    self.bulk_create(
+                        [
+                            self.model(
+                                entity_id=entity_id,
+                                year=year,
+                                month=month,
+                                **self._subject_fields(subject_id),
+                            )
+                            for entity_id, subject_id in missing
+                        ],
+                        batch_size=KILLSTATS_BULK_BATCH_SIZE,
+                        ignore_conflicts=True,
+                    )
+                    rows.update(self._lock_rows(year, month, missing))
+                for key, delta in month_deltas.items():
+                    delta.merge_into(rows[key])
+                self.bulk_update(
+                    [rows[key] for key in month_deltas],
+                    STAT_FIELDS,
+                    batch_size=KILLSTATS_BULK_BATCH_SIZE,
+                )
+
+
+class CharacterRollupManager(RollupManager):
+    attacker_field = "character_id"
+    victim_field = "victim_id"
+
+
+class ShipRollupManager(RollupManager):
+    attacker_field = "ship_id"
+    victim_field = "victim_ship_id"
+
+
+class EntityRollupManager(RollupManager):
+    """Rollups of kills and losses per entity and month.
+
+    Every killmail of the entity is counted, the subject of the keys is ``None``.
+    """
+
+    def collect(
+        self, killmails: list["KillmailContext"], attackers: list[Any]
+    ) -> dict[RollupKey, RollupDelta]:
+        deltas: dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+        months = {}
+        values = {}
+        for km in killmails:
+            months[km.killmail_id] = month_of(km.killmail_date)
+            values[km.killmail_id] = km.victim_total_value or 0
+            if months[km.killmail_id] is None:
+                continue
+            for entity_id in {km.victim_corporation_id, km.victim_alliance_id}:
+                if entity_id:
+                    deltas[(entity_id, *months[km.killmail_id], None)].add_loss(
+                        km.killmail_id, values[km.killmail_id]
+                    )
+
+        counted = set()
+        for attacker in attackers:
+            month = months.get(attacker.killmail_id)
+            if month is None:
+                continue
+            for entity_id in (attacker.corporation_id, attacker.alliance_id):
+                if not entity_id or (entity_id, attacker.killmail_id) in counted:
+                    continue
+                counted.add((entity_id, attacker.killmail_id))
+                deltas[(entity_id, *month, None)].add_kill(
+                    attacker.killmail_id, values[attacker.killmail_id]
+                )
+        return deltas
+
+    def _subject_filter(self, subject_ids: set) -> dict:
+        return {}
+
+    def _subject_of(self, row) -> Optional[int]:
+        return None
+
+    def _subject_fields(self, subject_id) -> dict:
+        return {}
+
+
+def update_rollups(
+    killmails: list["KillmailContext"], attackers: list[Any]
+) -> set[tuple[int, int, int]]:
+    """Add killmails and their attackers to all rollups.
+
+    Returns the changed (entity ID, year, month) buckets.
+    """
+    # pylint: disable=import-outside-toplevel
+    # AA Killstats
+    from killstats.models.rollups import CharacterRollup, EntityRollup, ShipRollup
+
+    buckets = set()
+    for manager in (CharacterRollup.objects, ShipRollup.objects, EntityRollup.objects):
+        deltas = manager.collect(killmails, attackers)
+        manager.apply(deltas)
+        if manager is EntityRollup.objects:
+            buckets = {key[:3] for key in deltas}
+    return buckets
+
+
+def rebuild_rollups(
+    entity_ids: Optional[set[int]] = None,
+    months: Optional[set[tuple[int, int]]] = None,
+    batch_size: int = KILLSTATS_BULK_BATCH_SIZE,
+) -> int:
+    """Regenerate rollups from the stored killmails.
+
+    All rollups are regenerated if no entities are given, else only the
+    rollups of the entities in the given months (year, month).
+    Returns the number of replayed killmails.
+    """
+    # pylint: disable=import-outside-toplevel
+    # AA Killstats
+    from killstats.models.killboard import Attacker, Killmail, KillmailInvolvement
+    from killstats.models.rollups import CharacterRollup, EntityRollup, ShipRollup
+
+    managers = (CharacterRollup.objects, ShipRollup.objects, EntityRollup.objects)
+    killmails = Killmail.objects.only(
+        "killmail_id",
+        "killmail_date",
+        "victim_id",
+        "victim_ship_id",
+        "victim_corporation_id",
+        "victim_alliance_id",
+        "victim_total_value",
+    ).order_by("killmail_id")
+
+    with transaction.atomic():
+        if entity_ids is None:
+            for manager in managers:
+                manager.all().delete()
+        else:
+            rollups = models.Q()
+            involvements = models.Q()
+            for year, month in months:
+                start, end = period_range(year, month)
+                rollups |= models.Q(year=year, month=month)
+                involvements |= models.Q(
+                    killmail_date__gte=start, killmail_date__lt=end
+                )
+            for manager in managers:
+                manager.filter(rollups, entity_id__in=entity_ids).delete()
+            killmails = killmails.filter(
+                killmail_id__in=KillmailInvolvement.objects.filter_entities(entity_ids)
+                .filter(involvements)
+                .values("killmail_id")
+            )
+
+        total_replayed = 0
+        last_id = 0
+        while True:
+            batch = list(killmails.filter(killmail_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            attackers = list(
+                Attacker.objects.filter(
+                    killmail_id__in=[km.killmail_id for km in batch]
+                ).only(
+                    "killmail_id",
+                    "character_id",
+                    "corporation_id",
+                    "alliance_id",
+                    "ship_id",
+                )
+            )
+            for manager in managers:
+                deltas = manager.collect(batch, attackers)
+                if entity_ids is not None:
+                    deltas = {
+                        key: delta
+                        for key, delta in deltas.items()
+                        if key[0] in entity_ids and key[1:3] in months
+                    }
+                manager.apply(deltas)
+            total_replayed += len(batch)
+            last_id = batch[-1].killmail_id
+    return total_replayed
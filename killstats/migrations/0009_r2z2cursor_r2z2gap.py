@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("killstats", "0001_init_v2"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="R2Z2Cursor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sequence_id",
+                    models.PositiveBigIntegerField(verbose_name="Sequence ID"),
+                ),
+                ("last_update", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "default_permissions": (),
+            },
+        ),
+        migrations.CreateModel(
+            name="R2Z2Gap",
+            fields=[
+                (
+                    "sequence_id",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Sequence ID"
+                    ),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[("not_found", "Not Found"), ("invalid", "Invalid")],
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("last_attempt", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "default_permissions": (),
+            },
+        ),
+    ]
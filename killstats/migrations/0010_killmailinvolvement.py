@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("killstats", "0009_r2z2cursor_r2z2gap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KillmailInvolvement",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity_id", models.PositiveIntegerField()),
+                (
+                    "role",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "Kill"), (2, "Loss")]
+                    ),
+                ),
+                ("killmail_date", models.DateTimeField(blank=True, null=True)),
+                ("value", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("ship_group_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "killmail",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="involvements",
+                        to="killstats.killmail",
+                    ),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+                "indexes": [
+                    models.Index(
+                        fields=["entity_id", "role", "killmail_date"],
+                        name="killstats_involvement_date",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entity_id", "role", "killmail"),
+                        name="killstats_involvement_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:33
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eve_sde", "0037_remove_accountingentrytype_description_de_and_more"),
+        ("killstats", "0010_killmailinvolvement"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharacterRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity_id", models.PositiveIntegerField()),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("kills", models.PositiveIntegerField(default=0)),
+                ("losses", models.PositiveIntegerField(default=0)),
+                ("isk_destroyed", models.PositiveBigIntegerField(default=0)),
+                ("isk_lost", models.PositiveBigIntegerField(default=0)),
+                ("highest_kill_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_kill_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                ("highest_loss_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_loss_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "character",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="killstats.eveentity",
+                    ),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entity_id", "year", "month", "character"),
+                        name="killstats_character_rollup_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ShipRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity_id", models.PositiveIntegerField()),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("kills", models.PositiveIntegerField(default=0)),
+                ("losses", models.PositiveIntegerField(default=0)),
+                ("isk_destroyed", models.PositiveBigIntegerField(default=0)),
+                ("isk_lost", models.PositiveBigIntegerField(default=0)),
+                ("highest_kill_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_kill_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                ("highest_loss_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_loss_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "ship",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eve_sde.itemtype",
+                    ),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entity_id", "year", "month", "ship"),
+                        name="killstats_ship_rollup_unique",
+                    )
+                ],
+            },
+        ),
+    ]
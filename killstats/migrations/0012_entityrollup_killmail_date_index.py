@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:41
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eve_sde", "0037_remove_accountingentrytype_description_de_and_more"),
+        ("killstats", "0011_characterrollup_shiprollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EntityRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity_id", models.PositiveIntegerField()),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("kills", models.PositiveIntegerField(default=0)),
+                ("losses", models.PositiveIntegerField(default=0)),
+                ("isk_destroyed", models.PositiveBigIntegerField(default=0)),
+                ("isk_lost", models.PositiveBigIntegerField(default=0)),
+                ("highest_kill_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_kill_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                ("highest_loss_id", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "highest_loss_value",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="killmail",
+            index=models.Index(
+                fields=["killmail_date", "killmail_id"], name="killstats_killmail_date"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="entityrollup",
+            constraint=models.UniqueConstraint(
+                fields=("entity_id", "year", "month"),
+                name="killstats_entity_rollup_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:47
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("killstats", "0012_entityrollup_killmail_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KillmailSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (1, "Victim"),
+                            (2, "Ship"),
+                            (3, "Group"),
+                            (4, "System"),
+                            (5, "Region"),
+                        ]
+                    ),
+                ),
+                ("token", models.CharField(max_length=64)),
+                (
+                    "killmail",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to="killstats.killmail",
+                    ),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+                "indexes": [
+                    models.Index(
+                        fields=["token", "killmail"], name="killstats_search_token"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("killmail", "token", "field"),
+                        name="killstats_search_token_unique",
+                    )
+                ],
+            },
+        ),
+    ]
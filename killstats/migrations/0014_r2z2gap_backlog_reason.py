@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:23
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("killstats", "0013_killmailsearchtoken"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="r2z2gap",
+            name="reason",
+            field=models.CharField(
+                choices=[
+                    ("not_found", "Not Found"),
+                    ("invalid", "Invalid"),
+                    ("backlog", "Backlog"),
+                ],
+                max_length=16,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:53
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("killstats", "0014_r2z2gap_backlog_reason"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="r2z2gap",
+            name="end_sequence_id",
+            field=models.PositiveBigIntegerField(
+                blank=True, null=True, verbose_name="End Sequence ID"
+            ),
+        ),
+    ]
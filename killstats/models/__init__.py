@@ -1,3 +1,5 @@
 from .general import EveEntity, General
-from .killboard import Attacker, Killmail
+from .killboard import Attacker, Killmail, KillmailInvolvement, KillmailSearchToken
 from .killstatsaudit import AlliancesAudit, CorporationsAudit
+from .r2z2 import R2Z2Cursor, R2Z2Gap
+from .rollups import CharacterRollup, EntityRollup, ShipRollup
@@ -11,7 +11,12 @@ from eve_sde.models.types import ItemType
 
 # AA Killstats
 from killstats import __title__
-from killstats.managers.killboard_manager import KillmailManager
+from killstats.helpers.sde import sde
+from killstats.managers.killboard_manager import (
+    KillmailInvolvementManager,
+    KillmailManager,
+    KillmailSearchTokenManager,
+)
 from killstats.models.general import EveEntity
 from killstats.providers import AppLogger
 
@@ -21,6 +26,12 @@ logger = AppLogger(get_extension_logger(__name__), __title__)
 class Killmail(models.Model):
     class Meta:
         default_permissions = ()
+        indexes = [
+            models.Index(
+                fields=["killmail_date", "killmail_id"],
+                name="killstats_killmail_date",
+            )
+        ]
 
     objects: KillmailManager = KillmailManager()
 
@@ -52,11 +63,11 @@ class Killmail(models.Model):
 
     def get_or_unknown_victim_ship_id(self):
         """Return the victim ship ID or Unknown."""
-        return self.victim_ship.id if self.victim_ship else 0
+        return self.victim_ship_id or 0
 
     def get_or_unknown_victim_ship_name(self):
         """Return the victim ship name or Unknown."""
-        return self.victim_ship.name if self.victim_ship else _("Unknown")
+        return sde.type_name(self.victim_ship_id) or _("Unknown")
 
     def evaluate_zkb_link(self):
         try:
@@ -121,3 +132,107 @@ class Attacker(models.Model):
 
     class Meta:
         default_permissions = ()
+
+
+class KillmailInvolvement(models.Model):
+    """Index of killmails per involved character, corporation and alliance.
+
+    One row per entity, killmail and role, written together with the killmail.
+    Kills and losses of entities are looked up with one index range scan
+    instead of ORs over the victim and attacker columns.
+    """
+
+    ROLE_KILL = 1
+    ROLE_LOSS = 2
+
+    ROLE_CHOICES = (
+        (ROLE_KILL, _("Kill")),
+        (ROLE_LOSS, _("Loss")),
+    )
+
+    objects: KillmailInvolvementManager = KillmailInvolvementManager()
+
+    entity_id = models.PositiveIntegerField()
+    killmail = models.ForeignKey(
+        Killmail, on_delete=models.CASCADE, related_name="involvements"
+    )
+    role = models.PositiveSmallIntegerField(choices=ROLE_CHOICES)
+    killmail_date = models.DateTimeField(null=True, blank=True)
+    value = models.PositiveBigIntegerField(null=True, blank=True)
+    ship_group_id = models.PositiveIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_role_display()} {self.killmail_id} - {self.entity_id}"
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_id", "role", "killmail"],
+                name="killstats_involvement_unique",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["entity_id", "role", "killmail_date"],
+                name="killstats_involvement_date",
+            )
+        ]
+
+
+class KillmailSearchToken(models.Model):
+    """Words of the names of a killmail for the killboard search.
+
+    One row per word of the victim, ship, ship group, solar system and
+    region name, written together with the killmail.
+    Searches match word prefixes with an index range scan.
+    """
+
+    FIELD_VICTIM = 1
+    FIELD_SHIP = 2
+    FIELD_GROUP = 3
+    FIELD_SYSTEM = 4
+    FIELD_REGION = 5
+
+    FIELD_CHOICES = (
+        (FIELD_VICTIM, _("Victim")),
+        (FIELD_SHIP, _("Ship")),
+        (FIELD_GROUP, _("Group")),
+        (FIELD_SYSTEM, _("System")),
+        (FIELD_REGION, _("Region")),
+    )
+
+    # Names of the fields in structured searches, e.g. ``ship:Ishtar``
+    FIELDS = {
+        "victim": FIELD_VICTIM,
+        "ship": FIELD_SHIP,
+        "group": FIELD_GROUP,
+        "system": FIELD_SYSTEM,
+        "region": FIELD_REGION,
+    }
+
+    objects: KillmailSearchTokenManager = KillmailSearchTokenManager()
+
+    killmail = models.ForeignKey(
+        Killmail, on_delete=models.CASCADE, related_name="search_tokens"
+    )
+    field = models.PositiveSmallIntegerField(choices=FIELD_CHOICES)
+    token = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.killmail_id} - {self.get_field_display()}: {self.token}"
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["killmail", "token", "field"],
+                name="killstats_search_token_unique",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["token", "killmail"],
+                name="killstats_search_token",
+            )
+        ]
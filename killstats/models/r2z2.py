@@ -0,0 +1,71 @@
+"""
+zKillboard R2Z2 Ingestion Models
+"""
+
+# Django
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# AA Killstats
+from killstats import __title__
+from killstats.managers.r2z2_manager import R2Z2CursorManager, R2Z2GapManager
+from killstats.providers import AppLogger
+
+logger = AppLogger(get_extension_logger(__name__), __title__)
+
+
+class R2Z2Cursor(models.Model):
+    """Last committed zKB R2Z2 sequence, ingestion resumes after it."""
+
+    objects: R2Z2CursorManager = R2Z2CursorManager()
+
+    sequence_id = models.PositiveBigIntegerField(verbose_name=_("Sequence ID"))
+    last_update = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"R2Z2 Cursor at sequence {self.sequence_id}"
+
+    class Meta:
+        default_permissions = ()
+
+
+class R2Z2Gap(models.Model):
+    """A zKB R2Z2 sequence which has been skipped and needs to be refilled.
+
+    Sequences skipped after a downtime are one gap from ``sequence_id``
+    to ``end_sequence_id``, which is refilled from its end.
+    """
+
+    objects: R2Z2GapManager = R2Z2GapManager()
+
+    REASON_NOT_FOUND = "not_found"
+    REASON_INVALID = "invalid"
+    REASON_BACKLOG = "backlog"
+
+    REASON_CHOICES = (
+        (REASON_NOT_FOUND, _("Not Found")),
+        (REASON_INVALID, _("Invalid")),
+        (REASON_BACKLOG, _("Backlog")),
+    )
+
+    sequence_id = models.PositiveBigIntegerField(
+        primary_key=True, verbose_name=_("Sequence ID")
+    )
+    end_sequence_id = models.PositiveBigIntegerField(
+        null=True, blank=True, verbose_name=_("End Sequence ID")
+    )
+    reason = models.CharField(max_length=16, choices=REASON_CHOICES)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    last_attempt = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        if self.end_sequence_id is not None:
+            return f"R2Z2 Gap at sequences {self.sequence_id} to {self.end_sequence_id}"
+        return f"R2Z2 Gap at sequence {self.sequence_id}"
+
+    class Meta:
+        default_permissions = ()
@@ -0,0 +1,95 @@
+"""
+Monthly Rollup Models
+"""
+
+# Django
+from django.db import models
+
+# Alliance Auth (External Libs)
+from eve_sde.models.types import ItemType
+
+# AA Killstats
+from killstats.managers.rollup_manager import (
+    CharacterRollupManager,
+    EntityRollupManager,
+    ShipRollupManager,
+)
+from killstats.models.general import EveEntity
+
+
+class MonthlyRollup(models.Model):
+    """Kills and losses of a corporation or alliance in one month."""
+
+    entity_id = models.PositiveIntegerField()
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    kills = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    isk_destroyed = models.PositiveBigIntegerField(default=0)
+    isk_lost = models.PositiveBigIntegerField(default=0)
+    highest_kill_id = models.PositiveIntegerField(null=True, blank=True)
+    highest_kill_value = models.PositiveBigIntegerField(null=True, blank=True)
+    highest_loss_id = models.PositiveIntegerField(null=True, blank=True)
+    highest_loss_value = models.PositiveBigIntegerField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+        default_permissions = ()
+
+
+class CharacterRollup(MonthlyRollup):
+    """Kills and losses of characters per corporation or alliance and month."""
+
+    objects: CharacterRollupManager = CharacterRollupManager()
+
+    character = models.ForeignKey(EveEntity, on_delete=models.CASCADE, related_name="+")
+
+    def __str__(self):
+        return f"{self.entity_id} {self.year}-{self.month:02} - {self.character_id}"
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_id", "year", "month", "character"],
+                name="killstats_character_rollup_unique",
+            )
+        ]
+
+
+class ShipRollup(MonthlyRollup):
+    """Kills and losses of ship types per corporation or alliance and month."""
+
+    objects: ShipRollupManager = ShipRollupManager()
+
+    ship = models.ForeignKey(ItemType, on_delete=models.CASCADE, related_name="+")
+
+    def __str__(self):
+        return f"{self.entity_id} {self.year}-{self.month:02} - {self.ship_id}"
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_id", "year", "month", "ship"],
+                name="killstats_ship_rollup_unique",
+            )
+        ]
+
+
+class EntityRollup(MonthlyRollup):
+    """Kills and losses per corporation or alliance and month."""
+
+    objects: EntityRollupManager = EntityRollupManager()
+
+    def __str__(self):
+        return f"{self.entity_id} {self.year}-{self.month:02}"
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_id", "year", "month"],
+                name="killstats_entity_rollup_unique",
+            )
+        ]
@@ -7,18 +7,33 @@ from importlib import import_module
 from celery import signals
 
 # Django
+from django.contrib.auth.models import Group, User
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
 
 # Alliance Auth
+from allianceauth.authentication.models import CharacterOwnership, State, UserProfile
+from allianceauth.eveonline.models import EveCharacter
 from allianceauth.services.hooks import get_extension_logger
 
 # AA Killstats
 from killstats import __title__
+from killstats.api.helpers import invalidate_visible_entities
 from killstats.helpers.core import get_redis_client
+from killstats.helpers.entities import entity_resolver
+from killstats.helpers.mains import main_characters
+from killstats.helpers.routing import tracked_entities
+from killstats.helpers.sde import sde
+from killstats.models.general import EveEntity
+from killstats.models.killstatsaudit import AlliancesAudit, CorporationsAudit
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
 
+WORKER_PROCESS_INIT_UID = f"{__title__.upper()}_WORKER_PROCESS_INIT"
+
 
 @signals.worker_ready.connect
 def worker_ready_handler(sender, **kwargs):  # pylint: disable=unused-argument
@@ -33,6 +48,36 @@ def worker_ready_handler(sender, **kwargs):  # pylint: disable=unused-argument
     logger.debug("Worker ready signal successfully processed for %s", sender)
 
 
+@signals.worker_init.connect
+def worker_init_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """Handle worker init signal.
+
+    The worker process init handler is connected here, after the Django
+    fixup of Celery connected its own handler on this signal. That handler
+    drops the database connections inherited from the parent process,
+    so the SDE lookups are loaded with a connection of the worker process.
+    """
+    signals.worker_process_init.connect(
+        worker_process_init_handler,
+        weak=False,
+        dispatch_uid=WORKER_PROCESS_INIT_UID,
+    )
+
+
+def worker_process_init_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """Handle worker process init signal.
+
+    This signal is sent in every pool process after it has been started,
+    with the prefork pool after forking. The SDE lookups are preloaded
+    in each process so the first task doesn't have to wait for them.
+    """
+    try:
+        sde.load()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Failed to preload SDE lookups")
+    logger.debug("Worker process init signal successfully processed")
+
+
 @signals.worker_shutting_down.connect
 def worker_shutting_down_handler(sender, **kwargs):  # pylint: disable=unused-argument
     """Handle worker shutdown signal.
@@ -84,3 +129,98 @@ def worker_shutdown_handler(sender, **kwargs):  # pylint: disable=unused-argumen
         logger.debug("Worker shutdown signal successfully processed for %s", sender)
     except Exception:  # pylint: disable=broad-exception-caught
         logger.exception("Failed to clear QueueOnce lock for run_zkb_r2z2")
+
+
+@receiver(post_save, sender=CorporationsAudit)
+@receiver(post_save, sender=AlliancesAudit)
+def audit_saved_handler(
+    sender, instance, created, **kwargs
+):  # pylint: disable=unused-argument
+    """Invalidate the routing index when a corporation or alliance is added.
+
+    The index is invalidated once the audit is committed, otherwise other
+    processes could reload it before the change is visible to them.
+    Buffered killmails of the new entity are stored once the audit is committed.
+    """
+    if created:
+        transaction.on_commit(tracked_entities.invalidate)
+        transaction.on_commit(invalidate_visible_entities)
+        logger.debug("Routing index invalidated, %s added", instance)
+        # Import the tasks module lazily to avoid side effects at import time
+        tasks_mod = import_module("killstats.tasks")
+        transaction.on_commit(tasks_mod.replay_unmatched_killmails.delay)
+
+
+@receiver(post_delete, sender=CorporationsAudit)
+@receiver(post_delete, sender=AlliancesAudit)
+def audit_deleted_handler(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """Invalidate the routing index when a corporation or alliance is removed."""
+    transaction.on_commit(tracked_entities.invalidate)
+    transaction.on_commit(invalidate_visible_entities)
+    logger.debug("Routing index invalidated, %s removed", instance)
+
+
+@receiver(post_delete, sender=EveEntity)
+def eveentity_deleted_handler(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """Remove a deleted entity from the entity caches."""
+    entity_resolver.forget(instance.id)
+
+
+@receiver(post_save, sender=CharacterOwnership)
+@receiver(post_delete, sender=CharacterOwnership)
+@receiver(post_save, sender=UserProfile)
+def main_character_changed_handler(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """Invalidate the main character index when characters or mains change."""
+    transaction.on_commit(main_characters.invalidate)
+    logger.debug("Main character index invalidated, %s changed", instance)
+
+
+@receiver(post_save, sender=CharacterOwnership)
+@receiver(post_delete, sender=CharacterOwnership)
+@receiver(post_save, sender=UserProfile)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=State.permissions.through)
+def visibility_changed_handler(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """Invalidate the visible entities of users when characters or permissions change."""
+    if kwargs.get("action", "post_").startswith("post_"):
+        transaction.on_commit(invalidate_visible_entities)
+
+
+def _affiliation(character: EveCharacter) -> tuple:
+    # Deferred fields are not loaded for the comparison
+    return (
+        character.__dict__.get("corporation_id"),
+        character.__dict__.get("alliance_id"),
+    )
+
+
+@receiver(post_init, sender=EveCharacter)
+def evecharacter_loaded_handler(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """Remember the corporation and alliance of a character to detect changes."""
+    instance._killstats_affiliation = _affiliation(instance)
+
+
+@receiver(post_save, sender=EveCharacter)
+def evecharacter_saved_handler(
+    sender, instance, created, **kwargs
+):  # pylint: disable=unused-argument
+    """Invalidate the visible entities of users when a character changed its corporation or alliance."""
+    affiliation = _affiliation(instance)
+    if not created and affiliation != getattr(
+        instance, "_killstats_affiliation", affiliation
+    ):
+        transaction.on_commit(invalidate_visible_entities)
+        logger.debug("Visible entities invalidated, %s changed affiliation", instance)
+    instance._killstats_affiliation = affiliation
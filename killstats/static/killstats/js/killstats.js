@@ -137,12 +137,27 @@ function updateStats(stats, container) {
 }
 
 function initializeDataTable(tableId, url, totalValueId) {
+    // Cursor of the next page, used instead of the offset when paging forward
+    var nextPage = null;
+    var requested = null;
+
     return $(tableId).DataTable({
         'processing': true,
         'serverSide': true,
         'ajax': {
             'url': url,
+            'data': function(data) {
+                requested = { 'start': data.start, 'length': data.length };
+                if (nextPage && nextPage.start === data.start && nextPage.length === data.length) {
+                    data.cursor = nextPage.cursor;
+                }
+            },
             'dataSrc': function(json) {
+                nextPage = json.next_cursor ? {
+                    'start': requested.start + requested.length,
+                    'length': requested.length,
+                    'cursor': json.next_cursor,
+                } : null;
                 $(totalValueId).text(json.totalvalue.toLocaleString());
                 return json.data;
             }
@@ -1,11 +1,17 @@
 """App Tasks"""
 
+# Standard Library
+import math
+import time
+
 # Third Party
 from celery import chain as Chain
 from celery import shared_task
 
 # Django
+from django.contrib.auth.models import User
 from django.db import IntegrityError
+from django.utils import timezone
 
 # Alliance Auth
 from allianceauth.services.hooks import get_extension_logger
@@ -13,15 +19,51 @@ from allianceauth.services.tasks import QueueOnce
 
 # AA Killstats
 from killstats import __title__, app_settings
-from killstats.helpers.killmail import KillmailBody
+from killstats.api.killstats import api_helper
+from killstats.constants import STORE_DEAD_LETTER_KEY, STORE_QUEUE_KEY
+from killstats.errors import EsiUnavailable
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.idempotency import store_guard
+from killstats.helpers.killmail import (
+    KillmailBody,
+    KillmailDoesNotExist,
+    R2Z2SequenceNotFound,
+    R2Z2SequenceUnavailable,
+)
+from killstats.helpers.r2z2 import R2Z2Prefetcher
+from killstats.helpers.ratelimit import CACHE_WARM, ESI, ZKB_R2Z2, ratelimiter
+from killstats.helpers.retention import unmatched_killmails
+from killstats.helpers.routing import tracked_entities
+from killstats.helpers.warming import cache_warming
+from killstats.helpers.zkillboard import zkb
 from killstats.models.killboard import Killmail
 from killstats.models.killstatsaudit import AlliancesAudit, CorporationsAudit
+from killstats.models.r2z2 import R2Z2Cursor, R2Z2Gap
 from killstats.providers import AppLogger
 
 logger = AppLogger(get_extension_logger(__name__), __title__)
 
 MAX_RETRIES_DEFAULT = 3
 
+# Results of storing a killmail
+STORE_STORED = "stored"
+STORE_EXISTS = "exists"
+STORE_CONFLICT = "conflict"
+STORE_FAILED = "failed"
+# Latest killmail IDs kept in the dead-letter list
+DEAD_LETTER_SIZE = 1_000
+
+# Gaps loaded at once by run_zkb_r2z2_gaps
+GAP_FETCH_SIZE = 100
+# Sequences in a row not found before the older sequences of a range gap are dropped
+GAP_RANGE_EXPIRED_AFTER = 10
+
+# Entities taken from the cache warming queue at once
+WARM_BATCH_SIZE = 20
+
+# Max seconds a queue driven task waits for a rate slot, it is queued again for later slots
+TASK_RATE_WAIT = 1
+
 # Default params for all tasks.
 TASK_DEFAULTS = {
     "time_limit": app_settings.KILLSTATS_TASKS_TIME_LIMIT,
@@ -33,62 +75,302 @@ TASK_DEFAULTS = {
 TASK_DEFAULTS_ONCE = {**TASK_DEFAULTS, **{"base": QueueOnce}}
 
 
+def _reserve_or_requeue(task, endpoint: str) -> bool:
+    """Reserve a rate slot for the next request of a queue driven task.
+
+    A slot within TASK_RATE_WAIT is waited for. For a later slot the task
+    is queued again to continue once the slot is due, instead of blocking
+    the worker until then.
+    Returns True if the request can be sent now.
+    """
+    wait = ratelimiter.reserve(endpoint)
+    if wait > TASK_RATE_WAIT:
+        # The running task still holds its QueueOnce lock, which would reject it
+        task.once_backend.clear_lock(task.get_key())
+        task.apply_async(countdown=math.ceil(wait))
+        logger.debug(
+            "%s rate limit requires waiting %.3fs, %s queued again",
+            endpoint,
+            wait,
+            task.name,
+        )
+        return False
+    if wait > 0:
+        time.sleep(wait)
+    return True
+
+
+def _get_start_sequence(head_sequence_id: int) -> int:
+    """Return the sequence ID to start with, resuming after the last committed one."""
+    last_sequence_id = R2Z2Cursor.objects.get_sequence()
+    if last_sequence_id is None:
+        return head_sequence_id
+
+    if last_sequence_id > head_sequence_id:
+        logger.warning(
+            "R2Z2 cursor %s is ahead of zKB sequence %s, restarting at zKB sequence",
+            last_sequence_id,
+            head_sequence_id,
+        )
+        return head_sequence_id
+
+    backlog = head_sequence_id - last_sequence_id
+    if backlog > app_settings.KILLSTATS_R2Z2_MAX_BACKLOG:
+        start_sequence_id = head_sequence_id - app_settings.KILLSTATS_R2Z2_MAX_BACKLOG
+        logger.warning(
+            "R2Z2 cursor is %s sequences behind, skipping to sequence %s, "
+            "skipped sequences are refilled as gaps",
+            backlog,
+            start_sequence_id,
+        )
+        # Refill the skipped sequences with the gap task instead of losing them
+        R2Z2Gap.objects.record_range(
+            last_sequence_id + 1, start_sequence_id - 1, R2Z2Gap.REASON_BACKLOG
+        )
+        return start_sequence_id
+    return last_sequence_id + 1
+
+
+def _route_killmail(killmail: KillmailBody) -> bool:
+    """Save the killmail temporary and queue it for storage if it is tracked.
+
+    Killmails without a tracked corporation or alliance are only kept
+    in the buffer of unmatched killmails.
+    """
+    if tracked_entities.match(killmail):
+        killmail.save()
+        store_killmail.delay(killmail.id)
+        return True
+    unmatched_killmails.push(killmail)
+    return False
+
+
 @shared_task(**TASK_DEFAULTS_ONCE)
 def run_zkb_r2z2():
+    """Fetch new killmails from zKB R2Z2, resuming after the last committed sequence."""
     total_killmails = 0
-    sequence_id = None
+    total_matched = 0
+    total_gaps = 0
+    head_sequence_id = None
+    # The pooled zKB session keeps its connections open across runs
+    zkb.reset_timings()
 
     try:
-        sequence_id = KillmailBody.get_sequence_from_r2z2()
+        head_sequence_id = KillmailBody.get_sequence_from_r2z2()
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.error("Error fetching killmail from zKB R2Z2: %s", e)
         return
 
-    if not sequence_id:
+    if not head_sequence_id:
         logger.debug("No killmail received from zKB R2Z2.")
         return
 
+    sequence_id = _get_start_sequence(head_sequence_id)
+    last_committed_id = None
+
+    # Load tracked corporations and alliances once for the whole run
+    tracked_entities.refresh()
+
+    try:
+        with R2Z2Prefetcher(
+            sequence_id, head_sequence_id, app_settings.KILLSTATS_R2Z2_PREFETCH
+        ) as prefetcher:
+            for sequence_id, fetch in prefetcher:
+                # Process the killmail for the current sequence ID
+                try:
+                    killmail = fetch()
+                except R2Z2SequenceNotFound:
+                    if sequence_id > head_sequence_id:
+                        logger.debug(
+                            "Caught up with zKB R2Z2 at sequence %s", sequence_id
+                        )
+                        break
+                    R2Z2Gap.objects.record(sequence_id, R2Z2Gap.REASON_NOT_FOUND)
+                    total_gaps += 1
+                except R2Z2SequenceUnavailable:
+                    R2Z2Gap.objects.record(sequence_id, R2Z2Gap.REASON_INVALID)
+                    total_gaps += 1
+                else:
+                    if not killmail:
+                        logger.debug(
+                            "Stopped at sequence ID %s, resuming with next run",
+                            sequence_id,
+                        )
+                        break
+                    total_matched += _route_killmail(killmail)
+                    total_killmails += 1
+
+                # Commit the sequence, sequences are always handed over in order
+                R2Z2Cursor.objects.commit(
+                    sequence_id,
+                    persist=sequence_id
+                    % app_settings.KILLSTATS_R2Z2_CURSOR_PERSIST_INTERVAL
+                    == 0,
+                )
+                last_committed_id = sequence_id
+    finally:
+        if last_committed_id is not None:
+            R2Z2Cursor.objects.commit(last_committed_id)
+
+    logger.info(
+        "Killboard runs completed. %s killmails received from zKB, %s matched tracked entities, %s sequences skipped",
+        total_killmails,
+        total_matched,
+        total_gaps,
+    )
+    logger.debug("zKB R2Z2 HTTP timings: %s", zkb.reset_timings())
+
+
+def _refill_singles(deadline: float) -> tuple[int, int, bool]:
+    """Refill the gaps of single sequences, the newest first.
+
+    Returns the number of refilled sequences and gaps and whether the refill
+    has to stop, because the zKB rate limit is reached or the time budget is used.
+    """
+    total_refilled = 0
+    total_gaps = 0
+    gaps = R2Z2Gap.objects.singles()
     while True:
-        # Process the killmail for the current sequence ID
-        killmail = KillmailBody.create_from_r2z2_sequence(sequence_id)
-        if not killmail:
-            logger.debug(
-                "No valid killmail data received for sequence ID %s", sequence_id
-            )
-            break
+        batch = list(gaps[:GAP_FETCH_SIZE])
+        if not batch:
+            return total_refilled, total_gaps, False
+        oldest_id = batch[-1].sequence_id
+
+        for gap in batch:
+            if time.monotonic() >= deadline or not _reserve_or_requeue(
+                run_zkb_r2z2_gaps, ZKB_R2Z2
+            ):
+                return total_refilled, total_gaps, True
+            total_gaps += 1
+            try:
+                killmail = KillmailBody.create_from_r2z2_sequence(
+                    gap.sequence_id, reserved=True
+                )
+            except R2Z2SequenceUnavailable:
+                R2Z2Gap.objects.failed_attempt(
+                    gap, app_settings.KILLSTATS_R2Z2_GAP_MAX_ATTEMPTS
+                )
+                continue
+
+            if not killmail:
+                return total_refilled, total_gaps, True
+
+            _route_killmail(killmail)
+            gap.delete()
+            total_refilled += 1
+        # Gaps which failed again are retried with the next run
+        gaps = gaps.filter(sequence_id__lt=oldest_id)
 
-        # Save temporary to Cache
-        killmail.save()
 
-        # Get all corporations and alliances that are tracked and run the tracker for each of them
-        corps_qs = CorporationsAudit.objects.all()
-        allys_qs = AlliancesAudit.objects.all()
+def _refill_range(gap: R2Z2Gap, deadline: float) -> tuple[int, bool]:
+    """Refill a range gap from its newest sequence until it is empty.
 
-        # Iterate over all corporations and alliances and run the tracker for each of them
-        for corporation in corps_qs:
-            run_tracker_corporation.delay(
-                corporation_id=corporation.corporation.corporation_id,
-                killmail_id=killmail.id,
+    Returns the number of refilled sequences and whether the refill has to stop,
+    because the zKB rate limit is reached or the time budget is used.
+    Sequences which are not found anymore are not retried, once
+    GAP_RANGE_EXPIRED_AFTER sequences in a row are not found the older
+    sequences have expired too and the gap is dropped.
+    """
+    total_refilled = 0
+    not_found = 0
+    while True:
+        if time.monotonic() >= deadline or not _reserve_or_requeue(
+            run_zkb_r2z2_gaps, ZKB_R2Z2
+        ):
+            return total_refilled, True
+        sequence_id = gap.end_sequence_id
+        invalid = False
+        try:
+            killmail = KillmailBody.create_from_r2z2_sequence(
+                sequence_id, reserved=True
             )
+        except R2Z2SequenceNotFound:
+            not_found += 1
+            killmail = False
+        except R2Z2SequenceUnavailable:
+            invalid = True
+            killmail = False
+
+        if killmail is None:
+            return total_refilled, True
+        if killmail:
+            _route_killmail(killmail)
+            total_refilled += 1
+            not_found = 0
 
-        # Iterate over all alliances and run the tracker for each of them
-        for alliance in allys_qs:
-            run_tracker_alliance.delay(
-                alliance_id=alliance.alliance.alliance_id, killmail_id=killmail.id
+        if not_found >= GAP_RANGE_EXPIRED_AFTER:
+            logger.info(
+                "zKB R2Z2 sequences %s to %s expired, dropping them",
+                gap.sequence_id,
+                sequence_id,
             )
+            gap.delete()
+            return total_refilled, False
+        removed = R2Z2Gap.objects.shrink(gap, sequence_id - 1)
+        if invalid:
+            # Retried like invalid sequences of live ingestion
+            R2Z2Gap.objects.record(sequence_id, R2Z2Gap.REASON_INVALID)
+        if removed:
+            return total_refilled, False
+
+
+@shared_task(**TASK_DEFAULTS_ONCE)
+def run_zkb_r2z2_gaps():
+    """Refill skipped zKB R2Z2 sequences within the zKB rate limit.
+
+    Gaps are refilled newest first until the rate limit is reached
+    or the time budget of the run is used, a run stopped by the rate limit
+    is queued again to continue once the next slot is due. Gaps of live ingestion are
+    refilled before the ranges skipped after a downtime, which are the
+    most likely to have expired.
+    """
+    deadline = time.monotonic() + app_settings.KILLSTATS_R2Z2_GAP_TIME_BUDGET
+    tracked_entities.refresh()
+
+    total_refilled, total_gaps, stop = _refill_singles(deadline)
+    while not stop:
+        gap = R2Z2Gap.objects.ranges().first()
+        if gap is None:
+            break
+        total_gaps += 1
+        refilled, stop = _refill_range(gap, deadline)
+        total_refilled += refilled
+
+    if not total_gaps:
+        logger.debug("No zKB R2Z2 gaps to refill.")
+        return
+    if stop:
+        logger.debug("Refilling remaining gaps with next run")
 
-        # Increment the total killmail count and move to the next sequence ID
-        total_killmails += 1
-        sequence_id += 1
     logger.info(
-        "Killboard runs completed. %s killmails received from zKB",
-        total_killmails,
+        "Refilled %s zKB R2Z2 sequences from %s skipped gaps",
+        total_refilled,
+        total_gaps,
     )
 
 
+@shared_task(**TASK_DEFAULTS_ONCE)
+def replay_unmatched_killmails():
+    """Queue buffered unmatched killmails which involve a newly tracked entity."""
+    tracked_entities.refresh(force=True)
+    killmails = unmatched_killmails.take(tracked_entities.match)
+    killmails = [killmail for killmail in killmails if store_guard.claim(killmail.id)]
+    for killmail in killmails:
+        killmail.save()
+        get_redis_client().rpush(STORE_QUEUE_KEY, killmail.id)
+
+    if killmails:
+        store_killmails.delay()
+        logger.info("Queued %s buffered killmails for storing", len(killmails))
+
+
 @shared_task(**TASK_DEFAULTS)
 def run_tracker_corporation(corporation_id: int, killmail_id: int) -> None:
-    """Run the tracker for the given killmail"""
+    """Run the tracker for the given killmail
+
+    Killmails are routed by ``run_zkb_r2z2`` directly,
+    this task is kept for already queued messages and manual runs.
+    """
     corporation = CorporationsAudit.objects.get(
         corporation__corporation_id=corporation_id
     )
@@ -107,7 +389,11 @@ def run_tracker_corporation(corporation_id: int, killmail_id: int) -> None:
 
 @shared_task(**TASK_DEFAULTS)
 def run_tracker_alliance(alliance_id: int, killmail_id: int) -> None:
-    """Run the tracker for the given killmail"""
+    """Run the tracker for the given killmail
+
+    Killmails are routed by ``run_zkb_r2z2`` directly,
+    this task is kept for already queued messages and manual runs.
+    """
     alliance = AlliancesAudit.objects.get(alliance__alliance_id=alliance_id)
     killmail = KillmailBody.get(killmail_id)
     killmail_new = alliance.process_killmail(killmail)
@@ -122,15 +408,217 @@ def run_tracker_alliance(alliance_id: int, killmail_id: int) -> None:
         )
 
 
-@shared_task(**TASK_DEFAULTS)
-def store_killmail(killmail_id: int) -> None:
-    """stores killmail as EveKillmail object"""
-    killmail = KillmailBody.get(killmail_id)
+def _store_single_killmail(killmail: KillmailBody) -> str:
+    """Store one killmail, returns one of the STORE_* results.
+
+    Raises EsiUnavailable, the killmail is stored with the next run.
+    """
     try:
         Killmail.objects.create_from_killmail(killmail)
     except IntegrityError:
-        logger.debug(
-            "%s: Failed to store killmail, because it already exists", killmail.id
-        )
-    else:
-        logger.debug("%s: Stored killmail", killmail.id)
+        if Killmail.objects.filter(killmail_id=killmail.id).exists():
+            logger.debug(
+                "%s: Failed to store killmail, because it already exists", killmail.id
+            )
+            return STORE_EXISTS
+        logger.debug("%s: Killmail conflicts with a concurrent write", killmail.id)
+        return STORE_CONFLICT
+    except EsiUnavailable:
+        raise
+    # pylint: disable=broad-exception-caught
+    except Exception:
+        logger.exception("%s: Failed to store killmail", killmail.id)
+        return STORE_FAILED
+    return STORE_STORED
+
+
+def _store_killmails(killmails: list[KillmailBody]) -> tuple[int, dict[int, str]]:
+    """Store killmails in one batch, falling back to single killmails on errors.
+
+    Returns the number of stored killmails and the STORE_CONFLICT or
+    STORE_FAILED result of killmails which are not stored.
+    Conflicts which are no duplicate killmail are retried once.
+    Raises EsiUnavailable, the killmails are stored with the next run.
+    """
+    try:
+        return len(Killmail.objects.bulk_create_from_killmails(killmails)), {}
+    except EsiUnavailable:
+        raise
+    # pylint: disable=broad-exception-caught
+    except Exception:
+        logger.debug("Storing batch failed, storing one by one", exc_info=True)
+
+    total_stored = 0
+    failures = {}
+    for killmail in killmails:
+        result = _store_single_killmail(killmail)
+        if result == STORE_CONFLICT:
+            result = _store_single_killmail(killmail)
+        if result == STORE_STORED:
+            total_stored += 1
+        elif result != STORE_EXISTS:
+            failures[killmail.id] = result
+    return total_stored, failures
+
+
+def _dead_letter(killmail_ids: list[int]) -> None:
+    """Move killmails which failed to store out of the queue.
+
+    They stay in the temporary storage until it expires and can be queued
+    again once fetched again.
+    """
+    if not killmail_ids:
+        return
+    redis = get_redis_client()
+    pipe = redis.pipeline(transaction=False)
+    pipe.rpush(STORE_DEAD_LETTER_KEY, *killmail_ids)
+    pipe.ltrim(STORE_DEAD_LETTER_KEY, -DEAD_LETTER_SIZE, -1)
+    pipe.execute()
+    store_guard.release(killmail_ids)
+    logger.error(
+        "Failed to store killmails %s, moved to %s", killmail_ids, STORE_DEAD_LETTER_KEY
+    )
+
+
+@shared_task(**TASK_DEFAULTS)
+def store_killmail(killmail_id: int, flush: bool = False) -> None:
+    """queues killmail for storing as EveKillmail object
+
+    Queued killmails are stored in batches by ``store_killmails``,
+    which starts once a batch is full or when ``flush`` is set.
+    Each killmail is queued at most once across all workers,
+    duplicate requests are dropped before any work is done.
+    """
+    if not store_guard.claim(killmail_id):
+        logger.debug("%s: Killmail is already queued or stored", killmail_id)
+        if flush:
+            store_killmails.delay()
+        return
+
+    queued = get_redis_client().rpush(STORE_QUEUE_KEY, killmail_id)
+    logger.debug("%s: Queued killmail for storing", killmail_id)
+    if flush or queued >= app_settings.KILLSTATS_STORE_BATCH_SIZE:
+        store_killmails.delay()
+
+
+@shared_task(**TASK_DEFAULTS_ONCE)
+def store_killmails() -> None:
+    """stores queued killmails in batches as EveKillmail objects"""
+    redis = get_redis_client()
+    batch_size = app_settings.KILLSTATS_STORE_BATCH_SIZE
+    total_stored = 0
+    retry_ids = []
+
+    while True:
+        killmail_ids = redis.lrange(STORE_QUEUE_KEY, 0, batch_size - 1)
+        if not killmail_ids:
+            break
+        # Unknown names of a batch are resolved with ESI, the batch stays queued
+        if not _reserve_or_requeue(store_killmails, ESI):
+            break
+
+        killmails = []
+        expired_ids = []
+        for killmail_id in dict.fromkeys(
+            int(killmail_id) for killmail_id in killmail_ids
+        ):
+            try:
+                killmails.append(KillmailBody.get(killmail_id))
+            except KillmailDoesNotExist:
+                logger.warning("%s: Killmail expired before storing", killmail_id)
+                expired_ids.append(killmail_id)
+
+        if killmails:
+            try:
+                stored, failures = _store_killmails(killmails)
+            except EsiUnavailable as exc:
+                # The batch stays queued, stored killmails are skipped next time
+                logger.warning("ESI unavailable, storing with next run: %s", exc)
+                break
+            total_stored += stored
+            done_ids = [
+                killmail.id for killmail in killmails if killmail.id not in failures
+            ]
+            # Stored killmails are not needed in the temporary storage anymore
+            KillmailBody.delete_many(done_ids)
+            # Killmails are stored now or existed already
+            store_guard.complete(done_ids)
+            retry_ids.extend(
+                killmail_id
+                for killmail_id, result in failures.items()
+                if result == STORE_CONFLICT
+            )
+            _dead_letter(
+                [
+                    killmail_id
+                    for killmail_id, result in failures.items()
+                    if result == STORE_FAILED
+                ]
+            )
+        # Expired killmails can be queued again once fetched again
+        store_guard.release(expired_ids)
+        # Only remove the batch from the queue after it has been stored
+        redis.ltrim(STORE_QUEUE_KEY, len(killmail_ids), -1)
+
+    if retry_ids:
+        # Conflicting killmails are stored with the next run
+        redis.rpush(STORE_QUEUE_KEY, *retry_ids)
+        logger.info("Queued %s conflicting killmails again", len(retry_ids))
+
+    if total_stored:
+        logger.info("Stored %s queued killmails", total_stored)
+        if app_settings.KILLSTATS_API_CACHE_WARMING:
+            warm_api_cache.delay()
+    logger.debug("Killmail cache: %s", KillmailBody.cache_info())
+    logger.debug("Store requests: %s", store_guard.metrics())
+
+
+@shared_task(**TASK_DEFAULTS_ONCE)
+def warm_api_cache() -> None:
+    """Precompute the current month of entities with new killmails.
+
+    Entities are warmed within the ``cache_warm`` rate limit and only while
+    no killmails are queued for storing, remaining entities are warmed
+    after the next stored batch or once the next rate slot is due.
+    """
+    redis = get_redis_client()
+    now = timezone.localtime()
+    total_warmed = 0
+
+    while entity_ids := cache_warming.take(WARM_BATCH_SIZE):
+        targets = [
+            ("corporation", corporation_id, None)
+            for corporation_id in CorporationsAudit.objects.filter(
+                corporation__corporation_id__in=entity_ids
+            ).values_list("corporation__corporation_id", flat=True)
+        ] + [
+            ("alliance", alliance_id, None)
+            for alliance_id in AlliancesAudit.objects.filter(
+                alliance__alliance_id__in=entity_ids
+            ).values_list("alliance__alliance_id", flat=True)
+        ]
+        combinations = cache_warming.combinations(entity_ids)
+        users = User.objects.in_bulk({user_id for _, user_id in combinations})
+        targets += [
+            (entity_type, 0, users[user_id])
+            for entity_type, user_id in combinations
+            if user_id in users
+        ]
+
+        for entity_type, entity_id, user in targets:
+            if redis.llen(STORE_QUEUE_KEY):
+                # Ingestion goes first, warmed outputs are skipped next time
+                cache_warming.requeue(entity_ids)
+                logger.debug(
+                    "Cache warming paused, continuing after the next stored batch"
+                )
+                return
+            if not _reserve_or_requeue(warm_api_cache, CACHE_WARM):
+                cache_warming.requeue(entity_ids)
+                return
+            total_warmed += api_helper.warm_cache(
+                entity_type, entity_id, now.year, now.month, user
+            )
+
+    if total_warmed:
+        logger.info("Warmed %s API caches", total_warmed)
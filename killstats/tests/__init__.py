@@ -4,6 +4,15 @@ import socket
 # Django
 from django.test import TestCase
 
+# AA Killstats
+from killstats.api.helpers import invalidate_visible_entities
+from killstats.constants import ENTITY_KNOWN_KEY
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.entities import entity_resolver
+from killstats.helpers.killmail import KillmailBody
+from killstats.helpers.mains import main_characters
+from killstats.helpers.sde import sde
+
 
 class SocketAccessError(Exception):
     """Error raised when a test script accesses the network"""
@@ -27,6 +36,17 @@ class NoSocketsTestCase(TestCase):
         socket.socket = cls.guard
         return super().setUpClass()
 
+    @classmethod
+    def _pre_setup(cls):
+        super()._pre_setup()
+        # Entity, SDE and killmail caches outlive the rolled back database of the previous test
+        entity_resolver.clear()
+        get_redis_client().delete(ENTITY_KNOWN_KEY)
+        sde.invalidate()
+        KillmailBody.clear_cache()
+        main_characters.invalidate()
+        invalidate_visible_entities()
+
     @classmethod
     def tearDownClass(cls):
         socket.socket = cls.socket_original
@@ -3,13 +3,26 @@ from django.test import RequestFactory, TestCase
 from django.urls import reverse
 
 # Alliance Auth
-from allianceauth.eveonline.models import EveCorporationInfo
+from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
 
 # AA Killstats
 from killstats.api.account_manager import AccountManager
-from killstats.api.killstats.api_helper import get_alliances, get_corporations
+from killstats.api.helpers import (
+    get_alliances,
+    get_corporations,
+    get_visible_entities,
+)
+from killstats.api.killstats.api_helper import (
+    cache_sytem,
+    get_entities,
+    set_cache_key,
+)
+from killstats.tests import NoSocketsTestCase
 from killstats.tests.testdata.load_allianceauth import load_allianceauth
-from killstats.tests.testdata.utils import create_user_from_evecharacter
+from killstats.tests.testdata.utils import (
+    create_alliance,
+    create_user_from_evecharacter,
+)
 
 MODULE_PATH = "killstats.api.account_manager"
 
@@ -80,3 +93,74 @@ class TestApiHelpers(TestCase):
         expected_data = []
 
         self.assertEqual(ally_list, expected_data)
+
+
+class TestVisibleEntities(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        cls.factory = RequestFactory()
+        cls.user, cls.character_ownership = create_user_from_evecharacter(
+            1001, permissions=["killstats.basic_access"]
+        )
+        cls.alliance = create_alliance(cls.character_ownership.character)
+
+    def setUp(self) -> None:
+        self.request = self.factory.get("/")
+        self.request.user = self.user
+
+    def test_cached_per_user(self):
+        # given
+        visible = get_visible_entities(self.request)
+        # when
+        with self.assertNumQueries(0):
+            cached = get_visible_entities(self.request)
+            entities = get_entities(self.request, "alliance", 0)
+        # then
+        self.assertEqual(cached, visible)
+        self.assertEqual(entities, [3001])
+
+    def test_cache_hit_costs_no_queries(self):
+        # given
+        output, cache_key = cache_sytem(self.request, "hall_test", 0)
+        set_cache_key(cache_key, ["halls"])
+        # when
+        with self.assertNumQueries(0):
+            output, cache_key = cache_sytem(self.request, "hall_test", 0)
+        # then
+        self.assertEqual(output, ["halls"])
+        self.assertIsNone(cache_key)
+
+    def test_invalidated_when_audit_removed(self):
+        # given
+        get_visible_entities(self.request)
+        # when
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alliance.delete()
+        # then
+        self.assertEqual(get_visible_entities(self.request)["alliances"], [])
+
+    def test_invalidated_when_character_changes_alliance(self):
+        # given
+        get_visible_entities(self.request)
+        character = EveCharacter.objects.get(character_id=1001)
+        # when
+        with self.captureOnCommitCallbacks(execute=True):
+            character.alliance_id = 3002
+            character.save()
+        # then
+        self.assertEqual(get_visible_entities(self.request)["alliances"], [])
+
+    def test_not_invalidated_when_character_keeps_affiliation(self):
+        # given
+        visible = get_visible_entities(self.request)
+        character = EveCharacter.objects.get(character_id=1001)
+        # when
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            character.character_name = "Renamed"
+            character.save()
+        # then
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_visible_entities(self.request), visible)
@@ -0,0 +1,274 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.test import RequestFactory
+
+# AA Killstats
+from killstats.api.killstats.api_helper import (
+    cache_sytem,
+    decode_cursor,
+    get_cache_name,
+    get_killmails_cache_name,
+    get_killmails_data,
+    set_cache_key,
+    warm_cache,
+)
+from killstats.app_settings import KILLSTATS_API_CACHE_LIFETIME
+from killstats.models.killboard import Killmail
+from killstats.models.rollups import EntityRollup
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.test_managers.test_rollup_manager import (
+    _killmail_bodies,
+    _killmail_body,
+)
+from killstats.tests.testdata.eveentity import load_eveentity
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+
+
+class TestKillmailsData(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        load_eveentity()
+        cls.factory = RequestFactory()
+
+    def setUp(self) -> None:
+        killmail_bodies = _killmail_bodies() + [
+            _killmail_body(
+                killmail_id,
+                "2025-10-03T12:00:00Z",
+                (1005, 2003, 3003, 10002),
+                [(1002, 2002, 3002, 20001)],
+                killmail_id,
+            )
+            for killmail_id in range(10, 15)
+        ]
+        with patch("killstats.managers.general_manager.esi"):
+            Killmail.objects.bulk_create_from_killmails(killmail_bodies)
+
+    def _get(self, mode="kills", **params):
+        request = self.factory.get(
+            "/",
+            {"order[0][column]": 5, "order[0][dir]": "desc", "length": 3, **params},
+        )
+        return get_killmails_data(request, "10", "2025", "corporation", 2002, mode)
+
+    def test_pages_with_cursor(self):
+        # when
+        first = self._get()
+        second = self._get(start=3, cursor=first["next_cursor"])
+        offset = self._get(start=3)
+        # then
+        self.assertEqual([km["killmail_id"] for km in first["data"]], [14, 13, 12])
+        self.assertEqual([km["killmail_id"] for km in second["data"]], [11, 10, 2])
+        self.assertEqual(second["data"], offset["data"])
+        self.assertEqual(decode_cursor(first["next_cursor"])[1], 12)
+
+    def test_pages_ascending_with_cursor(self):
+        # when
+        first = self._get(**{"order[0][dir]": "asc"})
+        second = self._get(
+            start=3, cursor=first["next_cursor"], **{"order[0][dir]": "asc"}
+        )
+        # then
+        self.assertEqual(
+            [km["killmail_id"] for km in first["data"] + second["data"]],
+            [1, 2, 10, 11, 12, 13],
+        )
+
+    def test_invalid_cursor_uses_offset(self):
+        # when
+        output = self._get(start=3, cursor="invalid")
+        # then
+        self.assertEqual([km["killmail_id"] for km in output["data"]], [11, 10, 2])
+
+    def test_cache_name_uses_data_defaults(self):
+        # given
+        args = ("10", "2025", "corporation", 2002, "kills")
+        request = self.factory.get("/")
+        request_defaults = self.factory.get(
+            "/", {"order[0][column]": 0, "order[0][dir]": "desc"}
+        )
+        # then
+        # requests without parameters share the page computed with the defaults
+        self.assertEqual(
+            get_killmails_cache_name(request, *args),
+            get_killmails_cache_name(request_defaults, *args),
+        )
+        self.assertEqual(
+            get_killmails_data(request, *args),
+            get_killmails_data(request_defaults, *args),
+        )
+
+    def test_counts_from_rollups(self):
+        # given
+        EntityRollup.objects.filter(entity_id=2002).update(isk_destroyed=1)
+        # when
+        with self.assertNumQueries(2):
+            output = self._get()
+        # then
+        self.assertEqual(output["recordsTotal"], 7)
+        self.assertEqual(output["recordsFiltered"], 7)
+        self.assertEqual(output["totalvalue"], 1)
+        self.assertIsNone(self._get(length=10)["next_cursor"])
+
+    def test_counts_with_search(self):
+        # when
+        output = self._get(mode="kills", **{"search[value]": "Caracal"})
+        # then
+        self.assertEqual(output["recordsTotal"], 7)
+        self.assertEqual(output["recordsFiltered"], 1)
+        self.assertEqual(output["totalvalue"], 110 + 10 + 11 + 12 + 13 + 14)
+        self.assertEqual([km["killmail_id"] for km in output["data"]], [1])
+
+    def test_search_with_filters(self):
+        # when
+        output = self._get(**{"search[value]": "group:cru value>=12"})
+        # then
+        self.assertEqual(output["recordsFiltered"], 4)
+        self.assertEqual([km["killmail_id"] for km in output["data"]], [14, 13, 12])
+
+    @patch("killstats.api.killstats.api_helper.is_closed", return_value=False)
+    def test_stored_killmail_invalidates_its_month(self, _):
+        # given
+        request = self.factory.get("/")
+        october = cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10")[1]
+        november = cache_sytem(request, "hall_11", 2002, "corporation", "2025", "11")[1]
+        set_cache_key(october, ["october"])
+        set_cache_key(november, ["november"])
+        # when
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            patch("killstats.managers.general_manager.esi"),
+        ):
+            Killmail.objects.bulk_create_from_killmails(
+                [
+                    _killmail_body(
+                        20,
+                        "2025-10-04T12:00:00Z",
+                        (1005, 2003, 3003, 10002),
+                        [(1002, 2002, 3002, 20001)],
+                        20,
+                    )
+                ]
+            )
+        # then
+        output, cache_key = cache_sytem(
+            request, "hall_10", 2002, "corporation", "2025", "10"
+        )
+        self.assertIsNone(output)
+        self.assertNotEqual(cache_key, october)
+        self.assertEqual(
+            cache_sytem(request, "hall_11", 2002, "corporation", "2025", "11"),
+            (["november"], None),
+        )
+
+    def _store_october_killmail(self):
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            patch("killstats.managers.general_manager.esi"),
+        ):
+            Killmail.objects.bulk_create_from_killmails(
+                [
+                    _killmail_body(
+                        20,
+                        "2025-10-04T12:00:00Z",
+                        (1005, 2003, 3003, 10002),
+                        [(1002, 2002, 3002, 20001)],
+                        20,
+                    )
+                ]
+            )
+
+    def test_closed_month_is_cached_as_snapshot(self):
+        # given
+        request = self.factory.get("/")
+        cache_key = cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10")[
+            1
+        ]
+        set_cache_key(cache_key, ["october"])
+        # when
+        with self.assertNumQueries(0):
+            output = cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10")
+        # then
+        self.assertTrue(cache_key.endswith("_closed"))
+        self.assertEqual(output, (["october"], None))
+
+    def test_stored_killmail_reopens_closed_month(self):
+        # given
+        request = self.factory.get("/")
+        october = cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10")[1]
+        november = cache_sytem(request, "hall_11", 2002, "corporation", "2025", "11")[1]
+        set_cache_key(october, ["october"])
+        set_cache_key(november, ["november"])
+        # when
+        self._store_october_killmail()
+        # then
+        self.assertEqual(
+            cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10"),
+            (None, october),
+        )
+        self.assertEqual(
+            cache_sytem(request, "hall_11", 2002, "corporation", "2025", "11"),
+            (["november"], None),
+        )
+
+    @patch("killstats.api.killstats.api_helper.api_cache")
+    def test_snapshot_stored_during_computation_expires(self, mock_api_cache):
+        # given
+        mock_api_cache.get.return_value = (None, True)
+        request = self.factory.get("/")
+        cache_key = cache_sytem(request, "hall_10", 2002, "corporation", "2025", "10")[
+            1
+        ]
+        self._store_october_killmail()
+        # when
+        set_cache_key(cache_key, ["october"])
+        # then
+        mock_api_cache.set.assert_called_once_with(
+            cache_key, ["october"], lifetime=60 * KILLSTATS_API_CACHE_LIFETIME
+        )
+
+    def test_warm_cache(self):
+        # given
+        request = self.factory.get(
+            "/",
+            {
+                "draw": 1,
+                "columns[0][data]": "killmail_id",
+                "order[0][column]": 5,
+                "order[0][dir]": "desc",
+                "start": 0,
+                "length": 25,
+                "search[value]": "",
+                "_": 1,
+            },
+        )
+        args = ("10", "2025", "corporation", 2002)
+        # when
+        computed = warm_cache("corporation", 2002, 2025, 10)
+        # then
+        self.assertEqual(computed, 5)
+        self.assertEqual(warm_cache("corporation", 2002, 2025, 10), 0)
+        with self.assertNumQueries(0):
+            halls = cache_sytem(
+                request,
+                get_cache_name("hall", *args),
+                2002,
+                "corporation",
+                "2025",
+                "10",
+            )
+            kills = cache_sytem(
+                request,
+                get_killmails_cache_name(request, *args, "kills"),
+                2002,
+                "corporation",
+                "2025",
+                "10",
+            )
+        self.assertIsNone(halls[1])
+        self.assertIsNone(kills[1])
+        self.assertEqual(kills[0], get_killmails_data(request, *args, "kills"))
@@ -0,0 +1,136 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.test import RequestFactory
+
+# AA Killstats
+from killstats.api.killstats.api_helper import get_all_stats, get_top_10
+from killstats.models.killboard import Killmail
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.test_managers.test_rollup_manager import (
+    _killmail_bodies,
+    _killmail_body,
+)
+from killstats.tests.testdata.eveentity import load_eveentity
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+
+
+class TestStatsFromRollups(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        load_eveentity()
+        cls.factory = RequestFactory()
+
+    def setUp(self) -> None:
+        with patch("killstats.managers.general_manager.esi"):
+            Killmail.objects.bulk_create_from_killmails(_killmail_bodies())
+        self.request = self.factory.get("/")
+
+    def test_get_all_stats(self):
+        # when
+        stats = get_all_stats(self.request, "10", "2025", "corporation", 2001)["stats"]
+        # then
+        self.assertEqual(stats["alltime_killer"]["character_id"], 1001)
+        self.assertEqual(stats["alltime_killer"]["alltime_killer"], 1)
+        self.assertEqual(stats["alltime_victim"]["alltime_victim"], 1)
+        self.assertIsNone(stats["top_killer"])
+        # capsules are no victim ships
+        self.assertEqual(
+            stats["top_victim_ship"],
+            {
+                "victim_ship_id": 17634,
+                "victim_ship__name": "Caracal Navy Issue",
+                "top_victim_ship": 1,
+            },
+        )
+        self.assertEqual(
+            stats["highest_loss"],
+            {
+                "killmail_id": 1,
+                "victim_total_value": 100,
+                "victim_ship__id": 17634,
+                "victim_ship__name": "Caracal Navy Issue",
+            },
+        )
+        self.assertIsNone(stats["highest_kill"])
+
+    def test_get_all_stats_kills(self):
+        # when
+        stats = get_all_stats(self.request, "10", "2025", "corporation", 2002)["stats"]
+        # then
+        self.assertEqual(
+            stats["top_killer"],
+            {
+                "character_id": 1002,
+                "character__name": "rotze Rotineque",
+                "top_killer": 2,
+            },
+        )
+        self.assertEqual(stats["top_ship"]["ship__id"], 20001)
+        self.assertEqual(stats["highest_kill"]["killmail_id"], 1)
+        self.assertEqual(stats["highest_kill"]["killmail__victim_ship__id"], 17634)
+
+    def test_get_all_stats_without_characters(self):
+        # given
+        with patch("killstats.managers.general_manager.esi"):
+            Killmail.objects.bulk_create_from_killmails(
+                [
+                    # NPC attacker on a structure
+                    _killmail_body(
+                        4,
+                        "2025-10-03T12:00:00Z",
+                        (None, 2002, 3002, 20002),
+                        [(None, 2001, 3001, None)],
+                        1_000,
+                    )
+                ]
+            )
+        # when
+        stats_killer = get_all_stats(self.request, "10", "2025", "corporation", 2001)[
+            "stats"
+        ]
+        stats_victim = get_all_stats(self.request, "10", "2025", "corporation", 2002)[
+            "stats"
+        ]
+        # then
+        self.assertEqual(stats_killer["highest_kill"]["killmail_id"], 4)
+        self.assertEqual(stats_victim["highest_loss"]["killmail_id"], 4)
+
+    @patch("killstats.api.killstats.api_helper.get_visible_entities")
+    def test_get_all_stats_top_ship_counts_shared_killmails(self, mock_visible):
+        # given
+        mock_visible.return_value = {
+            "corporations": [2002, 2003],
+            "alliances": [],
+            "unique_id": "test",
+        }
+        with patch("killstats.managers.general_manager.esi"):
+            Killmail.objects.bulk_create_from_killmails(
+                [
+                    _killmail_body(
+                        4,
+                        "2025-10-03T12:00:00Z",
+                        (1004, 2001, 3001, 670),
+                        [(1005, 2002, 3002, 20002), (1006, 2003, 3003, 20002)],
+                        10,
+                    )
+                ]
+            )
+        # when
+        stats = get_all_stats(self.request, "10", "2025", "corporation", 0)["stats"]
+        # then
+        # the shared killmail is counted once for both corporations
+        self.assertEqual(stats["top_ship"]["ship__id"], 20002)
+        self.assertEqual(stats["top_ship"]["count"], 2)
+
+    def test_get_top_10(self):
+        # when
+        top_10 = get_top_10(self.request, "10", "2025", "corporation", 2002)
+        # then
+        self.assertEqual(
+            [(entry["character_id"], entry["kill_count"]) for entry in top_10],
+            [(1002, 2), (1003, 1)],
+        )
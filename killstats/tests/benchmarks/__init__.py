@@ -0,0 +1,30 @@
+"""Benchmarks
+
+Benchmarks run with the test suite at a small size.
+Set ``KILLSTATS_BENCHMARK_SCALE`` to run them at a multiple of that size
+and print the measured results, e.g.::
+
+    KILLSTATS_BENCHMARK_SCALE=10 python runtests.py killstats.tests.benchmarks
+"""
+
+# Standard Library
+import os
+import sys
+
+BENCHMARK_SCALE = int(os.environ.get("KILLSTATS_BENCHMARK_SCALE", "0"))
+
+
+def scaled(size: int) -> int:
+    """Return the benchmark size for the configured scale."""
+    return size * max(BENCHMARK_SCALE, 1)
+
+
+def report(name: str, **results) -> None:
+    """Print benchmark results when running with an explicit scale."""
+    if not BENCHMARK_SCALE:
+        return
+    values = ", ".join(
+        f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in results.items()
+    )
+    sys.stderr.write(f"\n[benchmark] {name}: {values}\n")
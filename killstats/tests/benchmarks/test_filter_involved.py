@@ -0,0 +1,158 @@
+# Standard Library
+import time
+from datetime import datetime, timedelta, timezone
+
+# Django
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+
+# AA Killstats
+from killstats.models.general import EveEntity
+from killstats.models.killboard import Attacker, Killmail, KillmailInvolvement
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.benchmarks import report, scaled
+
+ATTACKERS_PER_KILLMAIL = 20
+CORPORATIONS = 50
+ALLIANCES = 10
+CHARACTERS = 1_000
+
+# 1M killmails and 20M attackers at KILLSTATS_BENCHMARK_SCALE=500
+KILLMAILS = 2_000
+
+
+def _legacy_filter_entities(queryset, entities):
+    """filter_entities before the involvement index, with IDs collected in Python."""
+    km_ids = queryset.values_list("killmail_id", flat=True)
+    attacker_kms_ids = Attacker.objects.filter(
+        models.Q(corporation_id__in=entities)
+        | models.Q(alliance_id__in=entities)
+        | models.Q(character_id__in=entities),
+        killmail_id__in=km_ids,
+    ).values_list("killmail_id", flat=True)
+    victim_kms_ids = queryset.filter(
+        models.Q(victim_id__in=entities)
+        | models.Q(victim_corporation_id__in=entities)
+        | models.Q(victim_alliance_id__in=entities)
+    ).values_list("killmail_id", flat=True)
+    combined_kms_ids = set(attacker_kms_ids).union(victim_kms_ids)
+    return queryset.filter(killmail_id__in=combined_kms_ids)
+
+
+def _legacy_filter_entities_kills(queryset, entities):
+    km_ids = queryset.values_list("killmail_id", flat=True)
+    kms = list(
+        Attacker.objects.filter(
+            models.Q(corporation_id__in=entities)
+            | models.Q(alliance_id__in=entities)
+            | models.Q(character_id__in=entities),
+            killmail_id__in=km_ids,
+        ).values_list("killmail_id", flat=True)
+    )
+    return queryset.filter(killmail_id__in=kms)
+
+
+def _create_killmails(total: int):
+    corporations = [2_100_000 + i for i in range(CORPORATIONS)]
+    alliances = [3_100_000 + i for i in range(ALLIANCES)]
+    characters = [1_100_000 + i for i in range(CHARACTERS)]
+    EveEntity.objects.bulk_create(
+        [
+            EveEntity(id=eve_id, name=str(eve_id), category="character")
+            for eve_id in characters
+        ]
+        + [
+            EveEntity(id=eve_id, name=str(eve_id), category="corporation")
+            for eve_id in corporations
+        ]
+        + [
+            EveEntity(id=eve_id, name=str(eve_id), category="alliance")
+            for eve_id in alliances
+        ]
+    )
+
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    batch_size = 1_000
+    for offset in range(0, total, batch_size):
+        killmails = [
+            Killmail(
+                killmail_id=i + 1,
+                killmail_date=start + timedelta(minutes=i % 40_000),
+                victim_id=characters[i % CHARACTERS],
+                victim_corporation_id=corporations[i % CORPORATIONS],
+                victim_alliance_id=alliances[i % ALLIANCES],
+                hash=f"benchmark_{i}",
+                victim_total_value=i,
+            )
+            for i in range(offset, min(offset + batch_size, total))
+        ]
+        Killmail.objects.bulk_create(killmails)
+        attackers = [
+            Attacker(
+                killmail_id=km.killmail_id,
+                character_id=characters[(km.killmail_id * 7 + n) % CHARACTERS],
+                corporation_id=corporations[(km.killmail_id * 3 + n) % CORPORATIONS],
+                alliance_id=alliances[(km.killmail_id + n) % ALLIANCES],
+            )
+            for km in killmails
+            for n in range(ATTACKERS_PER_KILLMAIL)
+        ]
+        Attacker.objects.bulk_create(
+            attackers, batch_size=batch_size * ATTACKERS_PER_KILLMAIL
+        )
+        KillmailInvolvement.objects.bulk_create(
+            KillmailInvolvement.objects.build(killmails, attackers),
+            batch_size=batch_size * ATTACKERS_PER_KILLMAIL,
+        )
+    return corporations[:1]
+
+
+def _legacy_page(entities) -> tuple[list, int]:
+    """Return the first page and the count of kills before the involvement index."""
+    killmails = _legacy_filter_entities(
+        Killmail.objects.filter(
+            killmail_date__year=2025, killmail_date__month=10
+        ).order_by("-killmail_date"),
+        entities,
+    )
+    killmails = _legacy_filter_entities_kills(killmails, entities)
+    return list(killmails.values_list("killmail_id", flat=True)[:25]), killmails.count()
+
+
+def _page(entities) -> tuple[list, int]:
+    """Return the first page and the count of kills, as the killboard endpoint does."""
+    killmails = Killmail.objects.filter_involved(
+        entities, role=KillmailInvolvement.ROLE_KILL, year=2025, month=10
+    ).order_by("-killmail_date")
+    return list(killmails.values_list("killmail_id", flat=True)[:25]), killmails.count()
+
+
+def _measure(page, entities):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        result = page(entities)
+        duration = time.perf_counter() - start
+    return result, duration, sum(len(query["sql"]) for query in queries)
+
+
+class TestFilterInvolvedBenchmark(NoSocketsTestCase):
+    def test_busy_corporation(self):
+        total = scaled(KILLMAILS)
+        entities = _create_killmails(total)
+
+        legacy, legacy_time, legacy_bytes = _measure(_legacy_page, entities)
+        result, duration, sql_bytes = _measure(_page, entities)
+
+        report(
+            "filter involved",
+            killmails=total,
+            attackers=total * ATTACKERS_PER_KILLMAIL,
+            matched=result[1],
+            legacy_s=legacy_time,
+            legacy_sql_bytes=legacy_bytes,
+            involved_s=duration,
+            involved_sql_bytes=sql_bytes,
+        )
+        self.assertEqual(result, legacy)
+        self.assertGreater(result[1], 0)
+        self.assertLess(sql_bytes * 10, legacy_bytes)
@@ -0,0 +1,112 @@
+# Standard Library
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from unittest.mock import patch
+
+# AA Killstats
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailAttackerColumns,
+    KillmailBody,
+)
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.benchmarks import report, scaled
+
+MODULE_PATH = "killstats.helpers.killmail"
+
+# KillmailAttacker before slots, with a __dict__ per instance
+LegacyAttacker = make_dataclass(
+    "LegacyAttacker",
+    [(f.name, f.type, field(default=None)) for f in fields(KillmailAttacker)],
+)
+
+
+def _legacy_extract_attackers(killmail_data: dict) -> list:
+    """Attacker extraction before slots, with a params dict per attacker."""
+    attackers = []
+    for attacker_data in killmail_data.get("attackers", []):
+        params = {}
+        for prop in KillmailAttacker.ENTITY_PROPS + [
+            "damage_done",
+            "security_status",
+        ]:
+            if prop in attacker_data:
+                params[prop] = attacker_data[prop]
+
+        if "final_blow" in attacker_data:
+            params["final_blow"] = attacker_data["final_blow"]
+
+        attackers.append(LegacyAttacker(**params))
+    return attackers
+
+
+def _esi_killmail(attackers: int) -> dict:
+    return {
+        "attackers": [
+            {
+                "alliance_id": 99_000_000 + i % 20,
+                "character_id": 90_000_000 + i,
+                "corporation_id": 98_000_000 + i % 100,
+                "damage_done": 1_000 + i,
+                "final_blow": i == 0,
+                "security_status": -5.0 + i % 10,
+                "ship_type_id": 17_000 + i % 50,
+                "weapon_type_id": 2_000 + i % 30,
+            }
+            for i in range(attackers)
+        ]
+    }
+
+
+def _measure(extract, killmail_json: str) -> tuple[list, int, float]:
+    """Return the attackers, their retained memory in bytes and the parse time.
+
+    The response data is decoded and dropped while measuring,
+    so only the memory kept by the attackers is counted.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        attackers = extract(json.loads(killmail_json))
+        duration = time.perf_counter() - start
+        gc.collect()
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return attackers, memory, duration
+
+
+class TestKillmailMemoryBenchmark(NoSocketsTestCase):
+    def test_fleet_fight(self):
+        killmail_json = json.dumps(_esi_killmail(scaled(2000)))
+
+        legacy, legacy_memory, legacy_time = _measure(
+            _legacy_extract_attackers, killmail_json
+        )
+        with patch(MODULE_PATH + ".KILLSTATS_ATTACKER_COLUMNS_THRESHOLD", None):
+            slotted, slotted_memory, slotted_time = _measure(
+                KillmailBody._extract_attackers, killmail_json
+            )
+        columns, columns_memory, columns_time = _measure(
+            KillmailBody._extract_attackers, killmail_json
+        )
+
+        report(
+            "killmail memory",
+            attackers=len(columns),
+            legacy_bytes_per_attacker=legacy_memory // len(legacy),
+            legacy_parse=legacy_time,
+            slotted_bytes_per_attacker=slotted_memory // len(slotted),
+            slotted_parse=slotted_time,
+            columns_bytes_per_attacker=columns_memory // len(columns),
+            columns_parse=columns_time,
+        )
+        self.assertIsInstance(columns, KillmailAttackerColumns)
+        self.assertEqual(columns, slotted)
+        self.assertEqual(columns[-1].damage_done, legacy[-1].damage_done)
+        self.assertLess(slotted_memory, legacy_memory)
+        self.assertLess(columns_memory, slotted_memory / 2)
@@ -0,0 +1,48 @@
+# Standard Library
+import time
+
+# AA Killstats
+from killstats.helpers.codec import DataclassCodec
+from killstats.helpers.killmail import KillmailBody, _storage_codec
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.benchmarks import report, scaled
+from killstats.tests.helpers.test_codec import _killmail_body
+
+
+def _timed(func, rounds: int) -> float:
+    """Return the average duration of func in µs."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1_000_000
+
+
+class TestStorageCodecBenchmark(NoSocketsTestCase):
+    def test_fleet_fight(self):
+        killmail_body = _killmail_body(scaled(500))
+        rounds = 20
+
+        legacy_data = killmail_body.asjson()
+        data = killmail_body.encode()
+        uncompressed = DataclassCodec(KillmailBody).encode(killmail_body)
+
+        legacy_encode = _timed(killmail_body.asjson, rounds)
+        legacy_decode = _timed(lambda: KillmailBody.from_json(legacy_data), rounds)
+        encode = _timed(killmail_body.encode, rounds)
+        decode = _timed(lambda: KillmailBody.decode(data), rounds)
+
+        report(
+            "storage codec",
+            attackers=len(killmail_body.attackers),
+            serializer=_storage_codec.serializer,
+            legacy_bytes=len(legacy_data.encode()),
+            legacy_encode_us=legacy_encode,
+            legacy_decode_us=legacy_decode,
+            uncompressed_bytes=len(uncompressed),
+            bytes=len(data),
+            encode_us=encode,
+            decode_us=decode,
+        )
+        self.assertEqual(KillmailBody.decode(data), killmail_body)
+        self.assertLess(len(data), len(legacy_data.encode()) / 4)
+        self.assertLess(decode, legacy_decode)
@@ -0,0 +1,198 @@
+# Standard Library
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Django
+from django.db import transaction
+from django.utils import timezone
+
+# Alliance Auth (External Libs)
+from eve_sde.models import ItemType, SolarSystem
+
+# AA Killstats
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailBody,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+)
+from killstats.models.killboard import Killmail
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.benchmarks import report, scaled
+from killstats.tests.testdata.eveentity import load_eveentity
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+
+MODULE_PATH = "killstats.managers.general_manager"
+
+# Simulated round-trip time of an ESI request
+ESI_LATENCY = 0.02
+
+
+class TimedAtomic:
+    """Replacement for transaction.atomic, recording outermost transaction durations."""
+
+    def __init__(self):
+        self.durations = []
+        self._atomic = transaction.atomic
+        self._depth = 0
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._depth > 0
+
+    def __call__(self, *args, **kwargs):
+        if args and callable(args[0]):
+            return self._atomic(*args, **kwargs)
+        return self._timed(*args, **kwargs)
+
+    @contextmanager
+    def _timed(self, *args, **kwargs):
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            with self._atomic(*args, **kwargs):
+                yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.durations.append(time.perf_counter() - start)
+
+
+class FakeESI:
+    """Resolve names with a simulated ESI latency."""
+
+    def __init__(self, timed_atomic: TimedAtomic):
+        self.timed_atomic = timed_atomic
+        self.calls = 0
+        self.calls_in_transaction = 0
+
+    def post_universe_names(self, eve_ids):
+        self.calls += 1
+        if self.timed_atomic.in_transaction:
+            self.calls_in_transaction += 1
+        time.sleep(ESI_LATENCY)
+        return [
+            SimpleNamespace(id=eve_id, name=f"Entity {eve_id}", category=category)
+            for eve_id in eve_ids
+            for category in [_category(eve_id)]
+        ]
+
+
+def _category(eve_id: int) -> str:
+    if eve_id >= 99_000_000:
+        return "alliance"
+    if eve_id >= 98_000_000:
+        return "corporation"
+    return "character"
+
+
+def _killmail_body(killmail_id: int, attackers: int) -> KillmailBody:
+    """Killmail with unknown attacker characters, corporations and alliances."""
+    offset = killmail_id * 10_000
+    return KillmailBody(
+        id=killmail_id,
+        time=timezone.now(),
+        victim=KillmailVictim(
+            character_id=1001, corporation_id=2001, alliance_id=3001, ship_type_id=670
+        ),
+        attackers=[
+            KillmailAttacker(
+                character_id=90_000_000 + offset + i,
+                corporation_id=98_000_000 + offset + i % 5,
+                alliance_id=99_000_000 + offset + i % 2,
+                ship_type_id=670,
+            )
+            for i in range(attackers)
+        ],
+        position=KillmailPosition(x=1.0, y=1.0, z=1.0),
+        zkb=KillmailZkb(hash=f"benchmark_{killmail_id}", total_value=1000),
+    )
+
+
+def _legacy_create_from_killmail(killmail_body: KillmailBody) -> Killmail:
+    """Store path before the resolve/commit split, with ESI requests inside the transaction."""
+    with transaction.atomic():
+        region_id = (
+            SolarSystem.objects.filter(id=killmail_body.solar_system_id)
+            .values_list("constellation__region_id", flat=True)
+            .first()
+        )
+        victim_ship = ItemType.objects.get(id=killmail_body.victim.ship_type_id)
+        victim = killmail_body.get_or_create_entity(killmail_body.victim.character_id)
+        killmail_body.create_names_bulk(
+            eve_ids=list(
+                {
+                    attacker.character_id
+                    for attacker in killmail_body.attackers
+                    if attacker.character_id
+                }
+            )
+        )
+        km = Killmail.objects.create(
+            killmail_id=killmail_body.id,
+            killmail_date=killmail_body.time,
+            victim=victim,
+            victim_ship=victim_ship,
+            victim_corporation_id=killmail_body.victim.corporation_id,
+            victim_alliance_id=killmail_body.victim.alliance_id,
+            hash=killmail_body.zkb.hash,
+            victim_total_value=killmail_body.zkb.total_value,
+            victim_region_id=region_id,
+        )
+        killmail_body.get_or_create_attackers(km, killmail_body)
+    return km
+
+
+class TestStoreTransactionBenchmark(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        load_eveentity()
+
+    def _measure(self, store, killmail_body):
+        timed_atomic = TimedAtomic()
+        fake_esi = FakeESI(timed_atomic)
+        with (
+            patch(
+                MODULE_PATH + ".EveEntityManager._post_universe_names",
+                side_effect=fake_esi.post_universe_names,
+            ),
+            patch.object(transaction, "atomic", timed_atomic),
+        ):
+            start = time.perf_counter()
+            store(killmail_body)
+            total = time.perf_counter() - start
+        return sum(timed_atomic.durations), total, fake_esi
+
+    def test_transaction_duration(self):
+        attackers = scaled(20)
+
+        legacy_transaction, legacy_total, legacy_esi = self._measure(
+            _legacy_create_from_killmail, _killmail_body(1, attackers)
+        )
+        transaction_time, total, esi = self._measure(
+            Killmail.objects.create_from_killmail, _killmail_body(2, attackers)
+        )
+
+        report(
+            "store transaction",
+            attackers=attackers,
+            legacy_transaction=legacy_transaction,
+            legacy_total=legacy_total,
+            legacy_esi_calls=legacy_esi.calls,
+            transaction=transaction_time,
+            total=total,
+            esi_calls=esi.calls,
+        )
+        self.assertEqual(
+            Killmail.objects.get(killmail_id=2).attacker_killmail.count(), attackers
+        )
+        # no ESI request is made while the transaction is open
+        self.assertEqual(legacy_esi.calls_in_transaction, legacy_esi.calls)
+        self.assertEqual(esi.calls_in_transaction, 0)
+        self.assertEqual(esi.calls, 1)
+        self.assertLess(transaction_time, legacy_transaction)
@@ -0,0 +1,81 @@
+# Standard Library
+import time
+from unittest.mock import patch
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.apicache import ApiCache
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.apicache"
+
+
+class TestApiCache(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.api_cache = ApiCache(lifetime=600, stale_lifetime=600, jitter=0.1)
+
+    def test_fresh_value(self):
+        # given
+        self.api_cache.set("stats_1", {"stats": 1})
+        # when/then
+        self.assertEqual(self.api_cache.get("stats_1"), ({"stats": 1}, False))
+
+    def test_jittered_lifetime(self):
+        # when
+        self.api_cache.set("stats_1", 1, lifetime=100)
+        # then
+        fresh_for = cache.get("stats_1").fresh_until - time.time()
+        self.assertGreater(fresh_for, 89)
+        self.assertLess(fresh_for, 111)
+
+    def test_max_timeout(self):
+        # when
+        with (
+            patch(MODULE_PATH + ".random.uniform", return_value=1.1),
+            patch(MODULE_PATH + ".cache.set") as mock_set,
+        ):
+            self.api_cache.set("stats_1", 1, lifetime=100)
+        # then
+        self.assertEqual(self.api_cache.max_timeout(100), 711)
+        self.assertLessEqual(
+            mock_set.call_args.kwargs["timeout"], self.api_cache.max_timeout(100)
+        )
+
+    def test_stale_value_served_while_refreshed(self):
+        # given
+        self.api_cache.set("stats_1", "old", lifetime=-1)
+        # when
+        refresher = self.api_cache.get("stats_1")
+        concurrent = self.api_cache.get("stats_1")
+        self.api_cache.set("stats_1", "new")
+        # then
+        self.assertEqual(refresher, (None, True))
+        self.assertEqual(concurrent, ("old", False))
+        self.assertEqual(self.api_cache.get("stats_1"), ("new", False))
+
+    def test_missing_value_waits_for_refresh(self):
+        # given
+        self.assertEqual(self.api_cache.get("stats_1"), (None, True))
+        # when
+        with patch(MODULE_PATH + ".time.sleep") as mock_sleep:
+            mock_sleep.side_effect = lambda _: self.api_cache.set("stats_1", "new")
+            result = self.api_cache.get("stats_1")
+        # then
+        self.assertEqual(result, ("new", False))
+        mock_sleep.assert_called_once()
+
+    @patch(MODULE_PATH + ".REFRESH_WAIT_TIMEOUT", 0)
+    def test_missing_value_computed_after_wait_timeout(self):
+        # given
+        self.api_cache.get("stats_1")
+        # when/then
+        self.assertEqual(self.api_cache.get("stats_1"), (None, True))
+
+    def test_plain_cached_values_are_missing(self):
+        # given
+        cache.set("stats_1", {"stats": 1})
+        # when/then
+        self.assertEqual(self.api_cache.get("stats_1"), (None, True))
@@ -0,0 +1,134 @@
+# Standard Library
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from unittest import skipIf
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers import codec
+from killstats.helpers.codec import (
+    SERIALIZER_JSON,
+    SERIALIZER_MSGPACK,
+    SERIALIZER_ORJSON,
+    CodecError,
+    DataclassCodec,
+)
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailBody,
+    KillmailDoesNotExist,
+    KillmailItems,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+)
+from killstats.tests import NoSocketsTestCase
+
+
+def _killmail_body(attackers: int = 3) -> KillmailBody:
+    return KillmailBody(
+        id=1,
+        time=datetime(2025, 10, 1, 12, 30, 45, tzinfo=timezone.utc),
+        victim=KillmailVictim(
+            character_id=1001,
+            corporation_id=2001,
+            ship_type_id=670,
+            items=[KillmailItems(5, 2048, None, 1, 0, 0)],
+            position=KillmailPosition(x=1.5, y=2.5, z=3.5),
+            damage_taken=500,
+        ),
+        attackers=[
+            KillmailAttacker(
+                character_id=1002 + i,
+                corporation_id=2002,
+                ship_type_id=670,
+                damage_done=100,
+                final_blow=i == 0,
+                security_status=-1.5,
+            )
+            for i in range(attackers)
+        ],
+        position=KillmailPosition(x=1.5, y=2.5, z=3.5),
+        zkb=KillmailZkb(hash="abc", total_value=1_000_000.5, is_solo=False),
+        solar_system_id=30004783,
+    )
+
+
+class TestDataclassCodec(NoSocketsTestCase):
+    def _assert_roundtrip(self, storage_codec: DataclassCodec):
+        killmail_body = _killmail_body()
+
+        data = storage_codec.encode(killmail_body)
+
+        self.assertTrue(DataclassCodec.is_encoded(data))
+        self.assertEqual(storage_codec.decode(data), killmail_body)
+
+    def test_roundtrip_json(self):
+        self._assert_roundtrip(DataclassCodec(KillmailBody, serializer=SERIALIZER_JSON))
+
+    @skipIf(codec.orjson is None, "orjson is not installed")
+    def test_roundtrip_orjson(self):
+        self._assert_roundtrip(
+            DataclassCodec(KillmailBody, serializer=SERIALIZER_ORJSON)
+        )
+
+    @skipIf(codec.msgpack is None, "msgpack is not installed")
+    def test_roundtrip_msgpack(self):
+        self._assert_roundtrip(
+            DataclassCodec(KillmailBody, serializer=SERIALIZER_MSGPACK)
+        )
+
+    def test_compress_above_threshold(self):
+        storage_codec = DataclassCodec(KillmailBody, compress_threshold=1024)
+        small, large = _killmail_body(1), _killmail_body(100)
+
+        small_data = storage_codec.encode(small)
+        large_data = storage_codec.encode(large)
+
+        self.assertFalse(small_data[3] & codec.FLAG_COMPRESSED)
+        self.assertTrue(large_data[3] & codec.FLAG_COMPRESSED)
+        self.assertEqual(storage_codec.decode(small_data), small)
+        self.assertEqual(storage_codec.decode(large_data), large)
+
+    def test_decode_rejects_other_fields(self):
+        @dataclass
+        class Other:
+            id: int
+
+        data = DataclassCodec(Other).encode(Other(id=1))
+
+        with self.assertRaises(CodecError):
+            DataclassCodec(KillmailBody).decode(data)
+        with self.assertRaises(CodecError):
+            DataclassCodec(KillmailBody).decode(b"{}")
+
+
+class TestKillmailStorage(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_save_and_get(self):
+        killmail_body = _killmail_body()
+
+        killmail_body.save()
+
+        self.assertIsInstance(cache.get(KillmailBody._storage_key(1)), bytes)
+        self.assertEqual(KillmailBody.get(1), killmail_body)
+
+    def test_get_legacy_json(self):
+        killmail_body = _killmail_body()
+        cache.set(KillmailBody._storage_key(1), killmail_body.asjson())
+
+        self.assertEqual(KillmailBody.get(1), killmail_body)
+
+    def test_get_unreadable(self):
+        @dataclass
+        class Other:
+            id: int
+
+        cache.set(KillmailBody._storage_key(1), DataclassCodec(Other).encode(Other(1)))
+
+        with self.assertRaises(KillmailDoesNotExist):
+            KillmailBody.get(1)
@@ -0,0 +1,93 @@
+# Standard Library
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.errors import EsiUnavailable, ObjectNotFound
+from killstats.helpers.entities import entity_resolver
+from killstats.models.general import EveEntity
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.eveentity import load_eveentity
+
+MODULE_PATH = "killstats.helpers.entities"
+MANAGER_PATH = "killstats.managers.general_manager.EveEntityManager"
+
+
+def _post_universe_names(eve_ids):
+    # ESI rejects the whole request if a single ID is unknown
+    if any(eve_id >= 100_000 for eve_id in eve_ids):
+        raise ObjectNotFound(f"Unknown IDs in {eve_ids}")
+    return [
+        SimpleNamespace(id=eve_id, name=f"Entity {eve_id}", category="character")
+        for eve_id in eve_ids
+    ]
+
+
+@patch(MANAGER_PATH + "._post_universe_names", side_effect=_post_universe_names)
+class TestEveEntityResolver(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_eveentity()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_known_ids_from_caches(self, mock_post_names):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                entity_resolver.known_ids([1001, 2001, 9999]), {1001, 2001}
+            )
+
+        # in-process cache
+        with self.assertNumQueries(0):
+            self.assertEqual(entity_resolver.known_ids([1001, 2001]), {1001, 2001})
+
+        # shared Redis set of another worker
+        entity_resolver.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(entity_resolver.known_ids([1001, 2001]), {1001, 2001})
+
+        mock_post_names.assert_not_called()
+        self.assertEqual(entity_resolver.get(1001)[1], "character")
+
+    def test_resolve_creates_missing(self, mock_post_names):
+        result = entity_resolver.resolve([1001, 9996, 9997, None])
+
+        self.assertEqual(result, {1001, 9996, 9997})
+        mock_post_names.assert_called_once_with([9996, 9997])
+        self.assertEqual(EveEntity.objects.get(id=9997).name, "Entity 9997")
+
+        with self.assertNumQueries(0):
+            entity_resolver.resolve([1001, 9996, 9997])
+        mock_post_names.assert_called_once()
+
+    def test_resolve_negative_cache(self, mock_post_names):
+        self.assertEqual(entity_resolver.resolve([9996, 123456]), {9996})
+        # the rejected bulk request is repeated per ID
+        self.assertEqual(mock_post_names.call_count, 3)
+
+        mock_post_names.reset_mock()
+        self.assertEqual(entity_resolver.resolve([9996, 123456]), {9996})
+        mock_post_names.assert_not_called()
+
+    def test_resolve_esi_unavailable(self, mock_post_names):
+        mock_post_names.side_effect = EsiUnavailable("ESI is down")
+
+        with self.assertRaises(EsiUnavailable):
+            entity_resolver.resolve([9996])
+        # transient errors are not cached and not retried per ID
+        mock_post_names.assert_called_once()
+
+        mock_post_names.side_effect = _post_universe_names
+        self.assertEqual(entity_resolver.resolve([9996]), {9996})
+
+    def test_forget_on_delete(self, mock_post_names):
+        entity_resolver.known_ids([1001])
+
+        EveEntity.objects.filter(id=1001).delete()
+
+        self.assertEqual(entity_resolver.known_ids([1001]), set())
@@ -0,0 +1,55 @@
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.generations import StatsGenerations
+from killstats.tests import NoSocketsTestCase
+
+
+class TestStatsGenerations(NoSocketsTestCase):
+    def setUp(self) -> None:
+        self.generations = StatsGenerations("KILLSTATS_TEST_GENERATION", 60, 60)
+        redis = get_redis_client()
+        redis.delete(*redis.keys("KILLSTATS_TEST_GENERATION_*") or ["none"])
+
+    def test_bump(self):
+        # when
+        self.generations.bump({(2001, 2025, 10), (2001, 2025, 11)})
+        # then
+        self.assertEqual(self.generations.generation(2001, 2025, 10), 1)
+        self.assertEqual(self.generations.generation(2001, 2025), 1)
+        self.assertIsNone(self.generations.generation(2002, 2025, 10))
+
+    def test_token_changes_with_affected_buckets(self):
+        # given
+        october = self.generations.token([2001, 2002], 2025, 10)
+        november = self.generations.token([2001, 2002], 2025, 11)
+        year = self.generations.token([2001], 2025)
+        # when
+        self.generations.bump({(2002, 2025, 10)})
+        # then
+        self.assertNotEqual(self.generations.token([2001, 2002], 2025, 10), october)
+        self.assertEqual(self.generations.token([2001, 2002], 2025, 11), november)
+        self.assertEqual(self.generations.token([2001], 2025), year)
+        self.assertEqual(self.generations.token([2002], 2025), "1")
+        self.assertEqual(self.generations.token([], 2025), "0")
+
+    def test_bump_deletes_snapshots_of_bucket(self):
+        # given
+        cache.set("KILLSTATS_TEST_SNAPSHOT_10", "october")
+        cache.set("KILLSTATS_TEST_SNAPSHOT_11", "november")
+        cache.set("KILLSTATS_TEST_SNAPSHOT_YEAR", "year")
+        self.generations.register_snapshot(
+            "KILLSTATS_TEST_SNAPSHOT_10", [2001], 2025, 10
+        )
+        self.generations.register_snapshot(
+            "KILLSTATS_TEST_SNAPSHOT_11", [2001], 2025, 11
+        )
+        self.generations.register_snapshot("KILLSTATS_TEST_SNAPSHOT_YEAR", [2001], 2025)
+        # when
+        self.generations.bump({(2001, 2025, 10)})
+        # then
+        self.assertIsNone(cache.get("KILLSTATS_TEST_SNAPSHOT_10"))
+        self.assertIsNone(cache.get("KILLSTATS_TEST_SNAPSHOT_YEAR"))
+        self.assertEqual(cache.get("KILLSTATS_TEST_SNAPSHOT_11"), "november")
@@ -0,0 +1,50 @@
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.idempotency import (
+    STATE_DONE,
+    STATE_PENDING,
+    IdempotencyGuard,
+)
+from killstats.tests import NoSocketsTestCase
+
+
+class TestIdempotencyGuard(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.guard = IdempotencyGuard(
+            key="TEST_CLAIM",
+            metrics_key="TEST_METRICS",
+            pending_timeout=600,
+            done_timeout=60,
+        )
+
+    def test_claim_once(self):
+        self.assertTrue(self.guard.claim(1))
+        self.assertFalse(self.guard.claim(1))
+        self.assertTrue(self.guard.claim(2))
+
+        self.assertEqual(self.guard.state(1), STATE_PENDING)
+        self.assertEqual(self.guard.metrics(), {"claimed": 2, "coalesced": 1})
+
+    def test_complete_keeps_claim(self):
+        self.guard.claim(1)
+
+        self.guard.complete([1])
+
+        self.assertFalse(self.guard.claim(1))
+        self.assertEqual(self.guard.state(1), STATE_DONE)
+        self.assertLessEqual(get_redis_client().ttl("TEST_CLAIM_1"), 60)
+        self.assertEqual(self.guard.metrics()["completed"], 1)
+
+    def test_release_allows_new_claim(self):
+        self.guard.claim(1)
+
+        self.guard.release([1])
+        self.guard.release([])
+
+        self.assertIsNone(self.guard.state(1))
+        self.assertTrue(self.guard.claim(1))
+        self.assertEqual(self.guard.metrics()["released"], 1)
@@ -1,5 +1,4 @@
 # Standard Library
-from datetime import timedelta
 from unittest.mock import Mock, patch
 
 # Django
@@ -9,8 +8,19 @@ from django.utils import timezone
 
 # AA Killstats
 from killstats import __title__
-from killstats.constants import LAST_REQUEST_KEY, RETRY_AFTER_KEY
-from killstats.helpers.killmail import KillmailBody
+from killstats.app_settings import KILLSTATS_ESI_RATE_TIMEOUT
+from killstats.constants import RETRY_DELAY
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailAttackerColumns,
+    KillmailBody,
+    KillmailDoesNotExist,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+    R2Z2SequenceNotFound,
+)
+from killstats.helpers.ratelimit import ESI, ZKB_API, ZKB_R2Z2
 from killstats.tests import NoSocketsTestCase
 from killstats.tests.testdata.load_allianceauth import load_allianceauth
 
@@ -29,105 +39,105 @@ class TestKillmailHelper(NoSocketsTestCase):
     def setUp(self) -> None:
         cache.clear()
 
-    @patch(MODULE_PATH + ".time.sleep")
-    def test_rate_limit_waits_for_retry_after(self, mocked_sleep):
-        now = timezone.now()
-        retry_after = now + timedelta(seconds=0.75)
-        cache.set(RETRY_AFTER_KEY, retry_after)
-
-        with patch(MODULE_PATH + ".timezone.now", return_value=now):
+    @patch(MODULE_PATH + ".ratelimiter.acquire", return_value=True)
+    def test_rate_limit(self, mock_acquire):
+        with patch(MODULE_PATH + ".KILLSTATS_ZKB_RATE_TIMEOUT", 0.5):
             result = KillmailBody._rate_limit()
 
         self.assertTrue(result)
-        mocked_sleep.assert_called_once_with(0.75)
-
-    @patch(MODULE_PATH + ".time.sleep")
-    def test_rate_limit_waits_when_within_timeout(self, mocked_sleep):
-        now = timezone.now()
-        # min_interval = 1 / 2 = 0.5s, elapsed = 0.2s => wait = 0.3s
-        last_request = now - timedelta(seconds=0.2)
-        cache.set(LAST_REQUEST_KEY, last_request.isoformat())
-
-        with (
-            patch(MODULE_PATH + ".KILLSTATS_MAX_ZKB_PER_SEC", 2),
-            patch(MODULE_PATH + ".KILLSTATS_ZKB_RATE_TIMEOUT", 0.5),
-            patch(MODULE_PATH + ".timezone.now", return_value=now),
-        ):
-            result = KillmailBody._rate_limit()
+        mock_acquire.assert_called_once_with(ZKB_R2Z2, timeout=0.5)
 
-        self.assertTrue(result)
-        mocked_sleep.assert_called_once_with(0.3)
-
-    @patch(MODULE_PATH + ".time.sleep")
-    def test_rate_limit_skips_when_wait_exceeds_timeout(self, mocked_sleep):
-        now = timezone.now()
-        # min_interval = 1 / 2 = 0.5s, elapsed = 0.1s => wait = 0.4s (> timeout 0.2s)
-        last_request = now - timedelta(seconds=0.1)
-        cache.set(LAST_REQUEST_KEY, last_request.isoformat())
-
-        with (
-            patch(MODULE_PATH + ".KILLSTATS_MAX_ZKB_PER_SEC", 2),
-            patch(MODULE_PATH + ".KILLSTATS_ZKB_RATE_TIMEOUT", 0.2),
-            patch(MODULE_PATH + ".timezone.now", return_value=now),
-        ):
-            result = KillmailBody._rate_limit()
+    @patch(MODULE_PATH + ".ratelimiter.acquire", return_value=False)
+    def test_rate_limit_skips_when_wait_exceeds_timeout(self, _mock_acquire):
+        result = KillmailBody._rate_limit(ZKB_API)
 
         self.assertFalse(result)
-        mocked_sleep.assert_not_called()
 
-    @patch(MODULE_PATH + ".requests.get")
+    @patch(MODULE_PATH + ".esi")
+    @patch(MODULE_PATH + ".ratelimiter.acquire", return_value=False)
+    def test_process_killmail_data_esi_rate_limited(self, mock_acquire, mock_esi):
+        with self.assertRaises(ValueError):
+            KillmailBody._process_killmail_data(
+                {"killmail_id": 1, "zkb": {"hash": "hash"}}
+            )
+
+        mock_acquire.assert_called_once_with(ESI, timeout=KILLSTATS_ESI_RATE_TIMEOUT)
+        mock_esi.client.Killmails.GetKillmailsKillmailIdKillmailHash.assert_not_called()
+
+    @patch(MODULE_PATH + ".ratelimiter.backoff")
+    def test_too_many_requests_delay_backs_off(self, mock_backoff):
+        response = Mock()
+        response.status_code = 429
+        response.headers = {"Retry-After": "7"}
+
+        result = KillmailBody._too_many_requests_delay(response)
+
+        self.assertTrue(result)
+        mock_backoff.assert_called_once_with(ZKB_R2Z2, 7)
+
+    @patch(MODULE_PATH + ".ratelimiter.backoff")
+    def test_too_many_requests_delay_without_retry_after(self, mock_backoff):
+        response = Mock()
+        response.status_code = 429
+        response.headers = {}
+
+        result = KillmailBody._too_many_requests_delay(response, ZKB_API)
+
+        self.assertTrue(result)
+        mock_backoff.assert_called_once_with(ZKB_API, RETRY_DELAY)
+
+    @patch(MODULE_PATH + ".zkb.get")
     @patch.object(KillmailBody, "_rate_limit", return_value=False)
     def test_get_sequence_from_r2z2_returns_none_when_rate_limited(
-        self, _mock_rate_limit, mock_requests_get
+        self, _mock_rate_limit, mock_zkb_get
     ):
         result = KillmailBody.get_sequence_from_r2z2()
 
         self.assertIsNone(result)
-        mock_requests_get.assert_not_called()
+        mock_zkb_get.assert_not_called()
 
-    @patch(MODULE_PATH + ".requests.get")
+    @patch(MODULE_PATH + ".zkb.get")
     @patch.object(KillmailBody, "_too_many_requests_delay", return_value=False)
     @patch.object(KillmailBody, "_rate_limit", return_value=True)
     def test_get_sequence_from_r2z2_returns_sequence(
-        self, _mock_rate_limit, _mock_delay, mock_requests_get
+        self, _mock_rate_limit, _mock_delay, mock_zkb_get
     ):
         response = Mock()
         response.json.return_value = {"sequence": 123456}
-        mock_requests_get.return_value = response
+        mock_zkb_get.return_value = response
 
         result = KillmailBody.get_sequence_from_r2z2()
 
         self.assertEqual(result, 123456)
-        self.assertIsNotNone(cache.get(LAST_REQUEST_KEY))
-        mock_requests_get.assert_called_once()
+        mock_zkb_get.assert_called_once()
 
-    @patch(MODULE_PATH + ".requests.get")
+    @patch(MODULE_PATH + ".zkb.get")
     @patch.object(KillmailBody, "_too_many_requests_delay", return_value=True)
     @patch.object(KillmailBody, "_rate_limit", return_value=True)
     def test_get_sequence_from_r2z2_returns_none_on_too_many_requests(
-        self, _mock_rate_limit, _mock_delay, mock_requests_get
+        self, _mock_rate_limit, _mock_delay, mock_zkb_get
     ):
         response = Mock()
         response.json.return_value = {"sequence": 123456}
-        mock_requests_get.return_value = response
+        mock_zkb_get.return_value = response
 
         result = KillmailBody.get_sequence_from_r2z2()
 
         self.assertIsNone(result)
 
-    @patch(MODULE_PATH + ".requests.get")
+    @patch(MODULE_PATH + ".zkb.get")
     @patch.object(KillmailBody, "_rate_limit", return_value=True)
     def test_create_from_r2z2_sequence_returns_none_on_worker_shutdown(
-        self, _mock_rate_limit, mock_requests_get
+        self, _mock_rate_limit, mock_zkb_get
     ):
         cache.set(f"{__title__.upper()}_WORKER_SHUTDOWN", True)
 
         result = KillmailBody.create_from_r2z2_sequence(123456)
 
         self.assertIsNone(result)
-        mock_requests_get.assert_not_called()
+        mock_zkb_get.assert_not_called()
 
-    @patch(MODULE_PATH + ".requests.get")
+    @patch(MODULE_PATH + ".zkb.get")
     @patch.object(KillmailBody, "_create_from_dict")
     @patch.object(KillmailBody, "_too_many_requests_delay", return_value=False)
     @patch.object(KillmailBody, "_rate_limit", return_value=True)
@@ -136,12 +146,12 @@ class TestKillmailHelper(NoSocketsTestCase):
         _mock_rate_limit,
         _mock_delay,
         mock_create_from_dict,
-        mock_requests_get,
+        mock_zkb_get,
     ):
         response = Mock()
         response.status_code = 200
         response.json.return_value = {"killmail_id": 999999}
-        mock_requests_get.return_value = response
+        mock_zkb_get.return_value = response
 
         expected_killmail = Mock()
         mock_create_from_dict.return_value = expected_killmail
@@ -150,4 +160,151 @@ class TestKillmailHelper(NoSocketsTestCase):
 
         self.assertEqual(result, expected_killmail)
         mock_create_from_dict.assert_called_once_with({"killmail_id": 999999})
-        self.assertIsNotNone(cache.get(LAST_REQUEST_KEY))
+
+    @patch(MODULE_PATH + ".zkb.get")
+    @patch.object(KillmailBody, "_too_many_requests_delay", return_value=False)
+    @patch.object(KillmailBody, "_rate_limit", return_value=True)
+    def test_create_from_r2z2_sequence_raises_not_found(
+        self, _mock_rate_limit, _mock_delay, mock_zkb_get
+    ):
+        response = Mock()
+        response.status_code = 404
+        mock_zkb_get.return_value = response
+
+        with self.assertRaises(R2Z2SequenceNotFound):
+            KillmailBody.create_from_r2z2_sequence(123456)
+
+    @patch(MODULE_PATH + ".zkb.get")
+    @patch.object(KillmailBody, "_too_many_requests_delay", return_value=False)
+    @patch.object(KillmailBody, "_rate_limit")
+    def test_create_from_r2z2_sequence_with_reserved_slot(
+        self, mock_rate_limit, _mock_delay, mock_zkb_get
+    ):
+        response = Mock()
+        response.status_code = 404
+        mock_zkb_get.return_value = response
+
+        with self.assertRaises(R2Z2SequenceNotFound):
+            KillmailBody.create_from_r2z2_sequence(123456, reserved=True)
+
+        mock_rate_limit.assert_not_called()
+
+
+class TestKillmailAttackerColumns(NoSocketsTestCase):
+    def setUp(self) -> None:
+        self.attackers = [
+            KillmailAttacker(
+                character_id=1001,
+                corporation_id=2001,
+                ship_type_id=670,
+                damage_done=100,
+                final_blow=True,
+                security_status=-1.5,
+            ),
+            KillmailAttacker(corporation_id=2002),
+        ]
+
+    def test_list_api(self):
+        columns = KillmailAttackerColumns(self.attackers)
+
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(columns, self.attackers)
+        self.assertEqual(list(columns), self.attackers)
+        self.assertEqual(columns[-1], self.attackers[1])
+        self.assertEqual(columns[:1], self.attackers[:1])
+        self.assertIsNone(columns[1].security_status)
+        self.assertIsNone(columns[1].final_blow)
+        with self.assertRaises(IndexError):
+            columns[2]  # pylint: disable=pointless-statement
+
+    def test_from_dicts(self):
+        columns = KillmailAttackerColumns.from_dicts(
+            [
+                {
+                    "character_id": 1001,
+                    "corporation_id": 2001,
+                    "ship_type_id": 670,
+                    "damage_done": 100,
+                    "final_blow": True,
+                    "security_status": -1.5,
+                },
+                {"corporation_id": 2002},
+            ]
+        )
+
+        self.assertEqual(columns, self.attackers)
+
+    def test_extract_attackers_column_wise_above_threshold(self):
+        killmail_data = {"attackers": [{"character_id": 1001}] * 3}
+
+        with patch(MODULE_PATH + ".KILLSTATS_ATTACKER_COLUMNS_THRESHOLD", 3):
+            attackers = KillmailBody._extract_attackers(killmail_data)
+        with patch(MODULE_PATH + ".KILLSTATS_ATTACKER_COLUMNS_THRESHOLD", 4):
+            attackers_list = KillmailBody._extract_attackers(killmail_data)
+
+        self.assertIsInstance(attackers, KillmailAttackerColumns)
+        self.assertIsInstance(attackers_list, list)
+        self.assertEqual(attackers, attackers_list)
+
+    def test_killmail_with_columns_is_stored(self):
+        killmail_body = KillmailBody(
+            id=1,
+            time=timezone.now(),
+            victim=KillmailVictim(corporation_id=2001),
+            attackers=KillmailAttackerColumns(self.attackers),
+            position=KillmailPosition(),
+            zkb=KillmailZkb(hash="abc"),
+        )
+
+        self.assertEqual(KillmailBody.decode(killmail_body.encode()), killmail_body)
+        self.assertEqual(
+            KillmailBody.decode(killmail_body.asjson()).attackers, self.attackers
+        )
+
+
+class TestKillmailStorageCache(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.killmail_body = KillmailBody(
+            id=1,
+            time=timezone.now(),
+            victim=KillmailVictim(corporation_id=2001),
+            attackers=[],
+            position=KillmailPosition(),
+            zkb=KillmailZkb(hash="abc"),
+        )
+        cache.set(KillmailBody._storage_key(1), self.killmail_body.encode())
+
+    def test_get_reads_through(self):
+        with patch(MODULE_PATH + ".cache.get", wraps=cache.get) as mock_cache_get:
+            first = KillmailBody.get(1)
+            second = KillmailBody.get(1)
+
+        self.assertEqual(first, self.killmail_body)
+        self.assertIs(first, second)
+        mock_cache_get.assert_called_once()
+        self.assertEqual(
+            KillmailBody.cache_info(),
+            {"hits": 1, "misses": 1, "size": 1, "maxsize": 1_000},
+        )
+
+    @patch("killstats.helpers.lru.time.monotonic")
+    def test_get_expires(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        KillmailBody.get(1)
+        cache.delete(KillmailBody._storage_key(1))
+
+        mock_monotonic.return_value = 100.0 + 299
+        self.assertEqual(KillmailBody.get(1), self.killmail_body)
+
+        mock_monotonic.return_value = 100.0 + 300
+        with self.assertRaises(KillmailDoesNotExist):
+            KillmailBody.get(1)
+
+    def test_delete_removes_cached_killmail(self):
+        KillmailBody.get(1)
+
+        self.killmail_body.delete()
+
+        with self.assertRaises(KillmailDoesNotExist):
+            KillmailBody.get(1)
@@ -0,0 +1,53 @@
+# Standard Library
+from unittest.mock import patch
+
+# AA Killstats
+from killstats.helpers.lru import LRUCache
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.lru"
+
+
+class TestLRUCache(NoSocketsTestCase):
+    def test_get_and_set(self):
+        lru = LRUCache(maxsize=2)
+        lru.set("a", 1)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("b", 0), 0)
+        self.assertEqual((lru.hits, lru.misses), (1, 2))
+
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2)
+        lru.set_many({"a": 1, "b": 2})
+        lru.get("a")
+
+        lru.set("c", 3)
+
+        self.assertEqual(lru.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        self.assertEqual(len(lru), 2)
+
+    @patch(MODULE_PATH + ".time.monotonic")
+    def test_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        lru = LRUCache(maxsize=2, ttl=10)
+        lru.set("a", 1)
+
+        mock_monotonic.return_value = 109.0
+        self.assertEqual(lru.get("a"), 1)
+
+        mock_monotonic.return_value = 110.0
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
+
+    def test_delete_and_clear(self):
+        lru = LRUCache(maxsize=2)
+        lru.set_many({"a": 1, "b": 2})
+
+        lru.delete("a")
+        self.assertIsNone(lru.get("a"))
+
+        lru.clear()
+        self.assertEqual(len(lru), 0)
+        self.assertEqual((lru.hits, lru.misses), (0, 0))
@@ -0,0 +1,51 @@
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.mains import main_characters
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+from killstats.tests.testdata.utils import (
+    add_auth_character_to_user,
+    create_user_from_evecharacter,
+)
+
+
+class TestMainCharacterIndex(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        cls.user, _ = create_user_from_evecharacter(1001)
+        add_auth_character_to_user(cls.user, 1002)
+
+    def test_decorate(self):
+        # when
+        with self.assertNumQueries(1):
+            alt_name = main_characters.decorate(1002, "rotze Rotineque")
+            main_name = main_characters.decorate(1001, "Gneuten")
+            unknown_name = main_characters.decorate(1010, "Unknown")
+        # then
+        self.assertEqual(alt_name, "rotze Rotineque (Gneuten)")
+        self.assertEqual(main_name, "Gneuten")
+        self.assertEqual(unknown_name, "Unknown")
+
+    def test_load_shared_index(self):
+        # given
+        main_characters.refresh(force=True)
+        # when
+        with self.assertNumQueries(0):
+            main_characters.refresh(force=True)
+        # then
+        self.assertEqual(main_characters.main_of(1002), (1001, "Gneuten"))
+
+    def test_invalidate_on_ownership_change(self):
+        # given
+        main_characters.refresh(force=True)
+        version = cache.get("KILLSTATS_MAIN_INDEX_VERSION")
+        # when
+        with self.captureOnCommitCallbacks(execute=True):
+            add_auth_character_to_user(self.user, 1003, disconnect_signals=False)
+        # then
+        self.assertNotEqual(cache.get("KILLSTATS_MAIN_INDEX_VERSION"), version)
+        self.assertEqual(main_characters.main_of(1003), (1001, "Gneuten"))
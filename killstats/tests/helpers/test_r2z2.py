@@ -0,0 +1,111 @@
+# Standard Library
+from unittest.mock import Mock, patch
+
+# AA Killstats
+from killstats.helpers.killmail import R2Z2SequenceNotFound
+from killstats.helpers.r2z2 import R2Z2Prefetcher
+from killstats.tests import NoSocketsTestCase
+
+HELPER_PATH = "killstats.helpers.killmail"
+
+
+def _create_from_sequence(head_sequence_id, stop_sequence_id=None):
+    def create_from_sequence(sequence_id):
+        if sequence_id == stop_sequence_id:
+            return None
+        if sequence_id > head_sequence_id:
+            raise R2Z2SequenceNotFound()
+        return Mock(id=sequence_id)
+
+    return create_from_sequence
+
+
+def _consume(prefetcher):
+    results = []
+    for sequence_id, fetch in prefetcher:
+        try:
+            killmail = fetch()
+        except R2Z2SequenceNotFound:
+            results.append((sequence_id, "not_found"))
+            continue
+        if killmail is None:
+            results.append((sequence_id, None))
+            continue
+        results.append((sequence_id, killmail.id))
+    return results
+
+
+@patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+class TestR2Z2Prefetcher(NoSocketsTestCase):
+    def test_serial(self, mock_create_from_sequence):
+        mock_create_from_sequence.side_effect = _create_from_sequence(12)
+
+        with R2Z2Prefetcher(10, 12, workers=1) as prefetcher:
+            results = _consume(prefetcher)
+
+        self.assertEqual(results, [(10, 10), (11, 11), (12, 12), (13, "not_found")])
+        self.assertEqual(mock_create_from_sequence.call_count, 4)
+
+    def test_prefetch_in_order_until_caught_up(self, mock_create_from_sequence):
+        mock_create_from_sequence.side_effect = _create_from_sequence(30)
+
+        with R2Z2Prefetcher(10, 30, workers=4) as prefetcher:
+            results = _consume(prefetcher)
+
+        self.assertEqual(
+            results,
+            [(sequence_id, sequence_id) for sequence_id in range(10, 31)]
+            + [(31, "not_found")],
+        )
+        # at most the sequences in flight are requested beyond the head
+        requested = {call.args[0] for call in mock_create_from_sequence.call_args_list}
+        self.assertLessEqual(max(requested), 31 + 3)
+
+    def test_prefetch_keeps_gaps_below_head(self, mock_create_from_sequence):
+        def create_from_sequence(sequence_id):
+            if sequence_id in (11, 20):
+                raise R2Z2SequenceNotFound()
+            return _create_from_sequence(15)(sequence_id)
+
+        mock_create_from_sequence.side_effect = create_from_sequence
+
+        with R2Z2Prefetcher(10, 15, workers=3) as prefetcher:
+            results = _consume(prefetcher)
+
+        self.assertEqual(
+            results[:7],
+            [
+                (10, 10),
+                (11, "not_found"),
+                (12, 12),
+                (13, 13),
+                (14, 14),
+                (15, 15),
+                (16, "not_found"),
+            ],
+        )
+        # nothing is requested after the sequences in flight beyond the head
+        self.assertLessEqual(results[-1][0], 16 + 2)
+
+    def test_prefetch_stops_on_shutdown(self, mock_create_from_sequence):
+        mock_create_from_sequence.side_effect = _create_from_sequence(
+            100, stop_sequence_id=15
+        )
+
+        with R2Z2Prefetcher(10, 100, workers=4) as prefetcher:
+            results = _consume(prefetcher)
+
+        self.assertEqual(results[:6], [(i, i) for i in range(10, 15)] + [(15, None)])
+        self.assertLessEqual(len(results), 6 + 3)
+
+    def test_exit_cancels_pending(self, mock_create_from_sequence):
+        mock_create_from_sequence.side_effect = _create_from_sequence(100)
+
+        with R2Z2Prefetcher(10, 100, workers=4) as prefetcher:
+            for sequence_id, fetch in prefetcher:
+                fetch()
+                if sequence_id == 12:
+                    break
+
+        self.assertFalse(prefetcher._pending)
+        self.assertLessEqual(mock_create_from_sequence.call_count, 3 + 4)
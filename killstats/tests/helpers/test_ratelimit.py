@@ -0,0 +1,96 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.ratelimit import (
+    RATE_RECOVERY_TIME,
+    RateLimitBudget,
+    TokenBucketRateLimiter,
+)
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.ratelimit"
+
+
+@patch(MODULE_PATH + ".time.time")
+class TestTokenBucketRateLimiter(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ratelimiter = TokenBucketRateLimiter(
+            {
+                "test": RateLimitBudget(rate=2),
+                "burst": RateLimitBudget(rate=1, burst=3),
+            }
+        )
+
+    def test_reserve_spaces_slots(self, mock_time):
+        mock_time.return_value = 1000.0
+
+        self.assertEqual(self.ratelimiter.reserve("test"), 0)
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 0.5)
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 1.0)
+
+        mock_time.return_value = 1010.0
+        self.assertEqual(self.ratelimiter.reserve("test"), 0)
+
+    def test_reserve_burst(self, mock_time):
+        mock_time.return_value = 1000.0
+
+        self.assertEqual(self.ratelimiter.reserve("burst"), 0)
+        self.assertEqual(self.ratelimiter.reserve("burst"), 0)
+        self.assertEqual(self.ratelimiter.reserve("burst"), 0)
+        self.assertAlmostEqual(self.ratelimiter.reserve("burst"), 1.0)
+
+    def test_reserve_max_wait_does_not_reserve(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.ratelimiter.reserve("test")
+        self.ratelimiter.reserve("test")
+
+        self.assertIsNone(self.ratelimiter.reserve("test", max_wait=0.75))
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 1.0)
+
+    def test_reserve_unknown_endpoint(self, mock_time):
+        mock_time.return_value = 1000.0
+
+        with self.assertRaises(ValueError):
+            self.ratelimiter.reserve("unknown")
+
+    def test_backoff_blocks_and_reduces_rate(self, mock_time):
+        mock_time.return_value = 1000.0
+
+        factor = self.ratelimiter.backoff("test", 5)
+
+        self.assertEqual(factor, 0.5)
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 5.0)
+        # halved rate, 1 request per second
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 6.0)
+
+    def test_backoff_recovers(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.ratelimiter.backoff("test", 1)
+
+        mock_time.return_value = 1000.0 + RATE_RECOVERY_TIME
+        self.ratelimiter.reserve("test")
+
+        self.assertAlmostEqual(self.ratelimiter.reserve("test"), 0.5)
+
+    @patch(MODULE_PATH + ".time.sleep")
+    def test_acquire_waits_for_slot(self, mock_sleep, mock_time):
+        mock_time.return_value = 1000.0
+
+        self.assertTrue(self.ratelimiter.acquire("test"))
+        self.assertTrue(self.ratelimiter.acquire("test", timeout=1))
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch(MODULE_PATH + ".time.sleep")
+    def test_acquire_timeout(self, mock_sleep, mock_time):
+        mock_time.return_value = 1000.0
+
+        self.assertTrue(self.ratelimiter.acquire("test", timeout=0))
+        self.assertFalse(self.ratelimiter.acquire("test", timeout=0))
+
+        mock_sleep.assert_not_called()
@@ -0,0 +1,92 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
+# Alliance Auth
+from allianceauth.eveonline.models import EveCharacter
+
+# AA Killstats
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailBody,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+)
+from killstats.helpers.retention import UnmatchedKillmailBuffer
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+from killstats.tests.testdata.utils import create_corporation
+
+
+def _killmail_body(killmail_id: int, attackers: int = 0) -> KillmailBody:
+    return KillmailBody(
+        id=killmail_id,
+        time=timezone.now(),
+        victim=KillmailVictim(corporation_id=2001),
+        attackers=[KillmailAttacker(character_id=i) for i in range(attackers)],
+        position=KillmailPosition(),
+        zkb=KillmailZkb(),
+    )
+
+
+class TestUnmatchedKillmailBuffer(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_evicts_oldest_above_max_items(self):
+        buffer = UnmatchedKillmailBuffer(max_items=2, max_bytes=1_000_000)
+
+        evicted = [buffer.push(_killmail_body(killmail_id)) for killmail_id in range(3)]
+
+        self.assertEqual(evicted, [0, 0, 1])
+        self.assertEqual(
+            [killmail.id for killmail in buffer.take(lambda killmail: True)], [2, 1]
+        )
+        self.assertEqual(buffer.size(), (0, 0))
+
+    def test_evicts_oldest_above_max_bytes(self):
+        small, large = _killmail_body(1), _killmail_body(2, attackers=50)
+        max_bytes = len(large.encode()) + len(small.encode()) - 1
+        buffer = UnmatchedKillmailBuffer(max_items=10, max_bytes=max_bytes)
+
+        buffer.push(small)
+        evicted = buffer.push(large)
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(buffer.size(), (1, len(large.encode())))
+
+    def test_take_keeps_other_killmails(self):
+        buffer = UnmatchedKillmailBuffer(max_items=10, max_bytes=1_000_000)
+        for killmail_id in range(3):
+            buffer.push(_killmail_body(killmail_id))
+
+        taken = buffer.take(lambda killmail: killmail.id == 1)
+
+        self.assertEqual([killmail.id for killmail in taken], [1])
+        self.assertEqual(buffer.size()[0], 2)
+        self.assertEqual(buffer.size()[1], 2 * len(_killmail_body(0).encode()))
+
+    def test_disabled(self):
+        buffer = UnmatchedKillmailBuffer(max_items=0, max_bytes=1_000_000)
+
+        buffer.push(_killmail_body(1))
+
+        self.assertEqual(buffer.size(), (0, 0))
+
+
+class TestReplayOnNewAudit(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+
+    @patch("killstats.tasks.replay_unmatched_killmails.delay")
+    def test_new_corporation_replays_buffer(self, mock_replay_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_corporation(EveCharacter.objects.get(character_id=1001))
+
+        mock_replay_delay.assert_called_once()
@@ -0,0 +1,89 @@
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
+# AA Killstats
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailBody,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+)
+from killstats.helpers.routing import ROUTING_VERSION_KEY, tracked_entities
+from killstats.models.killstatsaudit import CorporationsAudit
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+from killstats.tests.testdata.utils import create_owner_from_evecharacter
+
+MODULE_PATH = "killstats.helpers.routing"
+
+
+def _killmail(victim_corporation_id=None, victim_alliance_id=None, attackers=None):
+    return KillmailBody(
+        id=1,
+        time=timezone.now(),
+        victim=KillmailVictim(
+            corporation_id=victim_corporation_id,
+            alliance_id=victim_alliance_id,
+        ),
+        attackers=attackers or [],
+        position=KillmailPosition(),
+        zkb=KillmailZkb(),
+    )
+
+
+class TestTrackedEntityIndex(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        create_owner_from_evecharacter(character_id=1001)
+        create_owner_from_evecharacter(character_id=1007, owner_type="alliance")
+
+    def setUp(self) -> None:
+        cache.clear()
+        tracked_entities.refresh(force=True)
+
+    def test_load(self):
+        self.assertEqual(tracked_entities.corporation_ids, {2001})
+        self.assertEqual(tracked_entities.alliance_ids, {3002})
+
+    def test_match_victim(self):
+        killmail = _killmail(victim_corporation_id=2001, victim_alliance_id=3001)
+
+        self.assertEqual(tracked_entities.match(killmail), {2001})
+
+    def test_match_attacker(self):
+        killmail = _killmail(
+            victim_corporation_id=2003,
+            attackers=[
+                KillmailAttacker(corporation_id=2002, alliance_id=3002),
+                KillmailAttacker(corporation_id=2003),
+            ],
+        )
+
+        self.assertEqual(tracked_entities.match(killmail), {3002})
+
+    def test_match_untracked(self):
+        killmail = _killmail(
+            victim_corporation_id=2003,
+            attackers=[KillmailAttacker(corporation_id=2002, alliance_id=3001)],
+        )
+
+        self.assertEqual(tracked_entities.match(killmail), set())
+
+    def test_invalidate_on_audit_changes(self):
+        audit = create_owner_from_evecharacter(character_id=1003)
+
+        tracked_entities.refresh(force=True)
+        self.assertEqual(tracked_entities.corporation_ids, {2001, 2003})
+
+        version = cache.get(ROUTING_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            CorporationsAudit.objects.filter(pk=audit.pk).delete()
+            # the index is only invalidated once the delete is committed
+            self.assertEqual(cache.get(ROUTING_VERSION_KEY), version)
+
+        tracked_entities.refresh()
+        self.assertEqual(tracked_entities.corporation_ids, {2001})
@@ -0,0 +1,87 @@
+# Standard Library
+from unittest.mock import patch
+
+# Third Party
+from celery import signals
+
+# Alliance Auth (External Libs)
+from eve_sde.models import EveSDE, ItemGroup, ItemType
+
+# AA Killstats
+from killstats.helpers.sde import ItemTypeInfo, sde
+from killstats.signals import WORKER_PROCESS_INIT_UID, worker_init_handler
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+
+
+class TestSdeLookup(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+
+    def test_lookups(self):
+        # when
+        with self.assertNumQueries(3):
+            solar_system = sde.solar_system(30004783)
+        # then
+        self.assertEqual(solar_system.constellation_id, 20000699)
+        self.assertEqual(solar_system.region_id, 10000060)
+        self.assertAlmostEqual(solar_system.security_status, -0.477, places=3)
+        self.assertEqual(solar_system.name, "N8D9-Z")
+        self.assertEqual(solar_system.region_name, "Delve")
+        with self.assertNumQueries(0):
+            self.assertEqual(sde.region_id(30002063), 10000042)
+            self.assertIsNone(sde.region_id(1))
+            self.assertEqual(
+                sde.item_type(670), ItemTypeInfo(29, 6, "Capsule", "Capsule")
+            )
+            self.assertEqual(sde.group_name(17634), "Cruiser")
+            self.assertEqual(sde.type_name(670), "Capsule")
+            self.assertEqual(sde.type_id(670), 670)
+            self.assertIsNone(sde.type_name(1))
+            self.assertIsNone(sde.type_id(None))
+
+    def test_reload_when_sde_version_changed(self):
+        # given
+        EveSDE.objects.create(pk=1, build_number=1)
+        self.assertIsNone(sde.item_type(99999))
+        ItemType.objects.create(
+            id=99999, name="New Ship", group=ItemGroup.objects.get(id=29)
+        )
+        # when/then
+        with patch.object(sde, "check_interval", 0):
+            self.assertIsNone(sde.item_type(99999))
+            EveSDE.objects.filter(pk=1).update(build_number=2)
+            self.assertEqual(sde.type_name(99999), "New Ship")
+
+    def test_version_is_checked_after_interval(self):
+        # given
+        sde.load()
+        # when/then
+        with self.assertNumQueries(0):
+            sde.type_name(670)
+        with patch.object(sde, "check_interval", 0), self.assertNumQueries(1):
+            sde.type_name(670)
+
+    def test_invalidate(self):
+        # given
+        sde.load()
+        ItemType.objects.filter(id=670).update(name="Pod")
+        # when
+        sde.invalidate()
+        # then
+        self.assertEqual(sde.type_name(670), "Pod")
+
+    def test_worker_process_init_preloads_lookups(self):
+        # given
+        worker_init_handler(sender=None)
+        self.addCleanup(
+            signals.worker_process_init.disconnect,
+            dispatch_uid=WORKER_PROCESS_INIT_UID,
+        )
+        # when
+        signals.worker_process_init.send(sender=None)
+        # then
+        with self.assertNumQueries(0):
+            self.assertEqual(sde.type_name(670), "Capsule")
@@ -0,0 +1,57 @@
+# AA Killstats
+from killstats.helpers.search import (
+    ParsedSearch,
+    SearchTerm,
+    ValueFilter,
+    parse_search,
+    parse_value,
+    tokenize,
+)
+from killstats.tests import NoSocketsTestCase
+
+FIELDS = {"ship", "system"}
+
+
+class TestSearch(NoSocketsTestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Caracal Navy Issue"), ["caracal", "navy", "issue"])
+        self.assertEqual(tokenize("N8D9-Z"), ["n8d9", "z"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_parse_value(self):
+        self.assertEqual(parse_value("1b"), 1_000_000_000)
+        self.assertEqual(parse_value("1.5m"), 1_500_000)
+        self.assertEqual(parse_value("1,000"), 1000)
+        self.assertIsNone(parse_value("much"))
+
+    def test_parse_search(self):
+        # when
+        search = parse_search(
+            'Rotze ship:Ishtar value>1b system:"Jita IV" value<=2.5B', FIELDS
+        )
+        # then
+        self.assertEqual(
+            search,
+            ParsedSearch(
+                terms=[
+                    SearchTerm(None, "rotze"),
+                    SearchTerm("ship", "ishtar"),
+                    SearchTerm("system", "jita"),
+                    SearchTerm("system", "iv"),
+                ],
+                values=[
+                    ValueFilter(">", 1_000_000_000),
+                    ValueFilter("<=", 2_500_000_000),
+                ],
+            ),
+        )
+
+    def test_parse_search_unknown_filters_are_terms(self):
+        # when
+        search = parse_search('owner:me value>lots "unbalanced', FIELDS)
+        # then
+        self.assertEqual(
+            [term.term for term in search.terms],
+            ["owner", "me", "value", "lots", "unbalanced"],
+        )
+        self.assertEqual(search.values, [])
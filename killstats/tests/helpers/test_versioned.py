@@ -0,0 +1,69 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.core.cache import cache
+
+# AA Killstats
+from killstats.helpers.versioned import VersionCounter, VersionedIndex
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.versioned"
+VERSION_KEY = "KILLSTATS_TEST_VERSION"
+
+
+class _CountingIndex(VersionedIndex):
+    def __init__(self):
+        super().__init__(VERSION_KEY)
+        self.loads = []
+
+    def _load(self, version) -> None:
+        self.loads.append(version)
+
+
+class TestVersionCounter(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.delete(VERSION_KEY)
+        self.counter = VersionCounter(VERSION_KEY)
+
+    def test_bump(self):
+        # when
+        self.counter.bump()
+        self.counter.bump()
+        # then
+        self.assertEqual(self.counter.get(), 2)
+
+    def test_get_default(self):
+        self.assertEqual(self.counter.get(0), 0)
+
+
+class TestVersionedIndex(NoSocketsTestCase):
+    def setUp(self) -> None:
+        cache.delete(VERSION_KEY)
+        self.index = _CountingIndex()
+
+    @patch(MODULE_PATH + ".time.monotonic")
+    def test_refresh_checks_version_after_interval(self, mock_monotonic):
+        # given
+        mock_monotonic.return_value = 100
+        self.index.refresh()
+        VersionCounter(VERSION_KEY).bump()
+        # when
+        mock_monotonic.return_value = 105
+        self.index.refresh()
+        # then
+        self.assertEqual(self.index.loads, [None])
+        # when
+        mock_monotonic.return_value = 111
+        self.index.refresh()
+        # then
+        self.assertEqual(self.index.loads, [None, 1])
+
+    def test_invalidate(self):
+        # given
+        self.index.refresh()
+        # when
+        self.index.invalidate()
+        self.index.refresh()
+        # then
+        self.assertEqual(self.index.loads, [None, 1])
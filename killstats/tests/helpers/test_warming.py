@@ -0,0 +1,65 @@
+# Standard Library
+from unittest.mock import patch
+
+# Django
+from django.utils import timezone
+
+# AA Killstats
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.warming import CacheWarming
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.warming"
+
+
+class TestCacheWarming(NoSocketsTestCase):
+    def setUp(self) -> None:
+        self.warming = CacheWarming("KILLSTATS_TEST_WARMING", 60, 2)
+        redis = get_redis_client()
+        redis.delete(*redis.keys("KILLSTATS_TEST_WARMING_*") or ["none"])
+
+    def _visible(self, unique_id, corporations=(), alliances=()):
+        return {
+            "corporations": list(corporations),
+            "alliances": list(alliances),
+            "unique_id": unique_id,
+        }
+
+    def test_mark_current_month_only(self):
+        # given
+        now = timezone.localtime()
+        # when
+        self.warming.mark({(2001, now.year, now.month), (2002, now.year - 1, 1)})
+        # then
+        self.assertEqual(self.warming.take(10), [2001])
+        self.assertEqual(self.warming.take(10), [])
+
+    def test_requeue(self):
+        # when
+        self.warming.requeue([2001, 2002])
+        self.warming.requeue([2001])
+        # then
+        self.assertEqual(sorted(self.warming.take(10)), [2001, 2002])
+
+    def test_combinations_with_entities(self):
+        # given
+        self.warming.remember(1, self._visible("a", corporations=[2001]))
+        self.warming.remember(2, self._visible("b", [2001], alliances=[3001]))
+        self.warming.remember(3, self._visible("c", [2002]))
+        self.warming.remember(4, self._visible("d"))
+        # when
+        combinations = self.warming.combinations([2001, 3001])
+        # then
+        # only the 2 most recent combinations are warmed
+        self.assertEqual(combinations, [("corporation", 2), ("alliance", 2)])
+
+    def test_combinations_expire(self):
+        # given
+        with patch(MODULE_PATH + ".time.time", return_value=1_000):
+            self.warming.remember(1, self._visible("a", corporations=[2001]))
+        # when
+        with patch(MODULE_PATH + ".time.time", return_value=1_061):
+            combinations = self.warming.combinations([2001])
+        # then
+        self.assertEqual(combinations, [])
+        self.assertFalse(get_redis_client().exists(self.warming.combinations_key))
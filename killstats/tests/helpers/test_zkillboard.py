@@ -0,0 +1,73 @@
+# Standard Library
+from unittest.mock import Mock, patch
+
+# Third Party
+import requests
+
+# AA Killstats
+from killstats import USER_AGENT_TEXT
+from killstats.helpers.zkillboard import ZKillboardSession, _TimedConnectionMixin
+from killstats.tests import NoSocketsTestCase
+
+MODULE_PATH = "killstats.helpers.zkillboard"
+
+
+class _DummyConnection:
+    def connect(self):
+        pass
+
+
+class _TimedDummyConnection(_TimedConnectionMixin, _DummyConnection):
+    pass
+
+
+class TestZKillboardSession(NoSocketsTestCase):
+    def setUp(self) -> None:
+        self.zkb = ZKillboardSession(pool_size=3)
+
+    def test_session_is_reused(self):
+        session = self.zkb.session
+
+        self.assertIs(self.zkb.session, session)
+        self.assertEqual(session.headers["User-Agent"], USER_AGENT_TEXT)
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        adapter = session.get_adapter("https://r2z2.zkillboard.com/")
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    @patch(MODULE_PATH + ".os.getpid")
+    def test_session_is_recreated_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        session = self.zkb.session
+
+        mock_getpid.return_value = 2
+
+        self.assertIsNot(self.zkb.session, session)
+
+    @patch.object(requests.Session, "get")
+    def test_get_reuses_connection(self, mock_get):
+        mock_get.return_value = Mock(status_code=200)
+
+        self.zkb.get("https://r2z2.zkillboard.com/ephemeral/1.json")
+        self.zkb.get("https://r2z2.zkillboard.com/ephemeral/2.json")
+
+        timings = self.zkb.reset_timings()
+        self.assertEqual(timings.requests, 2)
+        self.assertEqual(timings.connections, 0)
+        self.assertEqual(timings.connect_time, 0.0)
+        self.assertEqual(self.zkb.timings.requests, 0)
+
+    @patch.object(requests.Session, "get")
+    def test_get_measures_handshake(self, mock_get):
+        def open_connection(*args, **kwargs):
+            _TimedDummyConnection().connect()
+            return Mock(status_code=200)
+
+        mock_get.side_effect = open_connection
+
+        self.zkb.get("https://r2z2.zkillboard.com/ephemeral/1.json")
+
+        self.assertEqual(self.zkb.timings.requests, 1)
+        self.assertEqual(self.zkb.timings.connections, 1)
+        self.assertGreaterEqual(self.zkb.timings.transfer_time, 0.0)
+        mock_get.assert_called_once()
+        self.assertIn("timeout", mock_get.call_args.kwargs)
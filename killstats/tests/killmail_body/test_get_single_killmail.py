@@ -102,8 +102,8 @@ class TestKillmailBody(NoSocketsTestCase):
         cache.clear()
 
     @patch(MODULE_PATH + ".esi")
-    @patch(MODULE_PATH + ".requests.get")
-    def test_get_single_killmail_success(self, mock_requests_get, mock_esi):
+    @patch(MODULE_PATH + ".zkb.get")
+    def test_get_single_killmail_success(self, mock_zkb_get, mock_esi):
         """Test successful killmail retrieval"""
         killmail_id = 121152845
 
@@ -113,13 +113,13 @@ class TestKillmailBody(NoSocketsTestCase):
         mock_zkb_response.raise_for_status = Mock()
         mock_zkb_response.status_code = 200
 
-        # Configure requests.get to return different responses based on URL
+        # Configure zkb.get to return different responses based on URL
         def get_side_effect(url, **kwargs):
             if "zkillboard.com" in url:
                 return mock_zkb_response
             return Mock()
 
-        mock_requests_get.side_effect = get_side_effect
+        mock_zkb_get.side_effect = get_side_effect
         mock_esi.client = create_esi_client_stub(endpoints=KILLSTATS_ENDPOINTS)
 
         # Call the method
@@ -129,10 +129,10 @@ class TestKillmailBody(NoSocketsTestCase):
         self.assertIsNotNone(result)
         self.assertIsInstance(result, KillmailBody)
         self.assertEqual(result.id, killmail_id)
-        self.assertEqual(mock_requests_get.call_count, 1)  # zKillboard
+        self.assertEqual(mock_zkb_get.call_count, 1)  # zKillboard
 
-    @patch("killstats.helpers.killmail.requests.get")
-    def test_get_single_killmail_from_cache(self, mock_requests_get):
+    @patch("killstats.helpers.killmail.zkb.get")
+    def test_get_single_killmail_from_cache(self, mock_zkb_get):
         """Test that killmail is retrieved from cache if available"""
         killmail_id = 121152845
 
@@ -170,13 +170,13 @@ class TestKillmailBody(NoSocketsTestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result.id, killmail_id)
         # Should not call external APIs when data is in cache
-        mock_requests_get.assert_not_called()
+        mock_zkb_get.assert_not_called()
 
         # Should not call external APIs when data is in cache
-        mock_requests_get.assert_not_called()
+        mock_zkb_get.assert_not_called()
 
-    @patch("killstats.helpers.killmail.requests.get")
-    def test_get_single_killmail_already_exists(self, mock_requests_get):
+    @patch("killstats.helpers.killmail.zkb.get")
+    def test_get_single_killmail_already_exists(self, mock_zkb_get):
         """Test that None is returned if killmail already exists in database"""
         killmail_id = 121152845
 
@@ -200,17 +200,17 @@ class TestKillmailBody(NoSocketsTestCase):
         mock_zkb_response = Mock()
         mock_zkb_response.json.return_value = [self.zkb_package_data[0]]
         mock_zkb_response.raise_for_status = Mock()
-        mock_requests_get.return_value = mock_zkb_response
+        mock_zkb_get.return_value = mock_zkb_response
 
         # Call the method
         result = KillmailBody.get_single_killmail(killmail_id)
 
         # Assertions
         self.assertIsNone(result)
-        mock_requests_get.assert_called_once()
+        mock_zkb_get.assert_called_once()
 
-    @patch(MODULE_PATH + ".requests.get")
-    def test_get_single_killmail_zkb_http_error(self, mock_requests_get):
+    @patch(MODULE_PATH + ".zkb.get")
+    def test_get_single_killmail_zkb_http_error(self, mock_zkb_get):
         """Test that HTTPError from zKillboard is handled"""
         killmail_id = 121152845
 
@@ -219,14 +219,14 @@ class TestKillmailBody(NoSocketsTestCase):
         mock_zkb_response.raise_for_status.side_effect = requests.HTTPError(
             "Test 404 Not Found"
         )
-        mock_requests_get.return_value = mock_zkb_response
+        mock_zkb_get.return_value = mock_zkb_response
 
         # Call the method and expect ValueError
         with self.assertRaises(ValueError):
             KillmailBody.get_single_killmail(killmail_id)
 
-    @patch(MODULE_PATH + ".requests.get")
-    def test_get_single_killmail_zkb_timeout(self, mock_requests_get):
+    @patch(MODULE_PATH + ".zkb.get")
+    def test_get_single_killmail_zkb_timeout(self, mock_zkb_get):
         """Test that Timeout from zKillboard is handled"""
         killmail_id = 121152845
 
@@ -235,13 +235,13 @@ class TestKillmailBody(NoSocketsTestCase):
         mock_zkb_response.raise_for_status.side_effect = requests.Timeout(
             "Connection timed out"
         )
-        mock_requests_get.return_value = mock_zkb_response
+        mock_zkb_get.return_value = mock_zkb_response
         with self.assertRaises(ValueError):
             KillmailBody.get_single_killmail(killmail_id)
 
     @patch(MODULE_PATH + ".esi")
-    @patch(MODULE_PATH + ".requests.get")
-    def test_get_single_killmail_caches_result(self, mock_requests_get, mock_esi):
+    @patch(MODULE_PATH + ".zkb.get")
+    def test_get_single_killmail_caches_result(self, mock_zkb_get, mock_esi):
         """Test that successful killmail is cached after retrieval"""
         killmail_id = 121152845
 
@@ -251,13 +251,13 @@ class TestKillmailBody(NoSocketsTestCase):
         mock_zkb_response.raise_for_status = Mock()
         mock_zkb_response.status_code = 200
 
-        # Configure requests.get to return different responses based on URL
+        # Configure zkb.get to return different responses based on URL
         def get_side_effect(url, **kwargs):
             if "zkillboard.com" in url:
                 return mock_zkb_response
             return Mock()
 
-        mock_requests_get.side_effect = get_side_effect
+        mock_zkb_get.side_effect = get_side_effect
         mock_esi.client = create_esi_client_stub(endpoints=KILLSTATS_ENDPOINTS)
         # Ensure cache is empty before test
         cache_key = f"killstats_storage__KILLMAIL_{killmail_id}"
@@ -278,7 +278,7 @@ class TestKillmailBody(NoSocketsTestCase):
         )
 
         # Verify we can retrieve from cache
-        cached_killmail = KillmailBody.from_json(cached_value)
+        cached_killmail = KillmailBody.decode(cached_value)
         self.assertEqual(cached_killmail.id, killmail_id)
         self.assertEqual(
             cached_killmail.victim.character_id, result.victim.character_id
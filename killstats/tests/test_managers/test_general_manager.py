@@ -1,7 +1,14 @@
 # Standard Library
+from types import SimpleNamespace
 from unittest.mock import patch
 
+# Alliance Auth
+from esi.exceptions import HTTPClientError, HTTPServerError
+
 # AA Killstats
+from killstats.app_settings import KILLSTATS_ESI_RATE_TIMEOUT
+from killstats.errors import EsiUnavailable, ObjectNotFound
+from killstats.helpers.ratelimit import ESI
 from killstats.models.general import EveEntity
 from killstats.tests import NoSocketsTestCase
 from killstats.tests.testdata.esi_stub_openapi import (
@@ -127,3 +134,113 @@ class TestGeneralManager(NoSocketsTestCase):
         self.assertEqual(result.id, 9999)
         self.assertEqual(result.name, "New Test Character")
         self.assertTrue(created)
+
+    @patch(MODULE_PATH + ".esi")
+    def test_create_missing_from_esi(self, mock_esi):
+        """
+        Test creating missing EveEntity objects with one ESI request.
+
+        ### Expected Result
+        - Entities are created from the bulk ESI response.
+        """
+        # Test Data
+        mock_esi.client = create_esi_client_stub(
+            endpoints=KILLSTATS_EVE_ENTITY_ENDPOINTS
+        )
+
+        # Test Action
+        self.manager.create_missing_from_esi({9998, 9997})
+
+        # Expected Results
+        self.assertEqual(
+            EveEntity.objects.get(id=9998).name,
+            "Bulk Character 2",
+        )
+        self.assertTrue(EveEntity.objects.filter(id=9997).exists())
+
+    @patch(MODULE_PATH + ".EveEntityManager._post_universe_names")
+    def test_create_missing_from_esi_falls_back_to_single_ids(self, mock_post_names):
+        """
+        Test resolving entities one by one when ESI rejects an unknown ID.
+
+        ### Expected Result
+        - Known entities are created.
+        - Unknown entities are skipped and returned.
+        """
+
+        # Test Data
+        def post_universe_names(eve_ids):
+            if 123456 in eve_ids:
+                raise ObjectNotFound("Unknown IDs")
+            return [
+                SimpleNamespace(id=eve_id, name="Test", category="character")
+                for eve_id in eve_ids
+            ]
+
+        mock_post_names.side_effect = post_universe_names
+
+        # Test Action
+        rejected_ids = self.manager.create_missing_from_esi({9996, 9999, 123456})
+
+        # Expected Results
+        self.assertEqual(rejected_ids, {123456})
+        self.assertEqual(
+            set(EveEntity.objects.values_list("id", flat=True)), {9996, 9999}
+        )
+
+    @patch(MODULE_PATH + ".EveEntityManager._post_universe_names")
+    def test_create_missing_from_esi_raises_esi_errors(self, mock_post_names):
+        """
+        Test ESI errors other than unknown IDs are raised.
+
+        ### Expected Result
+        - EsiUnavailable is raised after one request.
+        """
+        # Test Data
+        mock_post_names.side_effect = EsiUnavailable("ESI is down")
+
+        # Test Action
+        with self.assertRaises(EsiUnavailable):
+            self.manager.create_missing_from_esi({9996, 9999})
+
+        # Expected Results
+        mock_post_names.assert_called_once()
+        self.assertFalse(EveEntity.objects.exists())
+
+    @patch(MODULE_PATH + ".esi")
+    def test_post_universe_names_errors(self, mock_esi):
+        """
+        Test ESI errors are mapped to unknown IDs and retryable errors.
+
+        ### Expected Result
+        - 404 raises ObjectNotFound.
+        - Server errors raise EsiUnavailable.
+        """
+        # Test Data
+        operation = mock_esi.client.Universe.PostUniverseNames.return_value
+
+        # Test Action / Expected Results
+        operation.results.side_effect = HTTPClientError(404, {}, None)
+        with self.assertRaises(ObjectNotFound):
+            self.manager._post_universe_names([123456])
+
+        operation.results.side_effect = HTTPServerError(502, {}, None)
+        with self.assertRaises(EsiUnavailable):
+            self.manager._post_universe_names([9996])
+
+    @patch(MODULE_PATH + ".esi")
+    @patch(MODULE_PATH + ".ratelimiter.acquire", return_value=False)
+    def test_post_universe_names_rate_limited(self, mock_acquire, mock_esi):
+        """
+        Test no ESI request is sent if no rate limit slot is free in time.
+
+        ### Expected Result
+        - EsiUnavailable is raised without waiting longer than the timeout.
+        """
+        # Test Action
+        with self.assertRaises(EsiUnavailable):
+            self.manager._post_universe_names([9996])
+
+        # Expected Results
+        mock_acquire.assert_called_once_with(ESI, timeout=KILLSTATS_ESI_RATE_TIMEOUT)
+        mock_esi.client.Universe.PostUniverseNames.assert_not_called()
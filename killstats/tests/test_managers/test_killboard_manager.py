@@ -15,8 +15,13 @@ from killstats.helpers.killmail import (
     KillmailVictim,
     KillmailZkb,
 )
+from killstats.helpers.sde import sde
 from killstats.models.general import EveEntity
-from killstats.models.killboard import Killmail
+from killstats.models.killboard import (
+    Killmail,
+    KillmailInvolvement,
+    KillmailSearchToken,
+)
 from killstats.tests import NoSocketsTestCase
 from killstats.tests.testdata.esi_stub_openapi import (
     EsiEndpoint,
@@ -154,3 +159,143 @@ class KillstatsManagerTest(NoSocketsTestCase):
         # then
         self.assertEqual(created_killmail.killmail_id, 2)
         self.assertEqual(created_killmail.victim_total_value, 1000)
+
+    @patch(MODULE_PATH + ".esi")
+    def test_bulk_create_from_killmails(self, mock_esi):
+        # given
+        def killmail_body(killmail_id, attackers):
+            return KillmailBody(
+                id=killmail_id,
+                time="2025-10-01T00:00:00Z",
+                victim=KillmailVictim(
+                    character_id=1001,
+                    corporation_id=2001,
+                    alliance_id=3001,
+                    ship_type_id=670,
+                ),
+                attackers=attackers,
+                zkb=KillmailZkb(hash=f"bulk_killmail_{killmail_id}", total_value=100),
+                solar_system_id=30004783,
+                position=KillmailPosition(x=1.0, y=1.0, z=1.0),
+            )
+
+        attackers = [
+            KillmailAttacker(
+                character_id=character_id,
+                corporation_id=2002,
+                alliance_id=3002,
+                ship_type_id=670,
+            )
+            for character_id in range(1002, 1022)
+        ]
+        killmail_bodies = [
+            killmail_body(1, attackers),
+            killmail_body(
+                3,
+                attackers
+                + [
+                    KillmailAttacker(
+                        character_id=1002, corporation_id=2002, alliance_id=3002
+                    )
+                ],
+            ),
+            killmail_body(4, attackers[:1]),
+        ]
+        sde.load()
+        # when
+        with self.assertNumQueries(21):
+            created_killmails = Killmail.objects.bulk_create_from_killmails(
+                killmail_bodies
+            )
+        # then
+        self.assertEqual([km.killmail_id for km in created_killmails], [3, 4])
+        killmail = Killmail.objects.get(killmail_id=3)
+        self.assertEqual(killmail.victim_id, 1001)
+        self.assertEqual(killmail.victim_ship_id, 670)
+        self.assertEqual(killmail.attacker_killmail.count(), 20)
+        self.assertEqual(
+            Killmail.objects.get(killmail_id=4).attacker_killmail.get().ship_id, 670
+        )
+        mock_esi.client.Universe.PostUniverseNames.assert_not_called()
+        self.assertEqual(
+            set(
+                KillmailInvolvement.objects.filter(killmail_id=4).values_list(
+                    "entity_id", "role", "value"
+                )
+            ),
+            {
+                (1001, KillmailInvolvement.ROLE_LOSS, 100),
+                (2001, KillmailInvolvement.ROLE_LOSS, 100),
+                (3001, KillmailInvolvement.ROLE_LOSS, 100),
+                (1002, KillmailInvolvement.ROLE_KILL, 100),
+                (2002, KillmailInvolvement.ROLE_KILL, 100),
+                (3002, KillmailInvolvement.ROLE_KILL, 100),
+            },
+        )
+
+    @patch(MODULE_PATH + ".esi")
+    def test_bulk_create_from_killmails_existing(self, mock_esi):
+        # given
+        killmail_body = KillmailBody(
+            id=1,
+            time="2025-10-01T00:00:00Z",
+            victim=KillmailVictim(corporation_id=2001, ship_type_id=670),
+            attackers=[],
+            zkb=KillmailZkb(hash="existing"),
+            position=KillmailPosition(),
+        )
+        # when
+        with self.assertNumQueries(1):
+            created_killmails = Killmail.objects.bulk_create_from_killmails(
+                [killmail_body]
+            )
+        # then
+        self.assertEqual(created_killmails, [])
+
+    def test_backfill_involvements(self):
+        # when
+        total_indexed = KillmailInvolvement.objects.backfill()
+        # then
+        self.assertEqual(total_indexed, 1)
+        self.assertEqual(KillmailInvolvement.objects.backfill(), 0)
+        involvement = KillmailInvolvement.objects.get(entity_id=2001)
+        self.assertEqual(involvement.role, KillmailInvolvement.ROLE_LOSS)
+        self.assertEqual(involvement.value, 1000)
+        self.assertEqual(involvement.ship_group_id, sde.group_id(670))
+        self.assertEqual(
+            list(
+                Killmail.objects.filter_involved(
+                    [2001], role=KillmailInvolvement.ROLE_LOSS, year=2025, month=10
+                )
+            ),
+            [self.killmail],
+        )
+        self.assertFalse(
+            Killmail.objects.filter_involved(
+                [2001], role=KillmailInvolvement.ROLE_KILL
+            ).exists()
+        )
+        self.assertFalse(
+            Killmail.objects.filter_involved([2001], year=2025, month=11).exists()
+        )
+
+    def test_backfill_search(self):
+        # when
+        total_indexed = KillmailSearchToken.objects.backfill()
+        # then
+        self.assertEqual(total_indexed, 1)
+        self.assertEqual(KillmailSearchToken.objects.backfill(), 0)
+        self.assertEqual(
+            set(
+                KillmailSearchToken.objects.filter(
+                    field=KillmailSearchToken.FIELD_SHIP
+                ).values_list("token", flat=True)
+            ),
+            {"capsule"},
+        )
+        self.assertEqual(
+            list(Killmail.objects.filter_search("ship:caps value>=1k")),
+            [self.killmail],
+        )
+        self.assertFalse(Killmail.objects.filter_search("region:caps").exists())
+        self.assertFalse(Killmail.objects.filter_search("value>1k").exists())
@@ -0,0 +1,189 @@
+# Standard Library
+from unittest.mock import patch
+
+# AA Killstats
+from killstats.helpers.killmail import (
+    KillmailAttacker,
+    KillmailBody,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+)
+from killstats.managers.rollup_manager import STAT_FIELDS, rebuild_rollups
+from killstats.models.killboard import Killmail
+from killstats.models.rollups import CharacterRollup, EntityRollup, ShipRollup
+from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.eveentity import load_eveentity
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+
+MODULE_PATH = "killstats.managers.general_manager"
+
+
+def _killmail_body(
+    killmail_id: int,
+    time: str,
+    victim: tuple,
+    attackers: list[tuple],
+    total_value: int,
+) -> KillmailBody:
+    """Create a killmail, victim and attackers are (character, corporation, alliance, ship)."""
+    return KillmailBody(
+        id=killmail_id,
+        time=time,
+        victim=KillmailVictim(
+            character_id=victim[0],
+            corporation_id=victim[1],
+            alliance_id=victim[2],
+            ship_type_id=victim[3],
+        ),
+        attackers=[
+            KillmailAttacker(
+                character_id=attacker[0],
+                corporation_id=attacker[1],
+                alliance_id=attacker[2],
+                ship_type_id=attacker[3],
+            )
+            for attacker in attackers
+        ],
+        zkb=KillmailZkb(hash=f"rollup_{killmail_id}", total_value=total_value),
+        solar_system_id=30004783,
+        position=KillmailPosition(),
+    )
+
+
+def _killmail_bodies() -> list[KillmailBody]:
+    return [
+        _killmail_body(
+            1,
+            "2025-10-01T12:00:00Z",
+            (1001, 2001, 3001, 17634),
+            [(1002, 2002, 3002, 20001), (1003, 2002, 3002, 20001)],
+            100,
+        ),
+        _killmail_body(
+            2,
+            "2025-10-02T12:00:00Z",
+            (1004, 2001, 3001, 670),
+            [(1002, 2002, 3002, 20002)],
+            10,
+        ),
+        _killmail_body(
+            3,
+            "2025-11-01T12:00:00Z",
+            (1002, 2002, 3002, 10001),
+            [(1001, 2001, 3001, 20001)],
+            500,
+        ),
+    ]
+
+
+def _rollups() -> dict:
+    subjects = {CharacterRollup: ["character_id"], ShipRollup: ["ship_id"]}
+    return {
+        model.__name__: set(
+            model.objects.values_list(
+                "entity_id", "year", "month", *subjects.get(model, []), *STAT_FIELDS
+            )
+        )
+        for model in (CharacterRollup, ShipRollup, EntityRollup)
+    }
+
+
+@patch(MODULE_PATH + ".esi")
+class TestRollupManager(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        load_eveentity()
+
+    def test_store_updates_rollups(self, mock_esi):
+        # when
+        killmail_bodies = _killmail_bodies()
+        Killmail.objects.bulk_create_from_killmails(killmail_bodies[:1])
+        Killmail.objects.bulk_create_from_killmails(killmail_bodies[1:])
+        # then
+        killer = CharacterRollup.objects.get(
+            entity_id=2002, year=2025, month=10, character_id=1002
+        )
+        self.assertEqual((killer.kills, killer.isk_destroyed), (2, 110))
+        self.assertEqual((killer.highest_kill_id, killer.highest_kill_value), (1, 100))
+        self.assertEqual(
+            CharacterRollup.objects.get(
+                entity_id=3002, year=2025, month=11, character_id=1002
+            ).isk_lost,
+            500,
+        )
+        victim = CharacterRollup.objects.get(
+            entity_id=2001, year=2025, month=10, character_id=1001
+        )
+        self.assertEqual((victim.kills, victim.losses, victim.isk_lost), (0, 1, 100))
+        # two attackers in the same ship count as one kill
+        self.assertEqual(
+            ShipRollup.objects.get(
+                entity_id=2002, year=2025, month=10, ship_id=20001
+            ).kills,
+            1,
+        )
+        # two attackers of the same corporation count as one kill
+        entity = EntityRollup.objects.get(entity_id=2002, year=2025, month=10)
+        self.assertEqual((entity.kills, entity.isk_destroyed), (2, 110))
+        self.assertEqual(
+            EntityRollup.objects.get(entity_id=3001, year=2025, month=10).losses, 2
+        )
+
+    def test_apply_tolerates_concurrently_created_rows(self, mock_esi):
+        # given
+        killmail_bodies = _killmail_bodies()
+        Killmail.objects.bulk_create_from_killmails(killmail_bodies[:1])
+        lock_rows = EntityRollup.objects._lock_rows
+        calls = []
+
+        def _lock_rows(*args):
+            calls.append(args)
+            # the rows are created by another store after the first lookup
+            return {} if len(calls) == 1 else lock_rows(*args)
+
+        # when
+        with patch.object(EntityRollup.objects, "_lock_rows", side_effect=_lock_rows):
+            Killmail.objects.bulk_create_from_killmails(killmail_bodies[1:2])
+        # then
+        entity = EntityRollup.objects.get(entity_id=2002, year=2025, month=10)
+        self.assertEqual((entity.kills, entity.isk_destroyed), (2, 110))
+        self.assertEqual(
+            EntityRollup.objects.get(entity_id=3001, year=2025, month=10).losses, 2
+        )
+
+    def test_rebuild_matches_incremental_rollups(self, mock_esi):
+        # given
+        for killmail_body in _killmail_bodies():
+            Killmail.objects.create_from_killmail(killmail_body)
+        expected = _rollups()
+        CharacterRollup.objects.update(kills=99)
+        # when
+        total_replayed = rebuild_rollups(batch_size=2)
+        # then
+        self.assertEqual(total_replayed, 3)
+        self.assertEqual(_rollups(), expected)
+
+    def test_update_or_create_regenerates_rollups(self, mock_esi):
+        # given
+        killmail_bodies = _killmail_bodies()
+        Killmail.objects.bulk_create_from_killmails(killmail_bodies)
+        killmail_body = killmail_bodies[0]
+        killmail_body.zkb.total_value = 300
+        # when
+        _, created = Killmail.objects.update_or_create_from_killmail(killmail_body)
+        # then
+        self.assertFalse(created)
+        killer = CharacterRollup.objects.get(
+            entity_id=2002, year=2025, month=10, character_id=1002
+        )
+        self.assertEqual((killer.kills, killer.isk_destroyed), (2, 310))
+        self.assertEqual(killer.highest_kill_value, 300)
+        self.assertEqual(
+            CharacterRollup.objects.get(
+                entity_id=2001, year=2025, month=10, character_id=1001
+            ).isk_lost,
+            300,
+        )
@@ -3,23 +3,76 @@ from unittest.mock import Mock, patch
 
 # Django
 from django.core.cache import cache
+from django.db import IntegrityError
+from django.utils import timezone
 
 # AA Killstats
 from killstats import __title__
+from killstats.constants import STORE_DEAD_LETTER_KEY, STORE_QUEUE_KEY
+from killstats.errors import EsiUnavailable
+from killstats.helpers.core import get_redis_client
+from killstats.helpers.idempotency import STATE_DONE, store_guard
+from killstats.helpers.killmail import (
+    KillmailBody,
+    KillmailDoesNotExist,
+    KillmailPosition,
+    KillmailVictim,
+    KillmailZkb,
+    R2Z2SequenceNotFound,
+    R2Z2SequenceUnavailable,
+)
+from killstats.helpers.ratelimit import CACHE_WARM, ESI, ZKB_R2Z2
+from killstats.helpers.retention import unmatched_killmails
+from killstats.helpers.warming import cache_warming
+from killstats.models.killstatsaudit import CorporationsAudit
+from killstats.models.r2z2 import R2Z2Cursor, R2Z2Gap
 from killstats.tasks import (
+    replay_unmatched_killmails,
     run_tracker_alliance,
     run_tracker_corporation,
     run_zkb_r2z2,
+    run_zkb_r2z2_gaps,
+    store_killmail,
+    store_killmails,
+    warm_api_cache,
 )
 from killstats.tests import NoSocketsTestCase
+from killstats.tests.testdata.load_allianceauth import load_allianceauth
+from killstats.tests.testdata.utils import (
+    create_killmail,
+    create_user_from_evecharacter,
+)
 
 HELPER_PATH = "killstats.helpers.killmail"
 MODULE_PATH = "killstats.tasks"
 
 
+def _save_killmail(killmail_id: int) -> KillmailBody:
+    killmail = KillmailBody(
+        id=killmail_id,
+        time=timezone.now(),
+        victim=KillmailVictim(corporation_id=2001),
+        attackers=[],
+        position=KillmailPosition(),
+        zkb=KillmailZkb(),
+    )
+    killmail.save()
+    return killmail
+
+
 class TestTasks(NoSocketsTestCase):
     def setUp(self) -> None:
         cache.clear()
+        # Fetch sequences one by one to keep the call order deterministic
+        patcher = patch(MODULE_PATH + ".app_settings.KILLSTATS_R2Z2_PREFETCH", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Cache warming is tested on its own
+        patcher = patch(
+            MODULE_PATH + ".app_settings.KILLSTATS_API_CACHE_WARMING", False
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     @patch(MODULE_PATH + ".logger.error")
     @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2")
@@ -41,51 +94,235 @@ class TestTasks(NoSocketsTestCase):
 
         mock_create_from_sequence.assert_not_called()
 
-    @patch(MODULE_PATH + ".run_tracker_alliance.delay")
-    @patch(MODULE_PATH + ".run_tracker_corporation.delay")
-    @patch(MODULE_PATH + ".AlliancesAudit.objects.all")
-    @patch(MODULE_PATH + ".CorporationsAudit.objects.all")
+    @patch(MODULE_PATH + ".unmatched_killmails")
+    @patch(MODULE_PATH + ".store_killmail.delay")
+    @patch(MODULE_PATH + ".tracked_entities")
     @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
     @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2", return_value=100)
-    def test_run_zkb_r2z2_processes_and_dispatches_trackers(
+    def test_run_zkb_r2z2_queues_only_matched_killmails(
         self,
         _mock_get_sequence,
         mock_create_from_sequence,
-        mock_corps_all,
-        mock_allys_all,
-        mock_run_tracker_corp_delay,
-        mock_run_tracker_ally_delay,
+        mock_tracked_entities,
+        mock_store_killmail_delay,
+        mock_unmatched_killmails,
     ):
-        corporation_audit = Mock()
-        corporation_audit.corporation.corporation_id = 2001
-        mock_corps_all.return_value = [corporation_audit]
+        killmail_matched = Mock()
+        killmail_matched.id = 123456
+        killmail_unmatched = Mock()
+        killmail_unmatched.id = 123457
 
-        alliance_audit = Mock()
-        alliance_audit.alliance.alliance_id = 3001
-        mock_allys_all.return_value = [alliance_audit]
+        mock_create_from_sequence.side_effect = [
+            killmail_matched,
+            killmail_unmatched,
+            None,
+        ]
+        mock_tracked_entities.match.side_effect = [{2001}, set()]
 
-        killmail = Mock()
-        killmail.id = 123456
-        killmail.save = Mock()
+        run_zkb_r2z2()
 
-        mock_create_from_sequence.side_effect = [killmail, None]
+        killmail_matched.save.assert_called_once()
+        killmail_unmatched.save.assert_not_called()
+        mock_unmatched_killmails.push.assert_called_once_with(killmail_unmatched)
+        mock_create_from_sequence.assert_any_call(100)
+        mock_create_from_sequence.assert_any_call(101)
+        self.assertEqual(mock_create_from_sequence.call_count, 3)
+
+        mock_tracked_entities.refresh.assert_called_once()
+        mock_store_killmail_delay.assert_called_once_with(123456)
+
+    @patch(MODULE_PATH + "._route_killmail", return_value=False)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2", return_value=100)
+    def test_run_zkb_r2z2_resumes_after_cursor(
+        self, _mock_get_sequence, mock_create_from_sequence, _mock_route
+    ):
+        R2Z2Cursor.objects.commit(95)
+        mock_create_from_sequence.side_effect = [Mock(), None]
 
         run_zkb_r2z2()
 
-        killmail.save.assert_called_once()
-        mock_create_from_sequence.assert_any_call(100)
-        self.assertEqual(mock_create_from_sequence.call_count, 2)
+        mock_create_from_sequence.assert_any_call(96)
+        self.assertEqual(R2Z2Cursor.objects.get_sequence(), 96)
+        self.assertEqual(R2Z2Cursor.objects.get().sequence_id, 96)
+
+    @patch(MODULE_PATH + "._route_killmail", return_value=False)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2", return_value=100)
+    def test_run_zkb_r2z2_records_gaps_and_stops_when_caught_up(
+        self, _mock_get_sequence, mock_create_from_sequence, mock_route
+    ):
+        R2Z2Cursor.objects.commit(97)
+        mock_create_from_sequence.side_effect = [
+            R2Z2SequenceNotFound(),
+            R2Z2SequenceUnavailable(),
+            Mock(),
+            R2Z2SequenceNotFound(),
+        ]
+
+        run_zkb_r2z2()
+
+        self.assertEqual(mock_create_from_sequence.call_count, 4)
+        self.assertEqual(mock_route.call_count, 1)
+        self.assertEqual(
+            dict(R2Z2Gap.objects.values_list("sequence_id", "reason")),
+            {98: R2Z2Gap.REASON_NOT_FOUND, 99: R2Z2Gap.REASON_INVALID},
+        )
+        self.assertEqual(R2Z2Cursor.objects.get_sequence(), 100)
+
+    @patch(MODULE_PATH + "._route_killmail", return_value=False)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2", return_value=100)
+    def test_run_zkb_r2z2_prefetch_routes_in_order(
+        self, _mock_get_sequence, mock_create_from_sequence, mock_route
+    ):
+        def create_from_sequence(sequence_id):
+            if sequence_id > 100:
+                raise R2Z2SequenceNotFound()
+            return Mock(id=sequence_id)
+
+        R2Z2Cursor.objects.commit(89)
+        mock_create_from_sequence.side_effect = create_from_sequence
+
+        with patch(MODULE_PATH + ".app_settings.KILLSTATS_R2Z2_PREFETCH", 4):
+            run_zkb_r2z2()
 
-        mock_run_tracker_corp_delay.assert_called_once_with(
-            corporation_id=2001,
-            killmail_id=123456,
+        self.assertEqual(
+            [call.args[0].id for call in mock_route.call_args_list],
+            list(range(90, 101)),
         )
-        mock_run_tracker_ally_delay.assert_called_once_with(
-            alliance_id=3001,
-            killmail_id=123456,
+        self.assertEqual(R2Z2Cursor.objects.get_sequence(), 100)
+
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    @patch(HELPER_PATH + ".KillmailBody.get_sequence_from_r2z2", return_value=50_000)
+    def test_run_zkb_r2z2_limits_backlog(
+        self, _mock_get_sequence, mock_create_from_sequence
+    ):
+        R2Z2Cursor.objects.commit(100)
+        mock_create_from_sequence.return_value = None
+
+        with patch(MODULE_PATH + ".app_settings.KILLSTATS_R2Z2_MAX_BACKLOG", 1000):
+            run_zkb_r2z2()
+
+        mock_create_from_sequence.assert_called_once_with(49_000)
+        # skipped sequences are one gap refilled by the gap task
+        gap = R2Z2Gap.objects.get(reason=R2Z2Gap.REASON_BACKLOG)
+        self.assertEqual((gap.sequence_id, gap.end_sequence_id), (101, 48_999))
+
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=0)
+    @patch(MODULE_PATH + "._route_killmail", return_value=True)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    def test_run_zkb_r2z2_gaps(
+        self, mock_create_from_sequence, mock_route, _mock_reserve
+    ):
+        R2Z2Gap.objects.record(10, R2Z2Gap.REASON_NOT_FOUND)
+        R2Z2Gap.objects.record(11, R2Z2Gap.REASON_NOT_FOUND)
+        R2Z2Gap.objects.record(12, R2Z2Gap.REASON_INVALID)
+        killmail = Mock()
+        mock_create_from_sequence.side_effect = [
+            killmail,
+            R2Z2SequenceNotFound(),
+            None,
+        ]
+
+        run_zkb_r2z2_gaps()
+
+        # the newest gaps are refilled first
+        mock_route.assert_called_once_with(killmail)
+        self.assertFalse(R2Z2Gap.objects.filter(sequence_id=12).exists())
+        self.assertEqual(R2Z2Gap.objects.get(sequence_id=11).attempts, 1)
+        self.assertEqual(R2Z2Gap.objects.get(sequence_id=10).attempts, 0)
+
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=0)
+    @patch(MODULE_PATH + "._route_killmail", return_value=True)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    def test_run_zkb_r2z2_gaps_refills_range_until_rate_limited(
+        self, mock_create_from_sequence, mock_route, _mock_reserve
+    ):
+        # given
+        R2Z2Gap.objects.record_range(1, 1_000_000, R2Z2Gap.REASON_BACKLOG)
+        R2Z2Gap.objects.record(1_000_010, R2Z2Gap.REASON_NOT_FOUND)
+        killmails = [Mock() for _ in range(250)]
+        mock_create_from_sequence.side_effect = [
+            *killmails,
+            R2Z2SequenceUnavailable(),
+            None,
+        ]
+        # when
+        run_zkb_r2z2_gaps()
+        # then
+        # no fixed batch size, the run stops at the rate limit
+        self.assertEqual(mock_route.call_count, 250)
+        self.assertEqual(
+            [call.args[0] for call in mock_create_from_sequence.call_args_list[:3]],
+            [1_000_010, 1_000_000, 999_999],
         )
-        self.assertEqual(mock_run_tracker_corp_delay.call_count, 1)
-        self.assertEqual(mock_run_tracker_ally_delay.call_count, 1)
+        gap = R2Z2Gap.objects.get(reason=R2Z2Gap.REASON_BACKLOG)
+        self.assertEqual((gap.sequence_id, gap.end_sequence_id), (1, 999_750))
+        # the invalid sequence is retried like those of live ingestion
+        self.assertEqual(
+            R2Z2Gap.objects.get(sequence_id=999_751).reason, R2Z2Gap.REASON_INVALID
+        )
+        self.assertEqual(R2Z2Gap.objects.count(), 2)
+
+    @patch(MODULE_PATH + ".run_zkb_r2z2_gaps.apply_async")
+    @patch(MODULE_PATH + ".ratelimiter.reserve", side_effect=[0, 0.5, 2.5])
+    @patch(MODULE_PATH + ".time.sleep")
+    @patch(MODULE_PATH + "._route_killmail", return_value=True)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    def test_run_zkb_r2z2_gaps_requeued_when_rate_limited(
+        self,
+        mock_create_from_sequence,
+        _mock_route,
+        mock_sleep,
+        mock_reserve,
+        mock_apply_async,
+    ):
+        # given
+        R2Z2Gap.objects.record_range(1, 1_000, R2Z2Gap.REASON_BACKLOG)
+        mock_create_from_sequence.return_value = Mock()
+        # when
+        run_zkb_r2z2_gaps()
+        # then
+        # close slots are waited for, the task continues later for a far slot
+        mock_reserve.assert_called_with(ZKB_R2Z2)
+        mock_sleep.assert_called_once_with(0.5)
+        mock_apply_async.assert_called_once_with(countdown=3)
+        mock_create_from_sequence.assert_called_with(999, reserved=True)
+        self.assertEqual(mock_create_from_sequence.call_count, 2)
+        self.assertEqual(R2Z2Gap.objects.get(sequence_id=1).end_sequence_id, 998)
+
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=0)
+    @patch(MODULE_PATH + ".time")
+    @patch(MODULE_PATH + "._route_killmail", return_value=True)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    def test_run_zkb_r2z2_gaps_stops_after_time_budget(
+        self, mock_create_from_sequence, _mock_route, mock_time, _mock_reserve
+    ):
+        # given
+        R2Z2Gap.objects.record_range(1, 1_000, R2Z2Gap.REASON_BACKLOG)
+        mock_create_from_sequence.return_value = Mock()
+        mock_time.monotonic.side_effect = range(0, 1_000_000, 100)
+        # when
+        with patch(MODULE_PATH + ".app_settings.KILLSTATS_R2Z2_GAP_TIME_BUDGET", 600):
+            run_zkb_r2z2_gaps()
+        # then
+        self.assertEqual(mock_create_from_sequence.call_count, 5)
+        self.assertEqual(R2Z2Gap.objects.get(sequence_id=1).end_sequence_id, 995)
+
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=0)
+    @patch(HELPER_PATH + ".KillmailBody.create_from_r2z2_sequence")
+    def test_run_zkb_r2z2_gaps_drops_expired_range(
+        self, mock_create_from_sequence, _mock_reserve
+    ):
+        # given
+        R2Z2Gap.objects.record_range(1, 1_000, R2Z2Gap.REASON_BACKLOG)
+        mock_create_from_sequence.side_effect = R2Z2SequenceNotFound()
+        # when
+        run_zkb_r2z2_gaps()
+        # then
+        self.assertEqual(mock_create_from_sequence.call_count, 10)
+        self.assertFalse(R2Z2Gap.objects.exists())
 
     @patch(MODULE_PATH + ".Chain")
     @patch(MODULE_PATH + ".store_killmail.si")
@@ -150,3 +387,255 @@ class TestTasks(NoSocketsTestCase):
         mock_store_killmail_signature.assert_called_once_with(555)
         mock_chain.assert_called_once_with(signature)
         chain_instance.delay.assert_called_once()
+
+    @patch(MODULE_PATH + ".store_killmails.delay")
+    def test_store_killmail_queues_killmail(self, mock_store_killmails_delay):
+        with patch(MODULE_PATH + ".app_settings.KILLSTATS_STORE_BATCH_SIZE", 2):
+            store_killmail(1)
+            mock_store_killmails_delay.assert_not_called()
+
+            store_killmail(2)
+            mock_store_killmails_delay.assert_called_once()
+
+        self.assertEqual(
+            get_redis_client().lrange(STORE_QUEUE_KEY, 0, -1), [b"1", b"2"]
+        )
+
+    @patch(MODULE_PATH + ".store_killmails.delay")
+    def test_store_killmail_flush(self, mock_store_killmails_delay):
+        store_killmail(1, flush=True)
+
+        mock_store_killmails_delay.assert_called_once()
+
+    @patch(MODULE_PATH + ".store_killmails.delay")
+    def test_store_killmail_coalesces_duplicates(self, mock_store_killmails_delay):
+        store_killmail(1)
+        store_killmail(1)
+        store_killmail(1, flush=True)
+
+        self.assertEqual(get_redis_client().lrange(STORE_QUEUE_KEY, 0, -1), [b"1"])
+        self.assertEqual(store_guard.metrics()["coalesced"], 2)
+        # a flush is still passed on
+        mock_store_killmails_delay.assert_called_once()
+
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_completes_claims(self, mock_bulk_create):
+        mock_bulk_create.side_effect = lambda killmails: killmails
+        _save_killmail(1)
+        with patch(MODULE_PATH + ".store_killmails.delay"):
+            store_killmail(1)
+            store_killmail(2)
+
+        store_killmails()
+
+        self.assertEqual(store_guard.state(1), STATE_DONE)
+        # expired killmails can be queued again
+        self.assertIsNone(store_guard.state(2))
+        with patch(MODULE_PATH + ".store_killmails.delay"):
+            store_killmail(1)
+        self.assertEqual(get_redis_client().llen(STORE_QUEUE_KEY), 0)
+
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_in_batches(self, mock_bulk_create):
+        mock_bulk_create.side_effect = lambda killmails: killmails
+        for killmail_id in (1, 2, 3):
+            _save_killmail(killmail_id)
+        get_redis_client().rpush(STORE_QUEUE_KEY, 1, 2, 2, 3, 4)
+
+        with patch(MODULE_PATH + ".app_settings.KILLSTATS_STORE_BATCH_SIZE", 3):
+            store_killmails()
+
+        self.assertEqual(
+            [
+                [killmail.id for killmail in call.args[0]]
+                for call in mock_bulk_create.call_args_list
+            ],
+            [[1, 2], [3]],
+        )
+        self.assertEqual(get_redis_client().llen(STORE_QUEUE_KEY), 0)
+        # stored killmails are removed from the temporary storage
+        with self.assertRaises(KillmailDoesNotExist):
+            KillmailBody.get(1)
+
+    @patch(MODULE_PATH + ".Killmail.objects.create_from_killmail")
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_falls_back_on_conflicts(
+        self, mock_bulk_create, mock_create
+    ):
+        mock_bulk_create.side_effect = IntegrityError()
+        # 1 exists, 2 conflicts twice, 3 fails, 4 conflicts once
+        mock_create.side_effect = [
+            IntegrityError(),
+            IntegrityError(),
+            IntegrityError(),
+            ValueError(),
+            IntegrityError(),
+            Mock(),
+        ]
+        create_killmail(
+            killmail_id=1,
+            killmail_date=timezone.now(),
+            victim_corporation_id=2001,
+            hash="1",
+        )
+        for killmail_id in (1, 2, 3, 4):
+            _save_killmail(killmail_id)
+        with patch(MODULE_PATH + ".store_killmails.delay"):
+            for killmail_id in (1, 2, 3, 4):
+                store_killmail(killmail_id)
+
+        store_killmails()
+
+        self.assertEqual(mock_create.call_count, 6)
+        redis = get_redis_client()
+        # conflicts are queued again, failed killmails don't block the queue
+        self.assertEqual(redis.lrange(STORE_QUEUE_KEY, 0, -1), [b"2"])
+        self.assertEqual(redis.lrange(STORE_DEAD_LETTER_KEY, 0, -1), [b"3"])
+        self.assertEqual(store_guard.state(1), STATE_DONE)
+        self.assertEqual(store_guard.state(4), STATE_DONE)
+        self.assertIsNone(store_guard.state(3))
+        # failed and retried killmails stay in the temporary storage
+        self.assertEqual(KillmailBody.get(2).id, 2)
+        self.assertEqual(KillmailBody.get(3).id, 3)
+
+    @patch(MODULE_PATH + ".Killmail.objects.create_from_killmail")
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_keeps_batch_if_esi_unavailable(
+        self, mock_bulk_create, mock_create
+    ):
+        mock_bulk_create.side_effect = EsiUnavailable("ESI is down")
+        _save_killmail(1)
+        get_redis_client().rpush(STORE_QUEUE_KEY, 1)
+
+        store_killmails()
+
+        mock_create.assert_not_called()
+        self.assertEqual(get_redis_client().lrange(STORE_QUEUE_KEY, 0, -1), [b"1"])
+        self.assertEqual(KillmailBody.get(1).id, 1)
+
+    @patch(MODULE_PATH + ".store_killmails.apply_async")
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=30)
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_requeued_when_esi_rate_limited(
+        self, mock_bulk_create, mock_reserve, mock_apply_async
+    ):
+        # given
+        _save_killmail(1)
+        get_redis_client().rpush(STORE_QUEUE_KEY, 1)
+        # when
+        store_killmails()
+        # then
+        mock_reserve.assert_called_once_with(ESI)
+        mock_apply_async.assert_called_once_with(countdown=30)
+        mock_bulk_create.assert_not_called()
+        self.assertEqual(get_redis_client().lrange(STORE_QUEUE_KEY, 0, -1), [b"1"])
+
+    @patch(MODULE_PATH + ".store_killmails.delay")
+    @patch(MODULE_PATH + ".tracked_entities")
+    def test_replay_unmatched_killmails(
+        self, mock_tracked_entities, mock_store_killmails_delay
+    ):
+        for killmail_id in (1, 2):
+            unmatched_killmails.push(
+                KillmailBody(
+                    id=killmail_id,
+                    time=timezone.now(),
+                    victim=KillmailVictim(corporation_id=2000 + killmail_id),
+                    attackers=[],
+                    position=KillmailPosition(),
+                    zkb=KillmailZkb(),
+                )
+            )
+        mock_tracked_entities.match.side_effect = (
+            lambda killmail: killmail.involved_entity_ids() & {2002}
+        )
+
+        replay_unmatched_killmails()
+
+        mock_tracked_entities.refresh.assert_called_once_with(force=True)
+        self.assertEqual(get_redis_client().lrange(STORE_QUEUE_KEY, 0, -1), [b"2"])
+        self.assertEqual(KillmailBody.get(2).victim.corporation_id, 2002)
+        self.assertEqual(unmatched_killmails.size()[0], 1)
+        mock_store_killmails_delay.assert_called_once()
+
+
+class TestWarmApiCache(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        load_allianceauth()
+        cls.user, character_ownership = create_user_from_evecharacter(1001)
+        # bulk_create skips the signals of new audits
+        CorporationsAudit.objects.bulk_create(
+            [
+                CorporationsAudit(
+                    corporation=character_ownership.character.corporation,
+                    owner=character_ownership.character,
+                )
+            ]
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        cache_warming.take(100)
+
+    @patch(MODULE_PATH + ".cache_warming.combinations")
+    @patch(MODULE_PATH + ".api_helper.warm_cache", return_value=5)
+    def test_warm_api_cache(self, mock_warm_cache, mock_combinations):
+        # given
+        now = timezone.localtime()
+        cache_warming.requeue([2001, 2002])
+        mock_combinations.return_value = [("corporation", self.user.pk)]
+        # when
+        warm_api_cache()
+        # then
+        # 2002 is not tracked
+        self.assertEqual(
+            [call.args for call in mock_warm_cache.call_args_list],
+            [
+                ("corporation", 2001, now.year, now.month, None),
+                ("corporation", 0, now.year, now.month, self.user),
+            ],
+        )
+        self.assertEqual(cache_warming.take(100), [])
+
+    @patch(MODULE_PATH + ".api_helper.warm_cache")
+    def test_warm_api_cache_waits_for_ingestion(self, mock_warm_cache):
+        # given
+        cache_warming.requeue([2001])
+        get_redis_client().rpush(STORE_QUEUE_KEY, 1)
+        # when
+        warm_api_cache()
+        # then
+        mock_warm_cache.assert_not_called()
+        self.assertEqual(cache_warming.take(100), [2001])
+
+    @patch(MODULE_PATH + ".warm_api_cache.apply_async")
+    @patch(MODULE_PATH + ".ratelimiter.reserve", return_value=4.2)
+    @patch(MODULE_PATH + ".api_helper.warm_cache")
+    def test_warm_api_cache_rate_limited(
+        self, mock_warm_cache, mock_reserve, mock_apply_async
+    ):
+        # given
+        cache_warming.requeue([2001])
+        # when
+        warm_api_cache()
+        # then
+        # the task is queued again instead of waiting for the slot
+        mock_reserve.assert_called_once_with(CACHE_WARM)
+        mock_apply_async.assert_called_once_with(countdown=5)
+        mock_warm_cache.assert_not_called()
+        self.assertEqual(cache_warming.take(100), [2001])
+
+    @patch(MODULE_PATH + ".warm_api_cache.delay")
+    @patch(MODULE_PATH + ".Killmail.objects.bulk_create_from_killmails")
+    def test_store_killmails_starts_warming(self, mock_bulk_create, mock_warm_delay):
+        # given
+        mock_bulk_create.side_effect = lambda killmails: killmails
+        _save_killmail(1)
+        with patch(MODULE_PATH + ".store_killmails.delay"):
+            store_killmail(1)
+        # when
+        store_killmails()
+        # then
+        mock_warm_delay.assert_called_once()
@@ -224,7 +224,7 @@ def add_killmail(request):
             killmail = KillmailBody.get(killmail_id)
 
             if killmail:
-                store_killmail.apply_async((killmail.id,))
+                store_killmail.apply_async((killmail.id,), kwargs={"flush": True})
                 messages.success(
                     request,
                     _("Killmail {killmail_id} has been added to Killstats.").format(